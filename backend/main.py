@@ -5,11 +5,14 @@ Python AI 시스템 메인 서버
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
 import logging
 import os
+import threading
+import time
 from datetime import datetime
 import json
 
@@ -18,6 +21,9 @@ from src.vllm_matcher import VLLMMatcher
 from src.user import User
 from src.parsing import BizInfoAPI
 from src.config import Config
+from src.metrics import metrics
+from src.cancellation import CancelToken, GenerationCancelled
+from src.catalog_refresh import CatalogRefresher
 
 # FastAPI 앱 초기화
 app = FastAPI(
@@ -62,88 +68,246 @@ class ProcessResponse(BaseModel):
     message: Optional[str] = None
     error: Optional[str] = None
 
+class ComponentStatus:
+    """컴포넌트별 기동 상태와 소요 시간"""
+
+    def __init__(self):
+        self.state = 'pending'  # pending / loading / warming / ready / failed
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'error': self.error
+        }
+
 # 전역 변수
 vllm_matcher = None
 biz_parser = None
+rag_chain = None
+started_at = time.time()
+service_status = {
+    'vllm_matcher': ComponentStatus(),
+    'biz_parser': ComponentStatus()
+}
+if Config.RAG_STREAM_ENABLED:
+    service_status['rag_chain'] = ComponentStatus()
+
+def is_ready() -> bool:
+    """모든 컴포넌트가 로드 및 워밍업을 마쳤는지 확인"""
+    return all(status.state == 'ready' for status in service_status.values())
+
+def ensure_ready(*components: str):
+    """
+    엔드포인트가 사용하는 컴포넌트가 준비되지 않았으면 503으로 거절
+    (다른 컴포넌트의 로드/실패와 무관하게 처리, 전체 준비 상태는 /health/ready에서만 확인)
+    """
+    pending = [name for name in components if name not in service_status or service_status[name].state != 'ready']
+    if pending:
+        raise HTTPException(status_code=503, detail=f"서비스가 아직 준비 중입니다: {', '.join(pending)}")
+
+def load_component(name, load, warmup=None):
+    """컴포넌트를 로드(및 워밍업)하면서 상태와 소요 시간을 기록"""
+    status = service_status[name]
+    try:
+        status.state = 'loading'
+        start = time.perf_counter()
+        load()
+        status.load_seconds = round(time.perf_counter() - start, 3)
+
+        if warmup is not None:
+            status.state = 'warming'
+            start = time.perf_counter()
+            warmup()
+            status.warmup_seconds = round(time.perf_counter() - start, 3)
+
+        status.state = 'ready'
+        logger.info(f"{name} 준비 완료 (로드 {status.load_seconds}초, 워밍업 {status.warmup_seconds}초)")
+
+    except Exception as e:
+        status.state = 'failed'
+        status.error = str(e)
+        logger.error(f"{name} 초기화 실패: {e}")
 
 def initialize_services():
-    """서비스 초기화"""
+    """서비스 초기화 (백그라운드 스레드에서 실행)"""
     global vllm_matcher, biz_parser
-    
-    try:
-        logger.info("AI 서비스 초기화 시작...")
-        
-        # vLLM 매처 초기화
-        vllm_matcher = VLLMMatcher()
-        logger.info("vLLM 매처 초기화 완료")
-        
-        # API 파서 초기화
+
+    logger.info("AI 서비스 초기화 시작...")
+
+    # API 파서 초기화
+    def load_biz_parser():
+        global biz_parser
         biz_parser = BizInfoAPI()
-        logger.info("API 파서 초기화 완료")
-        
-        logger.info("모든 서비스 초기화 완료")
-        
-    except Exception as e:
-        logger.error(f"서비스 초기화 실패: {e}")
-        raise
+    load_component('biz_parser', load_biz_parser)
+
+    # vLLM 매처 초기화 (객체는 먼저 만들고 모델은 여기서 로드)
+    if vllm_matcher is None:
+        vllm_matcher = VLLMMatcher(lazy=True)
+    load_component(
+        'vllm_matcher',
+        vllm_matcher.load,
+        vllm_matcher.warmup if Config.WARMUP_ENABLED else None
+    )
+
+    # 스트리밍 추천용 RAG 체인 (vLLM 모델을 공유)
+    if Config.RAG_STREAM_ENABLED:
+        def load_rag_chain():
+            global rag_chain
+            from src.db_connector import DB_Pinecone
+            from src.rag import Ragchain
+
+            dbcon = DB_Pinecone(Config.PINECONE_INDEX_NAME, Config.PINECONE_API_KEY)
+            dbcon.create_connection()
+            rag_chain = Ragchain(dbcon, vllm_matcher.llm)
+        load_component('rag_chain', load_rag_chain)
+
+    if is_ready():
+        logger.info(f"모든 서비스 초기화 완료 ({time.time() - started_at:.1f}초)")
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """헬스체크 엔드포인트"""
     try:
+        if is_ready():
+            status = 'healthy'
+        elif any(s.state == 'failed' for s in service_status.values()):
+            status = 'unhealthy'
+        else:
+            status = 'starting'
+
         return HealthResponse(
-            status='healthy',
+            status=status,
             timestamp=datetime.now().isoformat(),
-            services={
-                'vllm_matcher': vllm_matcher is not None,
-                'biz_parser': biz_parser is not None
-            }
+            services={name: s.state == 'ready' for name, s in service_status.items()}
         )
     except Exception as e:
         logger.error(f"헬스체크 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: 프로세스가 살아 있고 이벤트 루프가 응답하는지 확인"""
+    return {
+        'status': 'alive',
+        'uptime_seconds': round(time.time() - started_at, 1)
+    }
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 모델 로드와 워밍업이 끝난 레플리카만 200"""
+    return JSONResponse(
+        status_code=200 if is_ready() else 503,
+        content={
+            'ready': is_ready(),
+            'timestamp': datetime.now().isoformat(),
+            'components': {name: s.to_dict() for name, s in service_status.items()}
+        }
+    )
+
+async def watch_disconnect(http_request: Request, cancel_token: CancelToken, interval: float = 0.5):
+    """클라이언트 연결이 끊기면 취소 토큰을 취소합니다."""
+    while not cancel_token.cancelled:
+        if await http_request.is_disconnected():
+            cancel_token.cancel("client_disconnected")
+            return
+        await asyncio.sleep(interval)
+
+async def run_cancellable(http_request: Request, func, *args):
+    """
+    매칭 함수를 워커 스레드에서 실행하면서 클라이언트 연결 종료와 요청 데드라인을 감시합니다.
+    func는 마지막 인자로 CancelToken을 받습니다.
+    """
+    cancel_token = CancelToken(deadline_seconds=Config.REQUEST_DEADLINE_SECONDS)
+    watcher = asyncio.create_task(watch_disconnect(http_request, cancel_token))
+    try:
+        return await asyncio.to_thread(func, *args, cancel_token)
+    except GenerationCancelled as e:
+        metrics.increment("requests.aborted")
+        metrics.increment(f"requests.aborted.{e.reason.split(':')[0]}")
+        logger.warning(f"요청 중단: {e.reason}")
+        if e.reason == "client_disconnected":
+            # 응답을 받을 클라이언트가 없으므로 nginx 관례의 499 사용
+            raise HTTPException(status_code=499, detail="클라이언트 연결이 종료되었습니다.")
+        raise HTTPException(status_code=504, detail="처리 시간이 초과되었습니다.")
+    finally:
+        watcher.cancel()
+
 @app.post("/api/process", response_model=ProcessResponse)
-async def process_user_request(request: UserRequest):
+async def process_user_request(request: UserRequest, http_request: Request):
     """사용자 요청 처리"""
+    ensure_ready('vllm_matcher')
     try:
         logger.info(f"사용자 요청 처리 시작 - ID: {request.userId}, 메시지: {request.message}")
         
         # 사용자 정보 생성
         user = create_user_from_request(request.userId, request.message, request.session)
         
-        # AI 매칭 실행
-        result = process_ai_matching(user, request.message)
+        # AI 매칭 실행 (연결 종료/데드라인 시 생성 중단)
+        result = await run_cancellable(http_request, process_ai_matching, user, request.message)
         
         return ProcessResponse(**result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"사용자 요청 처리 실패: {e}")
         raise HTTPException(status_code=500, detail="처리 중 오류가 발생했습니다.")
 
+@app.post("/api/recommend/stream")
+async def stream_recommendation(request: UserRequest):
+    """RAG 추천 답변을 생성되는 대로 text/plain 청크로 전송 (클라이언트 연결이 끊기면 생성 중단)"""
+    if rag_chain is None:
+        raise HTTPException(status_code=503, detail="스트리밍 추천을 사용할 수 없습니다.")
+    logger.info(f"스트리밍 추천 시작 - ID: {request.userId}, 메시지: {request.message}")
+
+    async def generate():
+        try:
+            async for chunk in rag_chain.astream(request.message):
+                yield chunk
+        except Exception as e:
+            # 응답 헤더는 이미 전송되었으므로 오류 문구로 스트림을 끝냄
+            logger.error(f"스트리밍 추천 실패: {e}")
+            yield "\n처리 중 오류가 발생했습니다."
+
+    return StreamingResponse(generate(), media_type="text/plain; charset=utf-8")
+
+def process_batch_items(requests, cancel_token):
+    """배치 요청을 순서대로 처리 (취소 시 남은 요청은 처리하지 않음)"""
+    results = []
+    for req in requests:
+        cancel_token.check()
+        try:
+            user = create_user_from_request(req.userId, req.message, req.session)
+            results.append(process_ai_matching(user, req.message, cancel_token))
+        except GenerationCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"배치 요청 중 개별 요청 실패: {e}")
+            results.append({
+                'success': False,
+                'error': str(e)
+            })
+    return results
+
 @app.post("/api/batch")
-async def process_batch_request(request: BatchRequest):
+async def process_batch_request(request: BatchRequest, http_request: Request):
     """배치 요청 처리"""
+    ensure_ready('vllm_matcher')
     try:
-        results = []
-        for req in request.requests:
-            try:
-                user = create_user_from_request(req.userId, req.message, req.session)
-                result = process_ai_matching(user, req.message)
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"배치 요청 중 개별 요청 실패: {e}")
-                results.append({
-                    'success': False,
-                    'error': str(e)
-                })
+        results = await run_cancellable(http_request, process_batch_items, request.requests)
         
         return {
             'success': True,
             'results': results
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"배치 요청 처리 실패: {e}")
         raise HTTPException(status_code=500, detail="배치 처리 중 오류가 발생했습니다.")
@@ -198,15 +362,22 @@ def extract_business_summary_from_message(message):
         return message
     return ""
 
-def process_ai_matching(user, message):
+def process_ai_matching(user, message, cancel_token=None):
     """AI 매칭 처리"""
     try:
-        # 지원사업 정보 추출
-        all_categories_file = "src/data/all_categories.json"
-        extracted_data = vllm_matcher.extract_support_programs_info(all_categories_file)
+        # 지원사업 정보 추출 (카탈로그 새로고침이 교체하는 파일과 같은 경로)
+        extracted_data = vllm_matcher.extract_support_programs_info(Config.CATALOG_FILE)
         
         # vLLM 매칭 실행
-        matched_programs = vllm_matcher.match_support_programs(user, extracted_data)
+        if Config.MATCHING_MODE == 'two_stage':
+            matched_programs = vllm_matcher.match_support_programs_two_stage(
+                user, extracted_data, cancel_token=cancel_token)
+        elif Config.MATCHING_MODE == 'cascade':
+            matched_programs = vllm_matcher.match_support_programs_cascade(
+                user, extracted_data, cancel_token=cancel_token)
+        else:
+            matched_programs = vllm_matcher.match_support_programs(
+                user, extracted_data, cancel_token=cancel_token)
         
         # 결과 포맷팅
         if matched_programs:
@@ -248,6 +419,8 @@ def process_ai_matching(user, message):
                 'message': '현재 조건에 맞는 지원사업을 찾을 수 없습니다.'
             }
             
+    except GenerationCancelled:
+        raise
     except Exception as e:
         logger.error(f"AI 매칭 처리 실패: {e}")
         return {
@@ -272,41 +445,90 @@ async def get_categories():
         logger.error(f"카테고리 조회 실패: {e}")
         raise HTTPException(status_code=500, detail="카테고리 조회 중 오류가 발생했습니다.")
 
-@app.post("/api/refresh-data")
-async def refresh_support_data():
-    """지원사업 데이터 새로고침"""
-    try:
-        if not biz_parser:
-            raise HTTPException(status_code=500, detail="API 파서가 초기화되지 않았습니다.")
-        
-        # 데이터 새로고침 실행
-        biz_parser.categories_list_search(['기술', '경영', '금융', '창업'])
-        
-        return {
-            'success': True,
-            'message': '지원사업 데이터가 새로고침되었습니다.'
+@app.get("/api/metrics")
+async def get_metrics():
+    """서비스 메트릭 조회 (캐스케이드 계층별 호출 수 포함)"""
+    return {
+        'success': True,
+        'data': {
+            **metrics.snapshot(),
+            # 라우터를 여기서 만들면 reranker 모델을 내려받을 수 있으므로 이미 만들어진 경우에만 보고
+            'cascade': vllm_matcher._router.stats() if vllm_matcher and vllm_matcher._router is not None else {}
         }
-        
-    except Exception as e:
-        logger.error(f"데이터 새로고침 실패: {e}")
-        raise HTTPException(status_code=500, detail="데이터 새로고침 중 오류가 발생했습니다.")
+    }
+
+def run_catalog_refresh() -> Dict[str, Any]:
+    """
+    (백그라운드 작업) 지원사업 데이터를 다시 수집하고 카탈로그/스냅샷/인덱스를 교체합니다.
+    새 카탈로그는 옆에서 만든 뒤 한 번에 교체되므로 진행 중인 요청은 이전 카탈로그를 끝까지 사용합니다.
+    벡터 인덱스는 카탈로그 교체 전에 새 카탈로그와 동기화하고, 교체 후에는 모든 워커가 카탈로그 파일이
+    바뀐 것을 보고 BM25 인덱스를 다시 만들고 로컬 인덱스의 새 세대를 읽습니다.
+    """
+    if not biz_parser:
+        raise RuntimeError("API 파서가 초기화되지 않았습니다.")
+
+    result: Dict[str, Any] = {}
+
+    def update_index(staged_file, catalog):
+        # 바뀐 공고만 업서트 (로컬 인덱스는 새 세대 디렉터리에 저장, 실패하면 카탈로그를 교체하지 않음)
+        result['index'], embeddings = rag_chain.pinecone.prepare_catalog(staged_file, catalog)
+        return embeddings
+
+    result['catalog_file'] = biz_parser.categories_list_search(
+        Config.CATALOG_REFRESH_CATEGORIES,
+        prepare=update_index if rag_chain is not None else None
+    )
+    return result
+
+catalog_refresher = CatalogRefresher(run_catalog_refresh)
+
+@app.post("/api/refresh-data", status_code=202)
+async def refresh_support_data():
+    """지원사업 데이터 새로고침 (백그라운드 작업을 시작하고 작업 ID 반환)"""
+    if not biz_parser:
+        raise HTTPException(status_code=500, detail="API 파서가 초기화되지 않았습니다.")
+
+    job = catalog_refresher.submit('manual')
+    return {
+        'success': True,
+        'data': job.to_dict(),
+        'message': f'지원사업 데이터 새로고침 작업이 시작되었습니다. (상태 조회: /api/refresh-data/{job.id})'
+    }
+
+@app.get("/api/refresh-data/{job_id}")
+async def get_refresh_status(job_id: str):
+    """지원사업 데이터 새로고침 작업 상태 조회"""
+    job = catalog_refresher.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="새로고침 작업을 찾을 수 없습니다.")
+    return {
+        'success': True,
+        'data': job.to_dict()
+    }
 
 # 서비스 초기화
 @app.on_event("startup")
 async def startup_event():
-    """애플리케이션 시작 시 서비스 초기화"""
-    initialize_services()
+    """애플리케이션 시작 시 서비스 초기화 (모델 로드와 워밍업은 백그라운드에서 진행)"""
+    threading.Thread(target=initialize_services, name="service-initializer", daemon=True).start()
+    catalog_refresher.start_schedule(Config.CATALOG_REFRESH_INTERVAL_SECONDS)
 
 if __name__ == '__main__':
     import uvicorn
     try:
         port = int(os.environ.get('PORT', 8000))
+        # 추론 서버 주소가 있으면 모델은 추론 서버 프로세스 하나만 로드하고 API 워커들은 소켓으로 요청
+        if Config.INFERENCE_SERVER_ADDRESS and Config.INFERENCE_SERVER_SPAWN:
+            from src.inference_server import start_server_process
+            inference_server = start_server_process()
+        elif Config.API_WORKERS > 1 and not Config.INFERENCE_SERVER_ADDRESS:
+            logger.warning(f"INFERENCE_SERVER_ADDRESS 없이 워커 {Config.API_WORKERS}개를 실행하면 워커마다 모델을 로드합니다.")
         uvicorn.run(
             "main:app",
             host="0.0.0.0",
             port=port,
             reload=False,
-            workers=1
+            workers=Config.API_WORKERS
         )
     except Exception as e:
         logger.error(f"서버 시작 실패: {e}")
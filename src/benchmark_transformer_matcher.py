@@ -0,0 +1,51 @@
+"""
+Transformers 매처 CPU 서빙 벤치마크 스크립트
+순차 생성 / 배치 생성 / 카탈로그 prefix 캐시 배치 생성의 tokens/sec를 비교합니다.
+
+사용 예:
+    TRANSFORMER_DEVICE=cpu TRANSFORMER_CPU_DTYPE=int8 python src/benchmark_transformer_matcher.py
+"""
+
+import json
+import logging
+from user import User
+from config import Config
+from transformer_matcher import TransformerMatcher
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def benchmark_cpu_serving(max_new_tokens: int = 64):
+    """CPU 서빙 모드 tokens/sec 벤치마크"""
+    logger.info("=== CPU 서빙 벤치마크 ===")
+
+    test_users = [
+        User("기술 스타트업", "02", ["기술"], "AI 기반 개인정보 관리 시스템 개발 및 컨설팅 서비스 제공"),
+        User("제조 기업", "02", ["기술"], "스마트공장 구축 및 제조 공정 자동화 솔루션 개발"),
+        User("모빌리티 기업", "02", ["기술"], "전기차 부품 설계 및 시험평가 서비스"),
+        User("보안 기업", "02", ["기술"], "클라우드 보안 관제 및 취약점 진단 서비스"),
+    ]
+
+    matcher = TransformerMatcher(device="cpu")
+    extracted_data = matcher.extract_support_programs_info(Config.CATALOG_FILE)
+
+    # 프롬프트가 너무 길어지지 않도록 카탈로그 일부만 사용
+    prefix = matcher.create_catalog_prefix(extracted_data["기술"][:5])
+    suffixes = [matcher.create_user_suffix(user) for user in test_users]
+
+    results = matcher.benchmark(suffixes, prefix=prefix, max_new_tokens=max_new_tokens)
+    logger.info(f"벤치마크 결과:\n{json.dumps(results, ensure_ascii=False, indent=2)}")
+    return results
+
+
+if __name__ == "__main__":
+    logger.info("Transformers CPU 서빙 벤치마크 시작")
+
+    try:
+        benchmark_cpu_serving()
+        logger.info("벤치마크 완료!")
+
+    except Exception as e:
+        logger.error(f"벤치마크 실행 중 오류 발생: {e}")
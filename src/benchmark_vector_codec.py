@@ -0,0 +1,115 @@
+"""
+벡터 압축 벤치마크 스크립트
+로컬 인덱스를 fp32 원본 / fp16 / int8 / 차원 축소(PCA, Matryoshka) 설정으로 만들고
+벡터당 메모리, recall@10 (원본 brute-force 대비), 질의당 검색 시간을 비교합니다.
+
+임베딩 캐시(EMBEDDING_CACHE_DIR)에 실제 e5 임베딩이 충분히 있으면 그것을 사용하고,
+없으면 군집 구조를 가진 합성 벡터를 사용합니다.
+
+사용 예:
+    python src/benchmark_vector_codec.py
+"""
+
+import json
+import logging
+import time
+
+import numpy as np
+
+from src.config import Config
+from src.embedding_cache import EmbeddingCache
+from src.local_index import LocalIndex
+from src.vector_codec import VectorCodec
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CODEC_SETTINGS = [
+    ("fp16", 0, "pca"),
+    ("int8", 0, "pca"),
+    ("fp16", 256, "matryoshka"),
+    ("fp16", 256, "pca"),
+    ("int8", 256, "pca"),
+    ("int8", 128, "pca"),
+]
+
+
+def load_vectors(min_count: int = 2000, synthetic_count: int = 20000, dim: int = 1024, seed: int = 0) -> np.ndarray:
+    """벤치마크용 벡터 (캐시된 실제 임베딩 또는 합성 벡터)"""
+    if Config.EMBEDDING_CACHE_DIR:
+        cache = EmbeddingCache(Config.EMBEDDING_CACHE_DIR, Config.EMBEDDING_MODEL)
+        if len(cache) >= min_count:
+            logger.info(f"임베딩 캐시의 실제 벡터 {len(cache)}개 사용")
+            return np.asarray(cache._vectors, dtype=np.float32)
+
+    logger.info(f"합성 벡터 {synthetic_count}개 사용 (캐시된 임베딩이 {min_count}개 미만)")
+    # 실제 문장 임베딩처럼 분산이 소수의 축에 몰린(고유값이 감소하는) 군집 벡터
+    rng = np.random.default_rng(seed)
+    spectrum = (np.arange(1, dim + 1, dtype=np.float32) ** -0.75)
+    basis, _ = np.linalg.qr(rng.standard_normal((dim, dim)).astype(np.float32))
+    centers = rng.standard_normal((64, dim)).astype(np.float32) * spectrum
+    latent = centers[rng.integers(0, 64, synthetic_count)] + 0.5 * rng.standard_normal((synthetic_count, dim)).astype(np.float32) * spectrum
+    vectors = latent @ basis.T
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _evaluate(index: LocalIndex, queries: np.ndarray, truth, top_k: int):
+    start = time.perf_counter()
+    found = [{m["id"] for m in index.query(vector=q, top_k=top_k)["matches"]} for q in queries]
+    elapsed = time.perf_counter() - start
+    recall = np.mean([len(f & t) / top_k for f, t in zip(found, truth)])
+    return float(recall), elapsed / len(queries) * 1000
+
+
+def benchmark_vector_codec(n_queries: int = 200, top_k: int = 10):
+    """압축 설정별 메모리 / recall / 검색 시간 벤치마크"""
+    logger.info("=== 벡터 압축 벤치마크 ===")
+
+    vectors = load_vectors()
+    rng = np.random.default_rng(1)
+    query_rows = rng.choice(len(vectors), size=n_queries, replace=False)
+    queries = vectors[query_rows] + 0.05 * rng.standard_normal((n_queries, vectors.shape[1])).astype(np.float32)
+    items = [{"id": str(i), "values": vector} for i, vector in enumerate(vectors)]
+    # brute-force 근사 검색만 비교하도록 IVF는 사용하지 않음
+    ann_threshold = len(vectors) + 1
+
+    baseline = LocalIndex(ann_threshold=ann_threshold, codec=None)
+    baseline.upsert(items)
+    truth = [{m["id"] for m in baseline.query(vector=q, top_k=top_k)["matches"]} for q in queries]
+    _, baseline_ms = _evaluate(baseline, queries, truth, top_k)
+    full_bytes = vectors.shape[1] * 4
+
+    results = [{
+        "codec": "fp32 (원본)", "bytes_per_vector": full_bytes, "compression": 1.0,
+        "recall@10": 1.0, "recall@10_rescored": 1.0, "ms_per_query": round(baseline_ms, 3)
+    }]
+    for dtype, dim, reduction in CODEC_SETTINGS:
+        codec = VectorCodec(dtype, dim, reduction)
+        row = {"codec": repr(codec), "bytes_per_vector": codec.bytes_per_vector(vectors.shape[1])}
+        row["compression"] = round(full_bytes / row["bytes_per_vector"], 1)
+
+        for rescore_factor, key in ((0, "recall@10"), (Config.VECTOR_RESCORE_FACTOR or 10, "recall@10_rescored")):
+            index = LocalIndex(ann_threshold=ann_threshold, codec=VectorCodec(dtype, dim, reduction),
+                               rescore_factor=rescore_factor)
+            index.upsert(items)
+            index.query(vector=queries[0], top_k=top_k)  # 코덱 학습/인코딩
+            recall, ms = _evaluate(index, queries, truth, top_k)
+            row[key] = round(recall, 3)
+            row["ms_per_query" if rescore_factor else "ms_per_query_no_rescore"] = round(ms, 3)
+        results.append(row)
+
+    logger.info(f"벤치마크 결과 ({len(vectors)}개 벡터, {vectors.shape[1]}차원):\n"
+                f"{json.dumps(results, ensure_ascii=False, indent=2)}")
+    return results
+
+
+if __name__ == "__main__":
+    logger.info("벡터 압축 벤치마크 시작")
+
+    try:
+        benchmark_vector_codec()
+        logger.info("벤치마크 완료!")
+
+    except Exception as e:
+        logger.error(f"벤치마크 실행 중 오류 발생: {e}")
@@ -0,0 +1,136 @@
+"""
+BM25 기반 lexical 검색
+형태소 분석기 없이 동작하도록 단어 토큰과 한글 bigram 토큰을 함께 사용합니다.
+(예: "스마트공장" -> ["스마트공장", "스마", "마트", "트공", "공장"])
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9&]+")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def strip_html(text: str) -> str:
+    """HTML 태그를 공백으로 치환합니다."""
+    return HTML_TAG_PATTERN.sub(" ", text or "")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    검색용 토큰화
+
+    Args:
+        text (str): 원문
+
+    Returns:
+        List[str]: 소문자 단어 토큰 + 3글자 이상 한글 단어의 bigram 토큰
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall((text or "").lower()):
+        tokens.append(word)
+        if len(word) > 2 and "가" <= word[0] <= "힣":
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class BM25Index:
+    """역색인 기반 BM25 인덱스"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1 (float): 단어 빈도 포화 계수
+            b (float): 문서 길이 정규화 계수
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.idf: Dict[str, float] = {}
+        self.doc_lengths: List[int] = []
+        self.avg_doc_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def fit(self, documents: List[str]) -> "BM25Index":
+        """
+        문서 리스트로 인덱스를 생성합니다.
+
+        Args:
+            documents (List[str]): 색인할 문서 리스트 (리스트 위치가 문서 번호)
+
+        Returns:
+            BM25Index: 자기 자신
+        """
+        self.postings = {}
+        self.doc_lengths = []
+
+        for doc_id, document in enumerate(documents):
+            term_freqs = Counter(tokenize(document))
+            self.doc_lengths.append(sum(term_freqs.values()))
+            for term, freq in term_freqs.items():
+                self.postings.setdefault(term, []).append((doc_id, freq))
+
+        n_docs = len(self.doc_lengths)
+        self.avg_doc_length = sum(self.doc_lengths) / n_docs if n_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+        return self
+
+    def score(self, query: str) -> Dict[int, float]:
+        """
+        질의와 한 개 이상의 토큰을 공유하는 문서의 BM25 점수
+
+        Args:
+            query (str): 검색 질의
+
+        Returns:
+            Dict[int, float]: 문서 번호 -> BM25 점수
+        """
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf[term]
+            for doc_id, freq in posting:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + self.k1 * length_norm)
+        return scores
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        BM25 점수 상위 top_k 문서를 반환합니다.
+
+        Args:
+            query (str): 검색 질의
+            top_k (int): 반환할 문서 수
+
+        Returns:
+            List[Tuple[int, float]]: (문서 번호, 점수) 리스트 (점수 내림차순)
+        """
+        scores = self.score(query)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    @property
+    def unseen_idf(self) -> float:
+        """색인한 문서에 한 번도 나오지 않은 토큰의 idf (가장 드문 토큰과 같은 취급)"""
+        return math.log(1 + (len(self) + 0.5) / 0.5)
+
+    def coverage(self, query: str, text: str) -> float:
+        """
+        질의 토큰 중 text에 포함된 비율 (이 인덱스의 idf 가중, 0~1)
+        색인에 없는 질의 토큰도 unseen_idf로 분모에 넣으므로, 같은 인덱스에서는 text마다 독립적인 점수입니다.
+        (후보 목록이 아닌 전체 카탈로그로 만든 인덱스를 사용해야 후보 집합과 무관한 절대 점수가 됨)
+        """
+        weights = {term: self.idf.get(term, self.unseen_idf) for term in set(tokenize(query))}
+        total = sum(weights.values())
+        if total == 0:
+            return 0.0
+        text_terms = set(tokenize(text))
+        return sum(weight for term, weight in weights.items() if term in text_terms) / total
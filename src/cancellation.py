@@ -0,0 +1,115 @@
+"""
+요청 취소 / 데드라인 전파
+FastAPI 요청 -> 매처 -> 추론 엔진까지 하나의 CancelToken을 전달하여,
+클라이언트 연결 종료나 데드라인 초과 시 진행 중인 생성을 중단합니다.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+
+class GenerationCancelled(Exception):
+    """요청이 취소되었거나 데드라인을 넘겨 생성을 중단한 경우"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"생성이 중단되었습니다: {reason}")
+        self.reason = reason
+
+
+class CancelToken:
+    """취소 신호와 요청/단계별 데드라인을 함께 관리하는 토큰"""
+
+    def __init__(self, deadline_seconds: Optional[float] = None):
+        """
+        Args:
+            deadline_seconds (float, optional): 요청 전체 데드라인 (현재 시각 기준 초)
+        """
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._reason: Optional[str] = None
+        self._callbacks: List[Callable[[], None]] = []
+        # (단계 이름, 절대 데드라인) 스택 - 가장 이른 데드라인이 적용됨
+        self._deadlines: List[Tuple[str, float]] = []
+        if deadline_seconds:
+            self._deadlines.append(("request", time.monotonic() + deadline_seconds))
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def reason(self) -> Optional[str]:
+        return self._reason
+
+    def cancel(self, reason: str = "cancelled"):
+        """토큰을 취소하고 등록된 콜백(예: 엔진 abort)을 호출합니다."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        취소 시 호출할 콜백을 등록합니다. 이미 취소되었다면 즉시 호출합니다.
+
+        Returns:
+            Callable[[], None]: 콜백 등록을 해제하는 함수
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def _earliest_deadline(self) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            return min(self._deadlines, key=lambda item: item[1]) if self._deadlines else None
+
+    def remaining(self) -> Optional[float]:
+        """가장 이른 데드라인까지 남은 시간 (데드라인이 없으면 None)"""
+        deadline = self._earliest_deadline()
+        if deadline is None:
+            return None
+        return max(deadline[1] - time.monotonic(), 0.0)
+
+    def check(self):
+        """취소되었거나 데드라인을 넘겼으면 GenerationCancelled를 발생시킵니다."""
+        deadline = self._earliest_deadline()
+        if deadline is not None and time.monotonic() >= deadline[1]:
+            self.cancel(f"deadline:{deadline[0]}")
+        if self.cancelled:
+            raise GenerationCancelled(self._reason)
+
+    @contextmanager
+    def stage(self, name: str, seconds: Optional[float] = None):
+        """
+        with 블록 동안 단계별 데드라인을 추가로 적용합니다.
+
+        Args:
+            name (str): 단계 이름 (취소 사유에 기록됨)
+            seconds (float, optional): 단계 데드라인 (None이면 요청 데드라인만 적용)
+        """
+        if not seconds:
+            yield self
+            return
+
+        entry = (name, time.monotonic() + seconds)
+        with self._lock:
+            self._deadlines.append(entry)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._deadlines.remove(entry)
@@ -0,0 +1,129 @@
+"""
+모델 캐스케이드 라우팅
+작은 모델(또는 휴리스틱 스코어러)이 모든 후보를 먼저 채점하고,
+임계값 근처의 애매한 후보만 큰 모델(Midm)로 다시 채점합니다.
+큰 모델은 애매한 후보 채점과 최종 추천사유 작성에만 호출됩니다.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.config import Config
+from src.metrics import metrics
+from src.reranker import build_user_query, create_reranker
+from src.text_normalizer import program_text
+from src.user import User
+
+logger = logging.getLogger(__name__)
+
+# 큰 모델 채점 함수: (사용자, 지원사업 리스트) -> 0~10 점수 리스트
+LargeScorer = Callable[[User, List[Dict]], List[float]]
+
+
+class CascadeRouter:
+    """작은 모델 -> 큰 모델 2계층 캐스케이드 라우터"""
+
+    def __init__(self,
+                 small_scorer=None,
+                 accept_score: Optional[float] = None,
+                 reject_score: Optional[float] = None,
+                 large_threshold: Optional[float] = None,
+                 max_escalations: Optional[int] = None,
+                 max_results: Optional[int] = None):
+        """
+        Args:
+            small_scorer: score(query, texts) -> 0~1 점수 리스트를 제공하는 객체 (None일 경우 설정에 따라 생성)
+            accept_score (float, optional): 작은 모델 점수가 이 값 이상이면 바로 채택 (0~1)
+            reject_score (float, optional): 작은 모델 점수가 이 값 미만이면 바로 제외 (0~1)
+            large_threshold (float, optional): 큰 모델 점수(0~10) 채택 기준
+            max_escalations (int, optional): 요청당 큰 모델로 넘길 최대 후보 수
+            max_results (int, optional): 추천사유를 작성할 최대 지원사업 수
+        """
+        self.small_scorer = small_scorer or create_reranker()
+        self.accept_score = Config.CASCADE_ACCEPT_SCORE if accept_score is None else accept_score
+        self.reject_score = Config.CASCADE_REJECT_SCORE if reject_score is None else reject_score
+        self.large_threshold = Config.CASCADE_LARGE_THRESHOLD if large_threshold is None else large_threshold
+        self.max_escalations = max_escalations or Config.CASCADE_MAX_ESCALATIONS
+        self.max_results = max_results or Config.TWO_STAGE_TOP_K
+
+        if self.reject_score > self.accept_score:
+            raise ValueError("reject_score는 accept_score보다 클 수 없습니다.")
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'small_calls': 0,
+            'small_scored': 0,
+            'accepted_by_small': 0,
+            'rejected_by_small': 0,
+            'escalated': 0,
+            'large_score_calls': 0,
+            'large_explain_calls': 0,
+        }
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self._stats[name] += value
+        metrics.increment(f"cascade.{name}", value)
+
+    def stats(self) -> Dict[str, int]:
+        """계층별 호출 수 통계"""
+        with self._lock:
+            return dict(self._stats)
+
+    def route(self, user: User, programs: List[Dict], large_scorer: LargeScorer) -> List[Tuple[Dict, float]]:
+        """
+        후보를 계층별로 채점하여 추천사유를 작성할 지원사업을 선택합니다.
+
+        Args:
+            user (User): 사용자 정보
+            programs (List[Dict]): 후보 지원사업
+            large_scorer (LargeScorer): 애매한 후보를 채점할 큰 모델 함수
+
+        Returns:
+            List[Tuple[Dict, float]]: (지원사업, 0~1 점수) 리스트 (점수 내림차순)
+        """
+        self._count('requests')
+        if not programs:
+            return []
+
+        # 1계층: 작은 모델로 전체 채점
+        query = build_user_query(user)
+        with metrics.timer("cascade.small_seconds"):
+            small_scores = self.small_scorer.score(query, [program_text(p) for p in programs])
+        self._count('small_calls')
+        self._count('small_scored', len(programs))
+
+        selected: List[Tuple[Dict, float]] = []
+        ambiguous: List[Tuple[Dict, float]] = []
+        for program, score in zip(programs, small_scores):
+            if score >= self.accept_score:
+                selected.append((program, score))
+            elif score >= self.reject_score:
+                ambiguous.append((program, score))
+        self._count('accepted_by_small', len(selected))
+        self._count('rejected_by_small', len(programs) - len(selected) - len(ambiguous))
+
+        # 2계층: 임계값에 가까운 후보부터 큰 모델로 재채점
+        if ambiguous and len(selected) < self.max_results:
+            ambiguous.sort(key=lambda item: item[1], reverse=True)
+            escalated = [program for program, _ in ambiguous[:self.max_escalations]]
+            self._count('escalated', len(escalated))
+            self._count('large_score_calls')
+            with metrics.timer("cascade.large_score_seconds"):
+                large_scores = large_scorer(user, escalated)
+            for program, large_score in zip(escalated, large_scores):
+                if large_score >= self.large_threshold:
+                    selected.append((program, large_score / 10))
+
+        selected.sort(key=lambda item: item[1], reverse=True)
+        selected = selected[:self.max_results]
+        logger.info(
+            f"캐스케이드 라우팅 완료: 후보 {len(programs)}개, 애매한 후보 {len(ambiguous)}개 -> 최종 {len(selected)}개"
+        )
+        return selected
+
+    def record_explanation(self):
+        """큰 모델의 추천사유 작성 호출을 기록합니다."""
+        self._count('large_explain_calls')
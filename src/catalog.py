@@ -0,0 +1,188 @@
+"""
+지원사업 카탈로그 로더
+all_categories.json을 읽어 같은 공고 ID와 유사 중복 공고(MinHash/LSH)를 대표 공고로 묶고,
+대표 공고에서 원본 공고들로 되돌아갈 수 있는 매핑을 함께 제공합니다.
+수집 시 정규화되지 않은 레코드에는 정리된 본문/짧은 요약 필드를 채웁니다. (src.text_normalizer 참고)
+레코드는 JSON dict 대신 메모리 효율적인 SupportProgram으로 보관합니다.
+
+파일이 바뀌지 않았으면(경로, 수정 시각, 크기 기준) 이전에 만든 카탈로그를 재사용합니다.
+새로고침 시에는 새 카탈로그를 옆에서 만든 뒤 swap_catalog()로 파일과 캐시를 함께 교체합니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.config import Config
+from src.dedup import deduplicate_records
+from src.support_program import ProgramColumns, SupportProgram
+from src.text_normalizer import normalize_record, program_text
+
+logger = logging.getLogger(__name__)
+
+
+def program_key(record) -> str:
+    """
+    공고를 구분하는 키 - 공고 ID, 공고 ID가 없으면 공고명 + 정리된 사업요약으로 만든 내용 키 ("content-<해시>")
+    (카탈로그와 매칭 후보 수집에서 같은 공고를 한 번만 쓰는 데 공통으로 사용)
+    """
+    pblanc_id = record.get('pblancId')
+    if pblanc_id:
+        return pblanc_id
+    return "content-" + hashlib.sha1(program_text(record).encode("utf-8")).hexdigest()[:16]
+
+
+class Catalog:
+    """중복이 제거된 지원사업 카탈로그"""
+
+    def __init__(self, raw: Dict[str, dict], dedup: Optional[bool] = None):
+        """
+        Args:
+            raw (Dict[str, dict]): all_categories.json 내용 ({분야: {"jsonArray": [...]}})
+            dedup (bool, optional): 유사 중복 제거 여부 (None일 경우 Config에서 가져옴)
+        """
+        dedup = Config.CATALOG_DEDUP_ENABLED if dedup is None else dedup
+
+        # 같은 공고 ID(공고 ID가 없으면 내용 키, program_key 참고)는 먼저 나온 레코드 하나만 사용
+        # 수집 시 정규화되지 않은(이전 형식) 레코드는 여기서 한 번만 정리된 본문/요약을 만듦
+        unique: Dict[str, SupportProgram] = {}
+        for category_data in raw.values():
+            for record in category_data.get('jsonArray', []):
+                key = program_key(record)
+                if key not in unique:
+                    normalize_record(record)
+                    # 공고 ID가 없는 레코드는 내용 키를 공고 ID로 사용 (색인/스냅샷 ID)
+                    unique[key] = SupportProgram.from_record(record if record.get('pblancId') else {**record, 'pblancId': key})
+        originals = list(unique.values())
+
+        if dedup:
+            canonical, groups = deduplicate_records(originals)
+        else:
+            canonical, groups = originals, {record['pblancId']: [record['pblancId']] for record in originals}
+
+        self.dedup = dedup
+        self.records: List[SupportProgram] = canonical
+        self.by_id: Dict[str, SupportProgram] = unique
+        self._columns: Optional[ProgramColumns] = None
+        # 대표 공고 ID -> 묶인 원본 공고 ID (대표 자신 포함), 원본 공고 ID -> 대표 공고 ID
+        self.duplicates: Dict[str, List[str]] = groups
+        self.canonical_ids: Dict[str, str] = {
+            member: canonical_id for canonical_id, members in groups.items() for member in members
+        }
+
+        # 분야별 (분야 안에서의 원본 인덱스, 대표 공고) - 한 분야에 같은 대표 공고는 한 번만
+        self.categories: Dict[str, List[Tuple[int, SupportProgram]]] = {}
+        for category, category_data in raw.items():
+            if 'jsonArray' not in category_data:
+                continue
+            seen = set()
+            entries = []
+            for index, record in enumerate(category_data['jsonArray']):
+                canonical_id = self.canonical_ids[program_key(record)]
+                if canonical_id in seen:
+                    continue
+                seen.add(canonical_id)
+                entries.append((index, self.by_id[canonical_id]))
+            self.categories[category] = entries
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def columns(self) -> ProgramColumns:
+        """대표 공고의 열 지향 뷰 (records와 같은 행 순서, 처음 접근할 때 생성)"""
+        if self._columns is None:
+            self._columns = ProgramColumns(self.records)
+        return self._columns
+
+    def canonical(self, pblanc_id: str) -> Optional[SupportProgram]:
+        """공고 ID(원본 또는 대표)의 대표 공고"""
+        canonical_id = self.canonical_ids.get(pblanc_id)
+        return self.by_id.get(canonical_id) if canonical_id else None
+
+    def originals(self, pblanc_id: str) -> List[SupportProgram]:
+        """대표 공고로 묶인 모든 원본 공고 (대표 자신 포함)"""
+        canonical_id = self.canonical_ids.get(pblanc_id)
+        return [self.by_id[member] for member in self.duplicates.get(canonical_id, [])]
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[tuple, Catalog] = {}
+
+
+def load_catalog(json_file=None, dedup: Optional[bool] = None) -> Catalog:
+    """
+    카탈로그 파일을 읽습니다. (파일이 바뀌지 않았으면 캐시된 카탈로그 반환)
+
+    Args:
+        json_file: 카탈로그 JSON 경로 (None일 경우 Config.CATALOG_FILE)
+        dedup (bool, optional): 유사 중복 제거 여부 (None일 경우 Config에서 가져옴)
+
+    Returns:
+        Catalog: 카탈로그 (호출자 간에 공유되므로 수정하지 않아야 함)
+    """
+    path = Path(json_file or Config.CATALOG_FILE)
+    dedup = Config.CATALOG_DEDUP_ENABLED if dedup is None else dedup
+
+    with _cache_lock:
+        key = _cache_key(path, dedup)
+        catalog = _cache.get(key)
+        if catalog is None:
+            catalog = Catalog(json.loads(path.read_text(encoding='utf-8')), dedup=dedup)
+            _cache_put(key, catalog)
+            logger.info(f"카탈로그 로드 완료: 공고 {len(catalog.by_id)}개 -> 대표 공고 {len(catalog)}개 ({path})")
+    return catalog
+
+
+def swap_catalog(new_file, json_file, catalog: Catalog):
+    """
+    미리 만든 카탈로그 파일로 현재 카탈로그 파일을 원자적으로 교체합니다.
+    교체와 함께 미리 만든 카탈로그를 캐시에 넣으므로, 교체 직후의 요청도 파일을 다시 파싱하지 않습니다.
+
+    Args:
+        new_file: 새 카탈로그 JSON (json_file과 같은 파일 시스템)
+        json_file: 교체할 카탈로그 JSON 경로
+        catalog (Catalog): new_file 내용으로 만든 카탈로그
+    """
+    path = Path(json_file)
+    with _cache_lock:
+        os.replace(new_file, path)
+        _cache_put(_cache_key(path, catalog.dedup), catalog)
+    logger.info(f"카탈로그 교체 완료: 공고 {len(catalog.by_id)}개 -> 대표 공고 {len(catalog)}개 ({path})")
+
+
+def catalog_stamp(json_file=None) -> Optional[Tuple[int, int, int]]:
+    """
+    카탈로그 파일의 (inode, 수정 시각, 크기) - 파일이 교체/수정되면 바뀝니다.
+    (다른 프로세스가 카탈로그를 교체했는지 확인하는 데 사용, 파일이 없으면 None)
+    """
+    try:
+        stat = os.stat(json_file or Config.CATALOG_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def catalog_file_version(json_file=None) -> Optional[str]:
+    """
+    카탈로그 파일 버전 (catalog_stamp()를 문자열로 만든 값, 파일이 없으면 None)
+    같은 파일을 보는 모든 워커 프로세스에서 같고, 카탈로그가 교체되면 바뀝니다.
+    """
+    stamp = catalog_stamp(json_file)
+    return None if stamp is None else "-".join(f"{value:x}" for value in stamp)
+
+
+def _cache_key(path: Path, dedup: bool) -> tuple:
+    stat = os.stat(path)
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size, dedup)
+
+
+def _cache_put(key: tuple, catalog: Catalog):
+    # 같은 파일의 이전 버전은 제거
+    for old_key in [k for k in _cache if k[0] == key[0]]:
+        del _cache[old_key]
+    _cache[key] = catalog
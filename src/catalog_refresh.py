@@ -0,0 +1,259 @@
+"""
+카탈로그 백그라운드 새로고침
+기업마당 데이터 수집 -> 카탈로그/스냅샷/인덱스 갱신을 요청 처리와 분리된 백그라운드 작업으로 실행합니다.
+
+- 새 카탈로그 파일, 중복 제거된 카탈로그, memory-map 스냅샷은 현재 파일 옆에서 모두 만든 뒤
+  os.replace로 한 번에 교체합니다. (요청은 교체 전에는 이전 카탈로그, 교체 후에는 새 카탈로그를 온전히 읽음)
+  벡터 인덱스 동기화도 교체 전에 마치며, 로컬 인덱스는 새 카탈로그 버전의 세대 디렉터리에 저장합니다.
+- 작업마다 ID를 발급하고 상태(queued/running/succeeded/failed/skipped)를 조회할 수 있습니다.
+  상태는 잠금 파일 옆 디렉터리에 작업별 JSON으로 저장되므로, 작업을 시작한 워커가 아닌 다른 API 워커에서도 조회됩니다.
+- 같은 카탈로그를 새로고침하는 작업은 파일 잠금으로 프로세스(API 워커) 간에도 한 번에 하나만 실행합니다.
+  (다른 워커는 검색 시 카탈로그 파일이 바뀐 것을 보고 BM25 인덱스를 다시 만들고 로컬 인덱스를 다시 읽음)
+- 선택적으로 일정 간격마다 새로고침합니다.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.catalog import Catalog, swap_catalog
+from src.catalog_snapshot import write_catalog_snapshot
+from src.config import Config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def publish_catalog(raw: Dict[str, dict], json_file=None,
+                    prepare: Optional[Callable[[Path, Catalog], Any]] = None) -> Catalog:
+    """
+    새 카탈로그 데이터를 현재 카탈로그 옆에서 준비한 뒤 원자적으로 교체합니다.
+    (새 JSON 파일 -> 카탈로그 -> 인덱스 준비 -> 스냅샷 순서로 만들고, 마지막에 JSON 파일과 카탈로그 캐시를 함께 교체)
+
+    Args:
+        raw (Dict[str, dict]): {분야: {"jsonArray": [...]}} 형식의 새 카탈로그
+        json_file: 교체할 카탈로그 JSON 경로 (None일 경우 Config.CATALOG_FILE)
+        prepare (optional): 교체 전에 호출할 prepare(staged_file, catalog) - 벡터 인덱스 동기화 등
+            (실패하면 카탈로그를 교체하지 않음, 반환한 문서 임베딩 행렬은 스냅샷에 함께 씀)
+
+    Returns:
+        Catalog: 교체된 새 카탈로그
+    """
+    path = Path(json_file or Config.CATALOG_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staged_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(staged_file, "w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False, indent=2)
+        catalog = Catalog(raw)
+        embeddings = prepare(staged_file, catalog) if prepare is not None else None
+        # 스냅샷을 먼저 교체해도 JSON 파일이 바뀌기 전까지는 최신이 아니므로 읽히지 않음
+        write_catalog_snapshot(path, catalog=catalog, staged_file=staged_file, embeddings=embeddings)
+        swap_catalog(staged_file, path, catalog)
+    except BaseException:
+        if staged_file.exists():
+            staged_file.unlink()
+        raise
+    return catalog
+
+
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{12}")
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class RefreshJob:
+    """새로고침 작업 상태"""
+
+    def __init__(self, trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.trigger = trigger  # manual / schedule
+        self.state = 'queued'  # queued / running / succeeded / failed / skipped
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.state in ('queued', 'running')
+
+    def to_dict(self) -> Dict[str, Any]:
+        duration = None
+        if self.started_at and self.finished_at:
+            duration = round((self.finished_at - self.started_at).total_seconds(), 3)
+        return {
+            'job_id': self.id,
+            'trigger': self.trigger,
+            'state': self.state,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_seconds': duration,
+            'result': self.result,
+            'error': self.error
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RefreshJob":
+        """to_dict()로 저장한 작업 상태를 복원합니다."""
+        job = cls(data['trigger'])
+        job.id = data['job_id']
+        job.state = data['state']
+        job.created_at = _parse_time(data['created_at'])
+        job.started_at = _parse_time(data['started_at'])
+        job.finished_at = _parse_time(data['finished_at'])
+        job.result = data['result']
+        job.error = data['error']
+        return job
+
+
+class CatalogRefresher:
+    """새로고침 작업을 백그라운드 스레드에서 하나씩 실행하고 상태를 보관합니다."""
+
+    def __init__(self, refresh: Callable[[], Any], lock_file: Optional[str] = None, history: int = 20):
+        """
+        Args:
+            refresh (Callable[[], Any]): 실제 새로고침 함수 (반환값은 작업 결과로 기록)
+            lock_file (str, optional): 프로세스 간 잠금 파일 (None일 경우 카탈로그 파일 옆의 .refresh.lock)
+                                       작업 상태는 잠금 파일 옆의 .jobs 디렉터리에 저장
+            history (int): 보관할 최근 작업 수
+        """
+        self._refresh = refresh
+        self.lock_file = lock_file or f"{Config.CATALOG_FILE}.refresh.lock"
+        self.jobs_dir = f"{self.lock_file}.jobs"
+        self.history = history
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, RefreshJob]" = OrderedDict()
+        self._current: Optional[RefreshJob] = None
+        self._stop = threading.Event()
+        self._schedule_thread: Optional[threading.Thread] = None
+
+    def submit(self, trigger: str = 'manual') -> RefreshJob:
+        """
+        새로고침 작업을 시작합니다. 이미 대기/실행 중인 작업이 있으면 새로 만들지 않고 그 작업을 반환합니다.
+        (다른 워커에서 실행 중이면 새 작업은 skipped가 되고 result.running_job_id로 실행 중인 작업을 알려줌)
+
+        Returns:
+            RefreshJob: 시작된(또는 진행 중인) 작업
+        """
+        with self._lock:
+            if self._current is not None and self._current.active:
+                return self._current
+            job = RefreshJob(trigger)
+            self._current = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+            self._save(job)
+            self._prune()
+        threading.Thread(target=self._run, args=(job,), name=f"catalog-refresh-{job.id}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        """작업 상태 (다른 워커 프로세스가 실행한 작업 포함, 없으면 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        return self._read(os.path.join(self.jobs_dir, f"{job_id}.json"))
+
+    def jobs(self) -> List[RefreshJob]:
+        """최근 작업 (모든 워커, 오래된 순)"""
+        if not os.path.isdir(self.jobs_dir):
+            return []
+        jobs = [self._read(os.path.join(self.jobs_dir, name)) for name in os.listdir(self.jobs_dir) if name.endswith(".json")]
+        return sorted((job for job in jobs if job is not None), key=lambda job: job.created_at)
+
+    def _save(self, job: RefreshJob):
+        """작업 상태를 파일로 저장합니다. (읽는 쪽이 쓰다 만 파일을 보지 않도록 임시 파일 후 교체)"""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        path = os.path.join(self.jobs_dir, f"{job.id}.json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(job.to_dict(), f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read(path: str) -> Optional[RefreshJob]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return RefreshJob.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _prune(self):
+        """보관 개수를 넘는 오래된 작업 상태 파일을 지웁니다."""
+        files = [entry for entry in os.scandir(self.jobs_dir) if entry.name.endswith(".json")]
+        files.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        for entry in files[:max(len(files) - self.history, 0)]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _run(self, job: RefreshJob):
+        job.state = 'running'
+        job.started_at = datetime.now()
+        self._save(job)
+        start = time.perf_counter()
+        try:
+            # "w"로 열면 실행 중인 작업 ID를 지우므로 잠금을 잡은 뒤에 내용을 씀
+            with open(self.lock_file, "a+") as lock:
+                # 다른 워커 프로세스가 이미 새로고침 중이면 건너뜀 (교체된 카탈로그는 그쪽 작업이 끝나면 보임)
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    lock.seek(0)
+                    job.state = 'skipped'
+                    job.error = "다른 프로세스에서 새로고침이 진행 중입니다."
+                    job.result = {'running_job_id': lock.read().strip() or None}
+                    logger.info(f"카탈로그 새로고침 건너뜀: {job.id} ({job.error})")
+                    return
+                lock.seek(0)
+                lock.truncate()
+                lock.write(job.id)
+                lock.flush()
+                job.result = self._refresh()
+            job.state = 'succeeded'
+            metrics.observe("catalog_refresh.seconds", time.perf_counter() - start)
+            logger.info(f"카탈로그 새로고침 완료: {job.id} ({time.perf_counter() - start:.1f}초)")
+        except Exception as e:
+            job.state = 'failed'
+            job.error = str(e)
+            metrics.increment("catalog_refresh.failed")
+            logger.error(f"카탈로그 새로고침 실패: {job.id} ({e})")
+        finally:
+            job.finished_at = datetime.now()
+            self._save(job)
+
+    def start_schedule(self, interval_seconds: float):
+        """interval_seconds마다 새로고침 작업을 시작합니다. (이미 실행 중이면 무시)"""
+        if self._schedule_thread is not None or interval_seconds <= 0:
+            return
+
+        def loop():
+            while not self._stop.wait(interval_seconds):
+                self.submit('schedule')
+
+        self._schedule_thread = threading.Thread(target=loop, name="catalog-refresh-schedule", daemon=True)
+        self._schedule_thread.start()
+        logger.info(f"카탈로그 정기 새로고침 시작: {interval_seconds:.0f}초 간격")
+
+    def stop(self):
+        """정기 새로고침을 멈춥니다. (진행 중인 작업은 끝까지 실행)"""
+        self._stop.set()
@@ -0,0 +1,308 @@
+"""
+memory-map 카탈로그 스냅샷
+카탈로그를 새로고침할 때 대표 공고의 열(column)들을 하나의 바이너리 파일로 써 두고,
+API 워커들은 이 파일을 읽기 전용 memory-map으로 열어 씁니다.
+
+- JSON 파싱/정규화/중복 제거 없이 밀리초 단위로 열림
+- 공고 ID/공고명/짧은 요약/정리된 본문/해시태그(UTF-8 바이트 + 오프셋), 분야/기관 코드, 신청기간,
+  문서 임베딩 행렬을 복사 없이(zero-copy) 읽음
+- 같은 파일을 여는 모든 프로세스가 OS 페이지 캐시를 공유하므로 워커 수와 관계없이 메모리는 한 벌
+- 워커별 인덱스(로컬 벡터 인덱스, BM25, reranker idf)도 JSON 카탈로그 대신 스냅샷으로 만듦
+
+파일 구성:
+    MAGIC(8바이트) + 헤더 길이(uint64) + 헤더(JSON) + 64바이트 정렬된 배열들
+새 스냅샷은 임시 파일에 쓴 뒤 교체하므로, 이미 열려 있는 스냅샷은 닫을 때까지 이전 내용을 그대로 읽습니다.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.catalog import Catalog, load_catalog
+from src.config import Config
+from src.support_program import split_hashtags
+from src.text_normalizer import CLEAN_FIELD, clean_summary, program_text, short_summary
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KTCATSN1"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+_HEADER_LENGTH = struct.Struct("<Q")
+
+
+class StringColumn:
+    """memory-map된 UTF-8 문자열 열 (오프셋 배열 + 바이트 배열)"""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, row: int) -> memoryview:
+        """행의 UTF-8 바이트 (복사 없이 memory-map을 가리킴)"""
+        return memoryview(self.data[self.offsets[row]:self.offsets[row + 1]])
+
+    def __getitem__(self, row: int) -> str:
+        return str(self.raw(row), "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for row in range(len(self)):
+            yield self[row]
+
+
+def _encode_strings(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _encode_codes(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[str]]:
+    table: Dict[str, int] = {}
+    codes = np.fromiter((table.setdefault(value or "", len(table)) for value in values), dtype=np.int32, count=len(values))
+    return codes, list(table)
+
+
+def write_snapshot(catalog: Catalog, path, source: Optional[Dict[str, Any]] = None,
+                   embeddings: Optional[np.ndarray] = None) -> str:
+    """
+    카탈로그 스냅샷 파일을 씁니다. (임시 파일에 쓴 뒤 교체)
+
+    Args:
+        catalog (Catalog): 카탈로그 (대표 공고 순서가 스냅샷 행 순서)
+        path: 스냅샷 파일 경로
+        source (Dict[str, Any], optional): 원본 카탈로그 파일 정보 (path, mtime_ns, size, dedup) - 최신 여부 확인용
+        embeddings (np.ndarray, optional): (대표 공고 수, 차원) 정규화된 문서 임베딩 (로컬 인덱스의 벡터)
+
+    Returns:
+        str: 스냅샷 파일 경로
+    """
+    records = catalog.records
+    rows = {record['pblancId']: row for row, record in enumerate(records)}
+
+    columns: Dict[str, np.ndarray] = {}
+    for name, values in (
+        ("id", [record['pblancId'] for record in records]),
+        ("name", [record.get('pblancNm') for record in records]),
+        ("summary", [short_summary(record) for record in records]),
+        ("text", [clean_summary(record) for record in records]),
+        ("hashtags", [",".join(split_hashtags(record.get('hashtags'))) for record in records]),
+        ("file_path", [record.get('fileNm') for record in records]),
+    ):
+        columns[f"{name}_offsets"], columns[f"{name}_data"] = _encode_strings(values)
+    columns["category"], category_names = _encode_codes([record.get('pldirSportRealmLclasCodeNm') for record in records])
+    columns["region"], region_names = _encode_codes([record.get('jrsdInsttNm') for record in records])
+    periods = np.array([record.application_period for record in records], dtype=np.int32).reshape(-1, 2)
+    columns["reqst_begin"] = np.ascontiguousarray(periods[:, 0])
+    columns["reqst_end"] = np.ascontiguousarray(periods[:, 1])
+
+    # 분야별 목록 (분야 안에서의 원본 인덱스, 행 번호) - 분야마다 [시작, 끝) 구간
+    entry_index, entry_row, sections = [], [], {}
+    for category, entries in catalog.categories.items():
+        sections[category] = [len(entry_index), len(entry_index) + len(entries)]
+        for index, record in entries:
+            entry_index.append(index)
+            entry_row.append(rows[record['pblancId']])
+    columns["entry_index"] = np.array(entry_index, dtype=np.int32)
+    columns["entry_row"] = np.array(entry_row, dtype=np.int32)
+
+    if embeddings is not None:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.shape[0] != len(records):
+            raise ValueError(f"임베딩 행 수가 대표 공고 수와 다릅니다: {embeddings.shape[0]} != {len(records)}")
+        columns["embeddings"] = embeddings
+
+    layout, offset = {}, 0
+    for name, array in columns.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "rows": len(records),
+        "source": source,
+        "category_names": category_names,
+        "region_names": region_names,
+        "categories": sections,
+        "columns": layout,
+    }, ensure_ascii=False).encode("utf-8")
+    prefix_length = len(MAGIC) + _HEADER_LENGTH.size + len(header)
+    padding = -prefix_length % ALIGNMENT
+
+    path = str(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header + b"\0" * padding)
+        for name, array in columns.items():
+            f.write(array.tobytes())
+            f.write(b"\0" * (-array.nbytes % ALIGNMENT))
+    os.replace(tmp_path, path)
+
+    logger.info(f"카탈로그 스냅샷 저장 완료: 대표 공고 {len(records)}개, "
+                f"임베딩 {'있음' if embeddings is not None else '없음'}, {os.path.getsize(path) / 1e6:.1f}MB ({path})")
+    return path
+
+
+def write_catalog_snapshot(json_file=None, path=None, catalog: Optional[Catalog] = None,
+                           staged_file=None, embeddings: Optional[np.ndarray] = None) -> Optional[str]:
+    """
+    카탈로그 JSON 파일로 스냅샷을 씁니다. (카탈로그 새로고침/인덱스 동기화 후 호출)
+
+    Args:
+        json_file: 카탈로그 JSON 경로 (None일 경우 Config.CATALOG_FILE)
+        path: 스냅샷 파일 경로 (None일 경우 Config.CATALOG_SNAPSHOT_FILE, 비어 있으면 쓰지 않음)
+        catalog (Catalog, optional): 이미 만든 카탈로그 (None일 경우 json_file을 읽음)
+        staged_file (optional): 곧 json_file로 교체될 새 카탈로그 파일 (교체 전에 스냅샷을 미리 쓸 때)
+        embeddings (np.ndarray, optional): 대표 공고 순서의 문서 임베딩 (None일 경우 임베딩 열 없이 씀)
+
+    Returns:
+        Optional[str]: 스냅샷 파일 경로 (스냅샷이 비활성화되어 있으면 None)
+    """
+    path = path or Config.CATALOG_SNAPSHOT_FILE
+    if not path:
+        return None
+    json_file = Path(json_file or Config.CATALOG_FILE)
+    if catalog is None:
+        catalog = load_catalog(json_file)
+    return write_snapshot(catalog, path, source=source_info(json_file, staged_file, catalog.dedup), embeddings=embeddings)
+
+
+def source_info(json_file, staged_file=None, dedup: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    스냅샷 최신 여부 확인용 카탈로그 파일 정보
+    (staged_file을 주면 그 파일이 json_file로 교체된 뒤의 정보 - os.replace는 수정 시각과 크기를 유지)
+    """
+    path = Path(json_file)
+    stat = os.stat(staged_file or path)
+    return {"path": str(path.resolve()), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+            "dedup": Config.CATALOG_DEDUP_ENABLED if dedup is None else dedup}
+
+
+class CatalogSnapshot:
+    """읽기 전용 memory-map 카탈로그 스냅샷"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: write_snapshot()으로 쓴 스냅샷 파일 경로
+        """
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            # 매핑은 파일을 닫은 뒤에도 유지되고, 파일이 교체되어도 연 시점의 내용을 가리킴
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self._mmap
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"카탈로그 스냅샷 파일이 아닙니다: {self.path}")
+        (header_length,) = _HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        header = json.loads(bytes(buffer[header_start:header_start + header_length]).decode("utf-8"))
+        if header["format"] != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 형식입니다: {header['format']}")
+        data_start = header_start + header_length
+        data_start += -data_start % ALIGNMENT
+
+        arrays = {}
+        for name, spec in header["columns"].items():
+            shape = tuple(spec["shape"])
+            arrays[name] = np.frombuffer(
+                buffer, dtype=np.dtype(spec["dtype"]), count=int(np.prod(shape)), offset=data_start + spec["offset"]
+            ).reshape(shape)
+
+        self.size: int = header["rows"]
+        self.source: Optional[Dict[str, Any]] = header["source"]
+        self.ids = StringColumn(arrays["id_offsets"], arrays["id_data"])
+        self.names = StringColumn(arrays["name_offsets"], arrays["name_data"])
+        self.summaries = StringColumn(arrays["summary_offsets"], arrays["summary_data"])
+        self.texts = StringColumn(arrays["text_offsets"], arrays["text_data"])
+        self.hashtags = StringColumn(arrays["hashtags_offsets"], arrays["hashtags_data"])
+        self.file_paths = StringColumn(arrays["file_path_offsets"], arrays["file_path_data"])
+        self.category: np.ndarray = arrays["category"]
+        self.category_names: List[str] = header["category_names"]
+        self.region: np.ndarray = arrays["region"]
+        self.region_names: List[str] = header["region_names"]
+        self.reqst_begin: np.ndarray = arrays["reqst_begin"]
+        self.reqst_end: np.ndarray = arrays["reqst_end"]
+        # (행 수, 차원) 문서 임베딩 - 로컬 벡터 인덱스로 만든 스냅샷에만 있음
+        self.embeddings: Optional[np.ndarray] = arrays.get("embeddings")
+        self._sections: Dict[str, List[int]] = header["categories"]
+        self._entry_index: np.ndarray = arrays["entry_index"]
+        self._entry_row: np.ndarray = arrays["entry_row"]
+        self._rows: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._sections)
+
+    def category_entries(self, category: str) -> List[Tuple[int, int]]:
+        """분야의 (분야 안에서의 원본 인덱스, 행 번호) 목록 (Catalog.categories와 같은 순서)"""
+        start, end = self._sections.get(category, (0, 0))
+        return list(zip(self._entry_index[start:end].tolist(), self._entry_row[start:end].tolist()))
+
+    def program_text(self, row: int) -> str:
+        """행의 공고 텍스트 (text_normalizer.program_text와 같은 형식)"""
+        return program_text({"pblancNm": self.names[row], CLEAN_FIELD: self.texts[row]})
+
+    def row(self, pblanc_id: str) -> Optional[int]:
+        """대표 공고 ID의 행 번호 (처음 호출할 때 ID 색인 생성)"""
+        if self._rows is None:
+            self._rows = {pblanc_id: row for row, pblanc_id in enumerate(self.ids)}
+        return self._rows.get(pblanc_id)
+
+    def is_current(self, json_file=None) -> bool:
+        """스냅샷이 현재 카탈로그 파일(수정 시각, 크기, 중복 제거 설정)로 만든 것인지 확인합니다."""
+        if not self.source:
+            return False
+        try:
+            return source_info(json_file or Config.CATALOG_FILE) == self.source
+        except OSError:
+            return False
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Tuple[tuple, CatalogSnapshot]] = {}
+
+
+def load_snapshot(path=None) -> Optional[CatalogSnapshot]:
+    """
+    스냅샷을 memory-map으로 엽니다. (파일이 교체되지 않았으면 이전에 연 스냅샷 반환)
+
+    Args:
+        path: 스냅샷 파일 경로 (None일 경우 Config.CATALOG_SNAPSHOT_FILE)
+
+    Returns:
+        Optional[CatalogSnapshot]: 스냅샷 (비활성화되어 있거나 파일이 없거나 이전 형식이면 None)
+    """
+    path = path or Config.CATALOG_SNAPSHOT_FILE
+    if not path or not os.path.exists(path):
+        return None
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            snapshot = CatalogSnapshot(path)
+        except ValueError as e:
+            # 이전 형식의 스냅샷은 다음 새로고침/동기화에서 다시 쓰기 전까지 JSON 카탈로그를 읽음
+            logger.warning(f"카탈로그 스냅샷을 사용하지 않습니다: {e}")
+            return None
+        _cache[path] = (key, snapshot)
+        logger.info(f"카탈로그 스냅샷 열기: 대표 공고 {len(snapshot)}개 ({path})")
+    return snapshot
@@ -25,6 +25,78 @@ class Config:
     OUTPUT_DIR: str = os.path.dirname(__file__)
     DEFAULT_FILENAME_PREFIX: str = "bizinfo_data"
     
+    # 임베딩 설정
+    EMBEDDING_MODEL: str = os.getenv('EMBEDDING_MODEL', 'intfloat/multilingual-e5-large')
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv('EMBEDDING_BATCH_SIZE', '32'))
+    EMBEDDING_CACHE_DIR: str = os.getenv(
+        'EMBEDDING_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'data', 'embedding_cache')
+    )  # 빈 문자열이면 캐시 비활성화
+    EMBEDDING_CACHE_DTYPE: str = os.getenv('EMBEDDING_CACHE_DTYPE', 'fp32')  # fp32 / fp16 (기존 캐시는 저장된 형식 유지)
+    QUERY_CACHE_SIZE: int = int(os.getenv('QUERY_CACHE_SIZE', '1024'))  # 검색 질의 임베딩 LRU 캐시 크기 (질의는 디스크 캐시에 저장하지 않음)
+    QUERY_CACHE_TTL_SECONDS: float = float(os.getenv('QUERY_CACHE_TTL_SECONDS', '3600'))
+
+    # 벡터 저장소 설정 ('pinecone': Pinecone 서비스, 'local': 프로세스 내 로컬 인덱스)
+    VECTOR_BACKEND: str = os.getenv('VECTOR_BACKEND', 'pinecone')
+    PINECONE_API_KEY: Optional[str] = os.getenv('PINECONE_API_KEY')
+    PINECONE_INDEX_NAME: str = os.getenv('PINECONE_INDEX_NAME', 'kt-agent')
+    LOCAL_INDEX_PATH: str = os.getenv(
+        'LOCAL_INDEX_PATH', os.path.join(os.path.dirname(__file__), 'data', 'local_index')
+    )
+    LOCAL_INDEX_ANN_THRESHOLD: int = int(os.getenv('LOCAL_INDEX_ANN_THRESHOLD', '50000'))  # 이 개수 이상이면 IVF 근사 검색
+    LOCAL_INDEX_NPROBE: int = int(os.getenv('LOCAL_INDEX_NPROBE', '8'))
+    # 벡터 압축 (로컬 인덱스 1차 검색용): fp32 / fp16 / int8, 축소 차원(0이면 원본), pca / matryoshka
+    VECTOR_CODEC_DTYPE: str = os.getenv('VECTOR_CODEC_DTYPE', 'fp32')
+    VECTOR_CODEC_DIM: int = int(os.getenv('VECTOR_CODEC_DIM', '0'))
+    VECTOR_CODEC_REDUCTION: str = os.getenv('VECTOR_CODEC_REDUCTION', 'pca')
+    VECTOR_RESCORE_FACTOR: int = int(os.getenv('VECTOR_RESCORE_FACTOR', '10'))  # 0이면 원본 벡터 재채점 안 함
+
+    # 업서트 설정 (Pinecone 요청 제한: 2MB, 1000개)
+    UPSERT_BATCH_SIZE: int = int(os.getenv('UPSERT_BATCH_SIZE', '100'))
+    UPSERT_MAX_BYTES: int = int(os.getenv('UPSERT_MAX_BYTES', str(2 * 1000 * 1000)))
+    UPSERT_MAX_WORKERS: int = int(os.getenv('UPSERT_MAX_WORKERS', '4'))
+    UPSERT_MAX_RETRIES: int = int(os.getenv('UPSERT_MAX_RETRIES', '3'))
+    UPSERT_RETRY_BACKOFF: float = float(os.getenv('UPSERT_RETRY_BACKOFF', '0.5'))
+    UPSERT_EMBED_CHUNK: int = int(os.getenv('UPSERT_EMBED_CHUNK', '256'))  # 한 번에 임베딩할 레코드 수
+    RECONCILE_FETCH_BATCH: int = int(os.getenv('RECONCILE_FETCH_BATCH', '100'))  # 저장된 해시 조회 배치
+    DELETE_BATCH_SIZE: int = int(os.getenv('DELETE_BATCH_SIZE', '1000'))  # Pinecone 삭제 요청당 최대 ID 수
+
+    # 검색 설정
+    CATALOG_FILE: str = os.getenv('CATALOG_FILE', os.path.join(os.path.dirname(__file__), 'data', 'all_categories.json'))
+    # 워커 프로세스들이 memory-map으로 공유하는 카탈로그 스냅샷 (새로고침/동기화 때 갱신, 빈 문자열이면 비활성화)
+    CATALOG_SNAPSHOT_FILE: str = os.getenv(
+        'CATALOG_SNAPSHOT_FILE', os.path.join(os.path.dirname(__file__), 'data', 'catalog.snapshot')
+    )
+    # 카탈로그 새로고침 (백그라운드 작업, 0이면 정기 새로고침 안 함)
+    CATALOG_REFRESH_INTERVAL_SECONDS: float = float(os.getenv('CATALOG_REFRESH_INTERVAL_SECONDS', '0'))
+    CATALOG_REFRESH_CATEGORIES = [
+        category.strip() for category in os.getenv('CATALOG_REFRESH_CATEGORIES', '기술,경영,금융,창업').split(',') if category.strip()
+    ]
+    CATALOG_DEDUP_ENABLED: bool = os.getenv('CATALOG_DEDUP_ENABLED', 'true').lower() == 'true'  # 유사 중복 공고를 대표 공고로 묶음
+    DEDUP_THRESHOLD: float = float(os.getenv('DEDUP_THRESHOLD', '0.8'))  # 같은 공고로 볼 shingle Jaccard 유사도
+    DEDUP_SHINGLE_SIZE: int = int(os.getenv('DEDUP_SHINGLE_SIZE', '3'))  # 글자 n-gram 크기
+    DEDUP_NUM_PERM: int = int(os.getenv('DEDUP_NUM_PERM', '128'))  # MinHash 서명 길이
+    DEDUP_BANDS: int = int(os.getenv('DEDUP_BANDS', '32'))  # LSH 밴드 수 (DEDUP_NUM_PERM의 약수)
+    SUMMARY_MAX_SENTENCES: int = int(os.getenv('SUMMARY_MAX_SENTENCES', '3'))  # 수집 시 만드는 짧은 요약의 최대 문장 수
+    SUMMARY_MAX_CHARS: int = int(os.getenv('SUMMARY_MAX_CHARS', '300'))
+    SEARCH_MODE: str = os.getenv('SEARCH_MODE', 'dense')  # dense / hybrid
+    HYBRID_CANDIDATE_K: int = int(os.getenv('HYBRID_CANDIDATE_K', '50'))  # RRF 결합 전 검색기별 후보 수
+    RRF_K: int = int(os.getenv('RRF_K', '60'))
+    SEARCH_MAX_WORKERS: int = int(os.getenv('SEARCH_MAX_WORKERS', '4'))
+
+    # RAG 설정
+    RAG_TOP_K: int = int(os.getenv('RAG_TOP_K', '30'))
+    RAG_RETRIEVAL_CACHE_SIZE: int = int(os.getenv('RAG_RETRIEVAL_CACHE_SIZE', '256'))
+    RAG_RETRIEVAL_CACHE_TTL_SECONDS: float = float(os.getenv('RAG_RETRIEVAL_CACHE_TTL_SECONDS', '600'))
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv('CONTEXT_TOKEN_BUDGET', '1500'))  # 컨텍스트 전체 토큰 예산
+    CONTEXT_PASSAGE_TOKENS: int = int(os.getenv('CONTEXT_PASSAGE_TOKENS', '250'))  # 문서 하나에 쓸 최대 토큰 수
+    CONTEXT_MAX_DOCS: int = int(os.getenv('CONTEXT_MAX_DOCS', '8'))
+    CONTEXT_MMR_LAMBDA: float = float(os.getenv('CONTEXT_MMR_LAMBDA', '0.7'))
+    CONTEXT_DEDUP_THRESHOLD: float = float(os.getenv('CONTEXT_DEDUP_THRESHOLD', '0.8'))
+    SEMANTIC_CACHE_SIZE: int = int(os.getenv('SEMANTIC_CACHE_SIZE', '512'))  # 0이면 시맨틱 답변 캐시 비활성화
+    SEMANTIC_CACHE_TTL_SECONDS: float = float(os.getenv('SEMANTIC_CACHE_TTL_SECONDS', '3600'))
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.93'))  # e5 질의 임베딩 코사인 유사도
+    RAG_STREAM_ENABLED: bool = os.getenv('RAG_STREAM_ENABLED', 'false').lower() == 'true'  # 백엔드 스트리밍 추천 API 사용 여부
+
     # 로깅 설정
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = '%(asctime)s - %(levelname)s - %(message)s'
@@ -33,6 +105,48 @@ class Config:
     REQUEST_TIMEOUT: int = 30
     MAX_RETRIES: int = 3
     
+    # Transformers (GPU가 없을 때의 CPU 서빙) 설정
+    TRANSFORMER_DEVICE: str = os.getenv('TRANSFORMER_DEVICE', 'auto')  # auto / cpu / cuda
+    TRANSFORMER_CPU_DTYPE: str = os.getenv('TRANSFORMER_CPU_DTYPE', 'int8')  # int8 / bf16 / fp32
+    TRANSFORMER_BATCH_SIZE: int = int(os.getenv('TRANSFORMER_BATCH_SIZE', '4'))
+    TRANSFORMER_NUM_THREADS: int = int(os.getenv('TRANSFORMER_NUM_THREADS', '0'))  # 0이면 torch 기본값
+    
+    # 매칭 설정
+    MATCHING_MODE: str = os.getenv('MATCHING_MODE', 'llm')  # llm / two_stage / cascade
+    TWO_STAGE_RECALL_K: int = int(os.getenv('TWO_STAGE_RECALL_K', '30'))
+    TWO_STAGE_TOP_K: int = int(os.getenv('TWO_STAGE_TOP_K', '5'))
+    RERANKER_MODEL: str = os.getenv('RERANKER_MODEL', '')  # 비어 있으면 lexical 스코어링 헤드 사용
+    
+    # 캐스케이드 라우팅 설정 (작은 모델 점수는 0~1, 큰 모델 점수는 0~10)
+    CASCADE_ACCEPT_SCORE: float = float(os.getenv('CASCADE_ACCEPT_SCORE', '0.6'))
+    CASCADE_REJECT_SCORE: float = float(os.getenv('CASCADE_REJECT_SCORE', '0.2'))
+    CASCADE_LARGE_THRESHOLD: float = float(os.getenv('CASCADE_LARGE_THRESHOLD', '7'))
+    CASCADE_MAX_ESCALATIONS: int = int(os.getenv('CASCADE_MAX_ESCALATIONS', '10'))
+    
+    # 서비스 기동 설정
+    WARMUP_ENABLED: bool = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+    WARMUP_MAX_TOKENS: int = int(os.getenv('WARMUP_MAX_TOKENS', '16'))
+    
+    # 요청 취소 / 데드라인 설정 (챗봇 aiService 타임아웃 30초보다 짧게)
+    # false면 langchain VLLM 사용 (연결이 끊겨도 생성을 중단하지 못함)
+    VLLM_ABORTABLE: bool = os.getenv('VLLM_ABORTABLE', 'true').lower() == 'true'
+    REQUEST_DEADLINE_SECONDS: float = float(os.getenv('REQUEST_DEADLINE_SECONDS', '28'))
+    STAGE_DEADLINE_SECONDS = {
+        'match': float(os.getenv('MATCH_DEADLINE_SECONDS', '25')),
+        'score': float(os.getenv('SCORE_DEADLINE_SECONDS', '10')),
+        'explain': float(os.getenv('EXPLAIN_DEADLINE_SECONDS', '15')),
+    }
+
+    # 추론 서버 / API 워커 분리 설정
+    # 주소를 지정하면 모델은 추론 서버 프로세스 하나만 로드하고, API 워커들은 로컬 소켓으로 생성을 요청
+    # (유닉스 소켓 경로 또는 루프백 "host:port", 비어 있으면 각 프로세스가 모델을 직접 로드)
+    INFERENCE_SERVER_ADDRESS: str = os.getenv('INFERENCE_SERVER_ADDRESS', '')
+    INFERENCE_SERVER_AUTHKEY: str = os.getenv('INFERENCE_SERVER_AUTHKEY', '')  # 비어 있으면 함께 실행하는 추론 서버용 임의 키를 생성
+    INFERENCE_SERVER_SPAWN: bool = os.getenv('INFERENCE_SERVER_SPAWN', 'true').lower() == 'true'  # backend/main.py가 추론 서버를 함께 실행
+    INFERENCE_SERVER_MAX_CONCURRENCY: int = int(os.getenv('INFERENCE_SERVER_MAX_CONCURRENCY', '64'))  # 동시에 엔진에 넣을 최대 요청 수
+    INFERENCE_SERVER_CONNECT_TIMEOUT: float = float(os.getenv('INFERENCE_SERVER_CONNECT_TIMEOUT', '900'))  # 워커가 서버 기동(모델 로드)을 기다리는 시간
+    API_WORKERS: int = int(os.getenv('API_WORKERS', '1'))
+    
     @classmethod
     def get_api_key(cls) -> Optional[str]:
         """API 키를 반환합니다."""
@@ -0,0 +1,173 @@
+"""
+RAG 컨텍스트 압축
+검색된 문서를 그대로 이어 붙이지 않고 다음 순서로 프롬프트 컨텍스트를 만듭니다.
+
+1. 중복 제거: 토큰 집합의 Jaccard 유사도가 높은 문서는 상위 순위 하나만 남김
+2. MMR: 질의 관련성과 이미 고른 문서와의 차별성을 함께 고려해 문서 선택
+3. 토큰 예산 패킹: 문서마다 질의와 관련 높은 문장만 남겨 전체 토큰 예산 안에 담음
+"""
+
+import logging
+import math
+from collections import Counter
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+from src.bm25 import strip_html, tokenize
+from src.config import Config
+from src.metrics import metrics
+from src.text_normalizer import split_sentences
+
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 쓰는 토큰 수 추정치 (한글은 글자당 약 1토큰, 그 외는 4글자당 약 1토큰)
+    정확한 값이 필요하면 ContextBuilder에 LLM 토크나이저 기반 함수를 넘겨 사용합니다.
+    """
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(freq * b.get(term, 0) for term, freq in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+class ContextBuilder:
+    """중복 제거 + MMR + 토큰 예산 패킹 컨텍스트 빌더"""
+
+    def __init__(self,
+                 token_budget: Optional[int] = None,
+                 passage_tokens: Optional[int] = None,
+                 max_docs: Optional[int] = None,
+                 mmr_lambda: Optional[float] = None,
+                 dedup_threshold: Optional[float] = None,
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        """
+        Args:
+            token_budget (int, optional): 컨텍스트 전체 토큰 예산
+            passage_tokens (int, optional): 문서 하나에 쓸 최대 토큰 수
+            max_docs (int, optional): 컨텍스트에 넣을 최대 문서 수
+            mmr_lambda (float, optional): MMR 관련성 가중치 (1이면 관련성만, 0이면 다양성만)
+            dedup_threshold (float, optional): 이 값 이상의 Jaccard 유사도면 중복으로 판단
+            token_counter (Callable[[str], int]): 토큰 수 계산 함수
+            (None인 설정값은 Config에서 가져옴)
+        """
+        self.token_budget = token_budget or Config.CONTEXT_TOKEN_BUDGET
+        self.passage_tokens = passage_tokens or Config.CONTEXT_PASSAGE_TOKENS
+        self.max_docs = max_docs or Config.CONTEXT_MAX_DOCS
+        self.mmr_lambda = Config.CONTEXT_MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+        self.dedup_threshold = Config.CONTEXT_DEDUP_THRESHOLD if dedup_threshold is None else dedup_threshold
+        self.count_tokens = token_counter
+
+    @staticmethod
+    def _text(doc: Document) -> str:
+        return strip_html(doc.page_content or "")
+
+    def deduplicate(self, docs: Sequence[Document]) -> List[Document]:
+        """거의 같은 내용의 문서는 순위가 높은 것만 남깁니다."""
+        kept: List[Document] = []
+        kept_terms: List[set] = []
+        for doc in docs:
+            terms = set(tokenize(self._text(doc)))
+            duplicate = any(
+                terms and other and len(terms & other) / len(terms | other) >= self.dedup_threshold
+                for other in kept_terms
+            )
+            if not duplicate:
+                kept.append(doc)
+                kept_terms.append(terms)
+        return kept
+
+    def select_mmr(self, query: str, docs: Sequence[Document]) -> List[Document]:
+        """MMR(Maximal Marginal Relevance)로 관련성 높고 서로 겹치지 않는 문서를 고릅니다."""
+        if len(docs) <= 1:
+            return list(docs)
+
+        query_vector = Counter(tokenize(query))
+        doc_vectors = [Counter(tokenize(self._text(doc))) for doc in docs]
+        # 관련성: 검색 순위(1 / (1 + rank))와 질의 토큰 코사인 유사도의 평균
+        relevance = [
+            (1.0 / (1 + rank) + _cosine(query_vector, vector)) / 2
+            for rank, vector in enumerate(doc_vectors)
+        ]
+
+        selected: List[int] = []
+        remaining = list(range(len(docs)))
+        while remaining and len(selected) < self.max_docs:
+            def mmr_score(i: int) -> float:
+                redundancy = max((_cosine(doc_vectors[i], doc_vectors[j]) for j in selected), default=0.0)
+                return self.mmr_lambda * relevance[i] - (1 - self.mmr_lambda) * redundancy
+
+            best = max(remaining, key=mmr_score)
+            selected.append(best)
+            remaining.remove(best)
+        return [docs[i] for i in selected]
+
+    def compress(self, query: str, doc: Document, max_tokens: int) -> str:
+        """문서에서 질의와 관련 높은 문장을 원래 순서대로 max_tokens 안에서 남깁니다."""
+        sentences = split_sentences(self._text(doc))
+        query_terms = set(tokenize(query))
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: (len(query_terms & set(tokenize(sentences[i]))), -i),
+            reverse=True
+        )
+
+        keep, used = set(), 0
+        for i in ranked:
+            cost = self.count_tokens(sentences[i])
+            if used + cost > max_tokens:
+                continue
+            keep.add(i)
+            used += cost
+        if not keep and sentences:
+            # 첫 문장도 예산을 넘으면 글자 수 기준으로 자름
+            first = sentences[ranked[0]]
+            return first[:max(max_tokens, 1)]
+        return " ".join(sentences[i] for i in sorted(keep))
+
+    def build(self, query: str, docs: Sequence[Document]) -> Optional[str]:
+        """
+        검색 결과로 프롬프트 컨텍스트를 만듭니다.
+
+        Args:
+            query (str): 사용자 질의
+            docs (Sequence[Document]): 검색 순위순 문서
+
+        Returns:
+            Optional[str]: 컨텍스트 문자열 (문서가 없으면 None)
+        """
+        if not docs:
+            logger.info("✅ 해당하는 문서가 없습니다!")
+            return None
+
+        unique = self.deduplicate(docs)
+        selected = self.select_mmr(query, unique)
+
+        passages, used = [], 0
+        for doc in selected:
+            title = doc.metadata.get("title") or ""
+            header = f"[{title}]\n" if title else ""
+            budget = min(self.passage_tokens, self.token_budget - used - self.count_tokens(header))
+            if budget <= 0:
+                break
+            body = self.compress(query, doc, budget)
+            if not body:
+                continue
+            passage = header + body
+            passages.append(passage)
+            used += self.count_tokens(passage)
+
+        metrics.record("rag.context_tokens", used)
+        metrics.record("rag.context_docs", len(passages))
+        logger.info(
+            f"✅ 컨텍스트 구성: 검색 {len(docs)}개 -> 중복 제거 {len(unique)}개 -> 선택 {len(passages)}개, 약 {used} 토큰"
+        )
+        logger.debug(f"컨텍스트 문서: {[doc.metadata.get('id') for doc in selected]}")
+        return "\n\n".join(passages) if passages else None
@@ -3,120 +3,743 @@ from dotenv import load_dotenv
 import os
 import logging
 import json
+import time
+import hashlib
+import shutil
+import threading
+from datetime import date
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from langchain_pinecone import PineconeVectorStore
+from langchain_core.documents import Document
 from pathlib import Path
 from langchain_huggingface import HuggingFaceEmbeddings 
+from src.config import Config
+from src.metrics import metrics
+from src.embedding_cache import E5_PASSAGE_PREFIX, E5_QUERY_PREFIX, EmbeddingCache, normalize_text
+from src.local_index import LocalIndex, match_filter
+from src.vector_upsert import parallel_upsert
+from src.ttl_cache import TTLCache
+from src.bm25 import BM25Index
+from src.catalog import Catalog, catalog_file_version, catalog_stamp, load_catalog
+from src.catalog_snapshot import CatalogSnapshot, load_snapshot, write_catalog_snapshot
+from src.support_program import ProgramColumns, parse_application_period, split_hashtags
+from src.text_normalizer import clean_summary, short_summary
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("dbconection")
 
 
+def _date_key(value: Union[int, str, date]) -> int:
+    """날짜(date, 'YYYY-MM-DD', 'YYYYMMDD', YYYYMMDD 정수)를 YYYYMMDD 정수로 변환합니다."""
+    if isinstance(value, date):
+        return int(value.strftime("%Y%m%d"))
+    return int(str(value).replace("-", ""))
+
+
+def _as_list(value) -> List:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def build_index_filter(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    검색 조건을 인덱스 메타데이터 필터(Pinecone 문법)로 변환합니다.
+
+    Args:
+        filters (Dict[str, Any]): 검색 조건 (모두 선택, 여러 조건은 AND)
+            - category: 지원분야 (예: "기술" 또는 ["기술", "경영"])
+            - jrsdInsttNm: 소관기관 (예: "중소벤처기업부")
+            - hashtags: 해시태그 중 하나라도 일치 (예: ["AI", "제조"])
+            - open_on: 이 날짜에 신청 가능한 공고 (date / "YYYY-MM-DD" / YYYYMMDD)
+            - ends_after: 신청 마감일이 이 날짜 이후인 공고
+
+    Returns:
+        Optional[Dict[str, Any]]: 인덱스 필터 (조건이 없으면 None)
+    """
+    if not filters:
+        return None
+
+    unknown = set(filters) - {"category", "jrsdInsttNm", "hashtags", "open_on", "ends_after"}
+    if unknown:
+        raise ValueError(f"지원하지 않는 검색 조건입니다: {sorted(unknown)}")
+
+    conditions = []
+    if filters.get("category"):
+        conditions.append({"category": {"$in": _as_list(filters["category"])}})
+    if filters.get("jrsdInsttNm"):
+        conditions.append({"region": {"$in": _as_list(filters["jrsdInsttNm"])}})
+    if filters.get("hashtags"):
+        conditions.append({"hashtags": {"$in": _as_list(filters["hashtags"])}})
+    if filters.get("open_on"):
+        day = _date_key(filters["open_on"])
+        conditions.append({"reqst_begin": {"$lte": day}})
+        conditions.append({"reqst_end": {"$gte": day}})
+    if filters.get("ends_after"):
+        conditions.append({"reqst_end": {"$gte": _date_key(filters["ends_after"])}})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Document]], k: int = 60) -> List[Tuple[Document, float]]:
+    """
+    여러 검색 결과 순위를 RRF(Reciprocal Rank Fusion)로 합칩니다. score(d) = sum(1 / (k + rank))
+
+    Args:
+        result_lists (List[List[Document]]): 검색기별 결과 (순위순, metadata["id"]로 같은 문서 판별)
+        k (int): 순위 완화 상수
+
+    Returns:
+        List[Tuple[Document, float]]: (문서, RRF 점수) 리스트 (점수 내림차순)
+    """
+    fused: Dict[str, List] = {}
+    for documents in result_lists:
+        for rank, document in enumerate(documents, start=1):
+            entry = fused.setdefault(document.metadata["id"], [document, 0.0])
+            entry[1] += 1.0 / (k + rank)
+    return sorted(((document, score) for document, score in fused.values()), key=lambda item: item[1], reverse=True)
+
+
+LOCAL_INDEX_GENERATION_PREFIX = "catalog-"
+
+
+def _latest_local_index(root: str) -> Optional[str]:
+    """가장 최근에 저장된 로컬 인덱스 세대 디렉터리 (세대가 없으면 이전 형식인 root 자체, 저장된 인덱스가 없으면 None)"""
+    candidates = []
+    if os.path.isdir(root):
+        for entry in os.scandir(root):
+            manifest = os.path.join(entry.path, "index.json")
+            if entry.name.startswith(LOCAL_INDEX_GENERATION_PREFIX) and os.path.exists(manifest):
+                candidates.append((os.stat(manifest).st_mtime_ns, entry.path))
+    if candidates:
+        return max(candidates)[1]
+    return root if os.path.exists(os.path.join(root, "index.json")) else None
+
+
+def _field(obj, name: str):
+    """Pinecone 응답 객체(속성 접근)와 LocalIndex 응답(dict)을 같은 방식으로 읽습니다."""
+    return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+
 class DB_Pinecone():
     def __init__(self,dbname,key):
         self.pc = None
         self.index = None
         self.DBname = dbname
         self.api_key = key
+        self.model_name = Config.EMBEDDING_MODEL
         self.embed_model = HuggingFaceEmbeddings(
-            model_name="intfloat/multilingual-e5-large", # 예를 들어 "sentence-transformers/all-MiniLM-L6-v2"
-            model_kwargs={"trust_remote_code":True}
+            model_name=self.model_name, # 예를 들어 "sentence-transformers/all-MiniLM-L6-v2"
+            model_kwargs={"trust_remote_code":True},
+            encode_kwargs={"normalize_embeddings": True}
         )
+        # 내용이 같은 텍스트는 다시 임베딩하지 않도록 디스크 캐시 사용 (경로가 비어 있으면 비활성화)
+        self.embedding_cache = (
+            EmbeddingCache(Config.EMBEDDING_CACHE_DIR, self.model_name) if Config.EMBEDDING_CACHE_DIR else None
+        )
+        # 반복되는 검색 질의는 메모리에서 바로 재사용 (LRU + TTL)
+        self.query_cache = TTLCache(Config.QUERY_CACHE_SIZE, Config.QUERY_CACHE_TTL_SECONDS)
+        # 하이브리드 검색용 BM25 인덱스 (카탈로그를 색인/동기화할 때 또는 첫 검색 시 생성)
+        # (BM25 인덱스, 문서 메타데이터, 열 지향 뷰, 원본 파일)을 한 번에 교체하여 검색 중에도 서로 어긋나지 않게 함
+        # 원본 파일은 (경로, catalog_stamp) - 다른 워커가 카탈로그를 교체하면 다음 검색에서 다시 만듦
+        self._sparse: Optional[Tuple[BM25Index, List[dict], ProgramColumns, Optional[tuple]]] = None
+        # 마지막으로 색인/동기화한 카탈로그 파일 (검색 시 BM25 인덱스와 카탈로그 버전의 기준)
+        self.catalog_file = Config.CATALOG_FILE
+        self._sparse_lock = threading.Lock()
+        # 로컬 인덱스: 읽은 세대 디렉터리와 그때의 카탈로그 파일 (_catalog_source()) - 카탈로그가 교체되면 새 세대를 다시 읽음
+        self._index_path: Optional[str] = None
+        self._index_source: Optional[tuple] = None
+        self._index_lock = threading.Lock()
+        self._search_executor = ThreadPoolExecutor(max_workers=Config.SEARCH_MAX_WORKERS, thread_name_prefix="db-search")
+
+    @property
+    def sparse_index(self) -> Optional[BM25Index]:
+        return self._sparse[0] if self._sparse else None
+
+    @property
+    def sparse_documents(self) -> List[dict]:
+        return self._sparse[1] if self._sparse else []
+
+    @property
+    def sparse_columns(self) -> Optional[ProgramColumns]:
+        return self._sparse[2] if self._sparse else None
+
+    @property
+    def catalog_version(self) -> Optional[str]:
+        """
+        카탈로그 파일 버전 (답변/검색 캐시 범위로 사용)
+        BM25 인덱스와 관계없이 파일 상태로 계산하므로 dense 검색만 쓰거나 다른 워커가 카탈로그를 교체해도 바로 바뀝니다.
+        """
+        return catalog_file_version(self.catalog_file)
 
     def create_connection(self):
+        # 설정에 따라 Pinecone 서비스 또는 로컬 인덱스에 연결 (두 인덱스는 같은 API를 제공)
+        if Config.VECTOR_BACKEND == "local":
+            self._load_local_index()
+            return
         self.pc = Pinecone(api_key=self.api_key, environment="AWS")
         self.index = self.pc.Index(self.DBname)
 
+    @property
+    def is_local(self) -> bool:
+        return isinstance(self.index, LocalIndex)
+
+    @staticmethod
+    def local_index_dir(json_file) -> str:
+        """
+        카탈로그 파일 버전별 로컬 인덱스 세대 디렉터리 (LOCAL_INDEX_PATH/catalog-<버전>)
+        새로고침은 새 카탈로그의 세대 디렉터리에 인덱스를 저장한 뒤 카탈로그를 교체하므로,
+        워커는 카탈로그가 바뀐 것을 보고 같은 버전의 인덱스를 읽습니다.
+        """
+        return os.path.join(Config.LOCAL_INDEX_PATH, f"{LOCAL_INDEX_GENERATION_PREFIX}{catalog_file_version(json_file)}")
+
+    def _load_local_index(self):
+        """
+        현재 카탈로그 버전의 로컬 인덱스를 읽습니다.
+        (그 세대가 없으면 가장 최근 세대 또는 이전 형식 인덱스, 저장된 인덱스가 없으면 빈 인덱스)
+        """
+        source = self._catalog_source(self.catalog_file)
+        path = self.local_index_dir(self.catalog_file) if source[1] is not None else None
+        if path is None or not os.path.exists(os.path.join(path, "index.json")):
+            path = _latest_local_index(Config.LOCAL_INDEX_PATH)
+        # 현재 카탈로그로 만든 스냅샷에 임베딩 열이 있으면 벡터 파일을 읽지 않고 memory-map을 공유
+        shared_vectors = None
+        snapshot = load_snapshot()
+        if snapshot is not None and snapshot.embeddings is not None and snapshot.is_current(self.catalog_file):
+            shared_vectors = {self.DBname: (list(snapshot.ids), snapshot.embeddings)}
+        self.index = LocalIndex.load(path, shared_vectors=shared_vectors) if path else LocalIndex()
+        self._index_path, self._index_source = path, source
+
+    def _current_index(self):
+        """
+        검색할 벡터 인덱스를 반환합니다.
+        로컬 인덱스는 다른 워커 프로세스가 카탈로그를 교체했으면 새 카탈로그 세대의 인덱스를 다시 읽습니다. (BM25 인덱스와 같은 방식)
+        """
+        if not self.is_local or not self._is_stale(self._index_source):
+            return self.index
+        with self._index_lock:
+            if self._is_stale(self._index_source):
+                self._load_local_index()
+                logger.info(f"🤖 카탈로그가 교체되어 로컬 인덱스를 다시 읽었습니다: {self._index_path}")
+            return self.index
+
+    def _save_local_index(self, index: LocalIndex, json_file, records: List[dict]) -> str:
+        """
+        로컬 인덱스를 카탈로그 버전의 세대 디렉터리에 저장하고, 현재 카탈로그와 이 세대 외의 이전 세대를 지웁니다.
+        (이미 읽은 워커는 메모리/memory-map으로 계속 사용할 수 있음)
+        행은 카탈로그 순서로 맞춰 저장하므로 카탈로그 스냅샷의 임베딩 열과 행이 일치합니다.
+        """
+        index.reorder([record['pblancId'] for record in records], namespace=self.DBname)
+        path = self.local_index_dir(json_file)
+        index.save(path)
+        keep = {os.path.abspath(path), os.path.abspath(self.local_index_dir(self.catalog_file))}
+        for entry in os.scandir(Config.LOCAL_INDEX_PATH):
+            if entry.name.startswith(LOCAL_INDEX_GENERATION_PREFIX) and os.path.abspath(entry.path) not in keep:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        return path
+
     def status(self):
         logger.info(f"🤖 DB 상태를 보고합니다. \n:{self.index.describe_index_stats()}")
 
     def input_json_data(self,data):
         logger.info("🤖 DB 입력을 시도합니다. ")
         
-        items = self.json_to_vector(data)
-        # Pinecone에 업서트
-        self.index.upsert(
+        # 레코드를 나누어 임베딩하면서, 앞쪽 배치는 크기 제한 배치로 병렬 업서트
+        self.catalog_file = data
+        source = self._catalog_source(data)
+        records = self.load_records(data)
+        count = parallel_upsert(
+            self.index,
+            self.iter_vector_items(records),
             namespace=self.DBname,
-            vectors=items
+            total=len(records)
         )
+        if self.is_local:
+            self._index_path, self._index_source = self._save_local_index(self.index, data, records), source
+        self.build_sparse_index(records, source)
+        write_catalog_snapshot(data, embeddings=self.catalog_embeddings(records, self.index))
         
-        logger.info(f"🤖 {len(items)}개 항목 // {data} 를 정상적으로 입력했습니다.. ")
+        logger.info(f"🤖 {count}개 항목 // {data} 를 정상적으로 입력했습니다.. ")
         
+    def embed_passages(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        문서(passage)를 배치로 임베딩합니다.
+        길이순으로 정렬해 배치를 만들어 패딩을 줄이고, 결과는 입력 순서대로 돌려줍니다.
+
+        Args:
+            texts (List[str]): 임베딩할 문서 리스트
+            batch_size (int, optional): 배치 크기 (None일 경우 Config에서 가져옴)
+
+        Returns:
+            List[List[float]]: 입력 순서와 동일한 벡터 리스트
+        """
+        batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+        inputs = [E5_PASSAGE_PREFIX + text for text in texts]
+
+        start = time.perf_counter()
+        vectors = self._cached_embed(inputs, batch_size)
+        elapsed = time.perf_counter() - start
+
+        metrics.increment("embedding.passages", len(texts))
+        metrics.observe("embedding.passages_seconds", elapsed)
+        if texts:
+            cache_info = ""
+            if self.embedding_cache is not None:
+                cache_info = f", 캐시 적중률 {self.embedding_cache.stats()['hit_ratio']:.1%}"
+            logger.info(f"🤖 {len(texts)}개 문서 임베딩 완료: {elapsed:.2f}초 ({len(texts) / max(elapsed, 1e-9):.1f} records/sec{cache_info})")
+        return vectors
+
+    def _cached_embed(self, inputs: List[str], batch_size: int, persist: bool = True) -> List[List[float]]:
+        """
+        캐시에 없는 입력만 길이순 배치로 임베딩하고 결과를 캐시에 저장합니다.
+        persist=False면 디스크 캐시를 쓰지 않습니다. (검색 질의 - append-only 캐시가 끝없이 커지지 않도록)
+        """
+        embedding_cache = self.embedding_cache if persist else None
+        if embedding_cache is not None:
+            vectors = embedding_cache.get_many(inputs)
+        else:
+            vectors = [None] * len(inputs)
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        order = sorted(missing, key=lambda i: len(inputs[i]), reverse=True)
+        for batch_start in range(0, len(order), batch_size):
+            batch_indices = order[batch_start:batch_start + batch_size]
+            batch_inputs = [inputs[i] for i in batch_indices]
+            batch_vectors = self.embed_model.embed_documents(batch_inputs)
+            for i, vector in zip(batch_indices, batch_vectors):
+                vectors[i] = vector
+            if embedding_cache is not None:
+                embedding_cache.put_many(batch_inputs, batch_vectors)
+        return vectors
+
+    def embed_query(self, query: str) -> List[float]:
+        """검색 질의를 임베딩합니다. (크기/유효기간이 제한된 메모리 캐시 -> 모델 순서로 조회, 디스크 캐시에는 저장하지 않음)"""
+        key = (self.model_name, normalize_text(query))
+        vector = self.query_cache.get(key)
+        if vector is not None:
+            metrics.increment("query_cache.hits")
+            return vector
+
+        metrics.increment("query_cache.misses")
+        vector = self._cached_embed([E5_QUERY_PREFIX + query], batch_size=1, persist=False)[0]
+        self.query_cache.put(key, vector)
+        return vector
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """여러 검색 질의를 임베딩합니다. 캐시에 없는 질의만 한 번의 배치로 모델에 넣습니다."""
+        keys = [(self.model_name, normalize_text(query)) for query in queries]
+        vectors = [self.query_cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        metrics.increment("query_cache.hits", len(queries) - len(missing))
+        metrics.increment("query_cache.misses", len(missing))
+
+        if missing:
+            embedded = self._cached_embed(
+                [E5_QUERY_PREFIX + queries[i] for i in missing], Config.EMBEDDING_BATCH_SIZE, persist=False
+            )
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+                self.query_cache.put(keys[i], vector)
+        return vectors
+
+    @staticmethod
+    def load_records(json_file) -> List[dict]:
+        """
+        카탈로그 JSON의 모든 분야 레코드를 읽습니다.
+        (pblancId 기준 중복 제거 + 유사 중복 공고는 대표 공고만 색인)
+        """
+        return load_catalog(json_file).records
+
+    @staticmethod
+    def build_metadata(record: dict) -> dict:
+        # 검색 조건으로 쓰는 필드(category, region, hashtags, reqst_begin/end)는 필터 가능한 형태로 저장
+        reqst_begin, reqst_end = parse_application_period(record.get("reqstBeginEndDe"))
+        return {
+            "title": record.get("pblancNm", ""),
+            "summary" : short_summary(record),
+            "category": record.get("pldirSportRealmLclasCodeNm", ""),
+            "region": record.get("jrsdInsttNm", ""),
+            "hashtags": [tag.strip() for tag in (record.get("hashtags") or "").split(",") if tag.strip()],
+            "reqst_begin": reqst_begin,
+            "reqst_end": reqst_end,
+            "file_path": record.get("fileNm", "")
+        }
+
+    @staticmethod
+    def embedding_text(record: dict) -> str:
+        """임베딩할 문서 텍스트 (수집 시 정리된 본문)"""
+        return clean_summary(record)
+
+    def content_hash(self, metadata: dict, text: str = "") -> str:
+        """임베딩 모델, 임베딩 텍스트, 저장할 메타데이터의 해시 - 값이 같으면 재색인할 필요 없음"""
+        payload = json.dumps([self.model_name, text, metadata], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def iter_vector_items(self, records: List[dict], chunk_size: Optional[int] = None) -> Iterator[dict]:
+        """
+        레코드를 chunk_size개씩 임베딩하여 업서트용 벡터를 하나씩 생성합니다.
+        ID는 공고 ID(pblancId)이며, 메타데이터에 content_hash를 함께 저장합니다.
+
+        Args:
+            records (List[dict]): 지원사업 레코드
+            chunk_size (int, optional): 한 번에 임베딩할 레코드 수 (None일 경우 Config에서 가져옴)
+
+        Yields:
+            dict: {"id", "values", "metadata"}
+        """
+        chunk_size = chunk_size or Config.UPSERT_EMBED_CHUNK
+
+        for chunk_start in range(0, len(records), chunk_size):
+            chunk = records[chunk_start:chunk_start + chunk_size]
+            # 텍스트를 배치로 벡터화
+            texts = [self.embedding_text(record) for record in chunk]
+            vectors = self.embed_passages(texts)
+
+            for record, text, vector in zip(chunk, texts, vectors):
+                metadata = self.build_metadata(record)
+                metadata["content_hash"] = self.content_hash(metadata, text)
+                
+                yield {
+                    "id": record['pblancId'],
+                    "values": vector,
+                    "metadata": metadata
+                }
+
     def json_to_vector(self,json_file):
+        return list(self.iter_vector_items(self.load_records(json_file)))
+
+    def stored_hashes(self, index=None) -> Dict[str, Optional[str]]:
+        """
+        인덱스에 저장된 모든 벡터 ID와 content_hash를 조회합니다.
+
+        Args:
+            index (optional): 조회할 인덱스 (None일 경우 현재 인덱스)
+
+        Returns:
+            Dict[str, Optional[str]]: {벡터 ID: content_hash (예전 형식 벡터는 None)}
+        """
+        index = index or self.index
+        ids = [vector_id for page in index.list(namespace=self.DBname) for vector_id in page]
+        hashes = {}
+        for start in range(0, len(ids), Config.RECONCILE_FETCH_BATCH):
+            response = index.fetch(ids=ids[start:start + Config.RECONCILE_FETCH_BATCH], namespace=self.DBname)
+            for vector_id, vector in _field(response, "vectors").items():
+                hashes[vector_id] = (_field(vector, "metadata") or {}).get("content_hash")
+        return hashes
+
+    def _sync_index(self, catalog_file, records: List[dict]) -> Tuple[Dict[str, int], Any]:
+        """
+        벡터 인덱스를 카탈로그 레코드와 맞춥니다.
+        로컬 인덱스는 검색 중인 인덱스를 고치지 않고, 저장된 현재 세대를 복사해 동기화한 뒤
+        catalog_file 버전의 새 세대 디렉터리에 저장합니다. (Pinecone은 그대로 갱신)
+
+        Returns:
+            Tuple[Dict[str, int], Any]: (upserted / deleted / unchanged 개수, 동기화한 인덱스)
+        """
+        if self.is_local:
+            index = LocalIndex.load(self._index_path) if self._index_path else LocalIndex()
+        else:
+            index = self.index
+        stored = self.stored_hashes(index)
+
+        changed = [
+            record for record in records
+            if stored.get(record['pblancId']) != self.content_hash(self.build_metadata(record), self.embedding_text(record))
+        ]
+        catalog_ids = {record['pblancId'] for record in records}
+        stale = [vector_id for vector_id in stored if vector_id not in catalog_ids]
+
+        upserted = 0
+        if changed:
+            upserted = parallel_upsert(
+                index,
+                self.iter_vector_items(changed),
+                namespace=self.DBname,
+                total=len(changed)
+            )
+        for start in range(0, len(stale), Config.DELETE_BATCH_SIZE):
+            index.delete(ids=stale[start:start + Config.DELETE_BATCH_SIZE], namespace=self.DBname)
+        if self.is_local:
+            self._save_local_index(index, catalog_file, records)
+
+        result = {"upserted": upserted, "deleted": len(stale), "unchanged": len(records) - len(changed)}
+        metrics.increment("reconcile.upserted", upserted)
+        metrics.increment("reconcile.deleted", len(stale))
+        logger.info(f"🤖 DB 동기화 완료: {result}")
+        return result, index
+
+    def reconcile(self, json_file) -> Dict[str, int]:
+        """
+        인덱스를 현재 카탈로그와 맞춥니다.
+        내용이 바뀌었거나 새로 생긴 공고만 임베딩/업서트하고, 카탈로그에서 사라진 공고
+        (예전 "pblancId#idx" 형식 ID 포함)는 배치로 삭제합니다.
+        동기화한 인덱스와 새 BM25 인덱스로 교체하고 스냅샷을 다시 씁니다.
+
+        Args:
+            json_file: 카탈로그 JSON 파일 경로
+
+        Returns:
+            Dict[str, int]: upserted / deleted / unchanged 개수
+        """
+        logger.info("🤖 DB 동기화를 시도합니다. ")
+        source = self._catalog_source(json_file)
+        catalog = load_catalog(json_file)
+        result, index = self._sync_index(json_file, catalog.records)
+        if self.is_local:
+            self.index, self._index_path, self._index_source = index, self.local_index_dir(json_file), source
+        self.catalog_file = json_file
+        self.build_sparse_index(catalog.records, source)
+        write_catalog_snapshot(json_file, catalog=catalog, embeddings=self.catalog_embeddings(catalog.records, index))
+        return result
+
+    def prepare_catalog(self, staged_file, catalog: Catalog) -> Tuple[Dict[str, int], Optional[np.ndarray]]:
+        """
+        (카탈로그 새로고침) 새 카탈로그로 교체하기 전에 벡터 인덱스를 동기화합니다. (publish_catalog의 prepare 단계)
+        검색 중인 인덱스/BM25 인덱스는 카탈로그 파일이 교체된 것을 보고 모든 워커에서 다시 읽습니다.
+        (os.replace는 inode/수정 시각/크기를 유지하므로 staged_file의 버전이 교체 후 카탈로그 버전)
+
+        Args:
+            staged_file: 곧 카탈로그 파일로 교체될 새 카탈로그 파일
+            catalog (Catalog): staged_file 내용으로 만든 카탈로그
+
+        Returns:
+            Tuple[Dict[str, int], Optional[np.ndarray]]: (upserted / deleted / unchanged 개수, 스냅샷에 넣을 문서 임베딩)
+        """
+        logger.info("🤖 새 카탈로그로 DB 동기화를 시도합니다. ")
+        result, index = self._sync_index(staged_file, catalog.records)
+        return result, self.catalog_embeddings(catalog.records, index)
+
+    def catalog_embeddings(self, records: List[dict], index=None) -> Optional[np.ndarray]:
+        """
+        카탈로그 스냅샷에 넣을 대표 공고 순서의 문서 임베딩 (로컬 인덱스의 벡터를 그대로 사용)
+        Pinecone이거나 인덱스 행이 카탈로그와 다르면 None
+        """
+        index = index or self.index
+        if not isinstance(index, LocalIndex):
+            return None
+        ids, vectors = index.matrix(self.DBname)
+        return vectors if ids == [record['pblancId'] for record in records] else None
+
+    @staticmethod
+    def _catalog_source(json_file) -> tuple:
+        """카탈로그 파일 경로와 상태 (레코드를 읽기 전에 기록하여, 읽는 중에 교체되어도 다음 검색에서 다시 만듦)"""
+        return str(Path(json_file).resolve()), catalog_stamp(json_file)
 
-        # 인덱스 참조
-        index = self.index
-
-        # JSON 파일 읽기
-        raw = json.loads(Path(json_file).read_text(encoding='utf-8'))
-        records = raw['기술']['jsonArray']
-
-        # 벡터화 및 업서트 준비
-        items = []
-
-        for idx, record in enumerate(records):
-            text = record['bsnsSumryCn']
-            
-            # 텍스트를 벡터로 변환
-            vector = self.embed_model.embed_query(text)
-            
-            # ID 구성
-            rec_id = f"{record['pblancId']}#{idx}"
-            
-            # metadata 구성
-            metadata = {
-                "title": record.get("pblancNm", ""),
-                "summary" : record.get('bsnsSumryCn'),
-                "region": record.get("jrsdInsttNm", ""),
-                "hashtags": record.get("hashtags", ""),
-                "file_path": record.get("fileNm", "")
+    def build_sparse_index(self, records: List[dict], source: Optional[tuple] = None):
+        """
+        카탈로그 레코드로 BM25 인덱스를 만듭니다. (공고명 + 해시태그 + 요약)
+        문서 ID와 메타데이터는 벡터 인덱스와 같은 형식을 사용합니다.
+
+        Args:
+            records (List[dict]): 카탈로그 레코드
+            source (tuple, optional): 레코드를 읽은 카탈로그 파일 (_catalog_source()) - 파일이 바뀌면 검색 시 다시 만듦
+        """
+        documents = []
+        for record in records:
+            metadata = self.build_metadata(record)
+            metadata["id"] = record['pblancId']
+            documents.append(metadata)
+        # 검색 조건은 행마다 match_filter를 돌리지 않고 열 단위로 한 번에 계산
+        self._fit_sparse(documents, [self.embedding_text(record) for record in records], ProgramColumns(records), source)
+
+    def build_sparse_index_from_snapshot(self, snapshot: CatalogSnapshot, source: Optional[tuple] = None):
+        """
+        카탈로그 스냅샷으로 BM25 인덱스를 만듭니다. (JSON 카탈로그를 파싱/정규화/중복 제거하지 않음)
+        메타데이터는 build_metadata()와 같은 형식입니다.
+        """
+        documents = [
+            {
+                "title": snapshot.names[row],
+                "summary": snapshot.summaries[row],
+                "category": snapshot.category_names[snapshot.category[row]],
+                "region": snapshot.region_names[snapshot.region[row]],
+                "hashtags": list(split_hashtags(snapshot.hashtags[row])),
+                "reqst_begin": int(snapshot.reqst_begin[row]),
+                "reqst_end": int(snapshot.reqst_end[row]),
+                "file_path": snapshot.file_paths[row],
+                "id": snapshot.ids[row],
             }
-            
-            items.append({
-                "id": rec_id,
-                "values": vector,
-                "metadata": metadata
-            })
-        
-        return items
+            for row in range(len(snapshot))
+        ]
+        self._fit_sparse(documents, list(snapshot.texts), ProgramColumns.from_metadata(documents), source)
 
-    def search_database(self,query:str,top_k:int):
-        index = self.index
+    def _fit_sparse(self, documents: List[dict], texts: List[str], columns: ProgramColumns, source: Optional[tuple]):
+        sparse_index = BM25Index().fit([
+            " ".join([metadata["title"] or "", " ".join(metadata["hashtags"]), text])
+            for metadata, text in zip(documents, texts)
+        ])
+        # 새 인덱스를 모두 만든 뒤 한 번에 교체 (진행 중인 검색은 이전 인덱스를 끝까지 사용)
+        self._sparse = (sparse_index, documents, columns, source)
+        logger.info(f"🤖 BM25 인덱스 생성 완료: {len(documents)}개 문서")
 
-        # 자연어 질의로 직접 검색
-        response = index.search(
-            namespace=self.DBname,
-            query={
-                "top_k": top_k,
-                "inputs": {"text": query},
-            },
-            fields=["summary","title"]
-        )
-        print(response)
-        print("\n\n")
-        '''
-        query = self.pc.inference.embed(
-                model="llama-text-embed-v2",
-                inputs=[query],
-                parameters={"input_type": "passage", "truncate": "END"}
+    def search_database(self,query:str,top_k:int,mode:Optional[str]=None,
+                        filters:Optional[Dict[str, Any]]=None) -> List[Document]:
+        """
+        질의와 유사한 지원사업 문서를 검색합니다.
+
+        Args:
+            query (str): 자연어 검색 질의
+            top_k (int): 반환할 문서 수
+            mode (str, optional): 'dense'(벡터) / 'hybrid'(벡터 + BM25, RRF 결합) (None일 경우 Config에서 가져옴)
+            filters (Dict[str, Any], optional): 검색 조건 (build_index_filter 참고) - 인덱스 검색 단계에서 적용
+
+        Returns:
+            List[Document]: page_content=요약, metadata=메타데이터(+id, score)인 문서 리스트
+        """
+        mode = mode or Config.SEARCH_MODE
+        index_filter = build_index_filter(filters)
+        if mode == "hybrid":
+            return self._hybrid_search(query, top_k, index_filter)
+        if mode != "dense":
+            raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+        return self._dense_search(query, top_k, index_filter)
+
+    def search_many(self, queries: List[str], top_k: int, filters=None, mode: Optional[str] = None) -> List[List[Document]]:
+        """
+        여러 질의를 한 번에 검색합니다. (대량 추천 작업/배치 엔드포인트용)
+        질의 임베딩은 한 번의 배치로 계산하고, 로컬 인덱스는 행렬곱 한 번으로, Pinecone은 동시 요청으로 검색합니다.
+
+        Args:
+            queries (List[str]): 검색 질의 리스트
+            top_k (int): 질의별 반환할 문서 수
+            filters: 모든 질의에 같은 검색 조건(dict) 또는 질의별 검색 조건 리스트 (build_index_filter 참고)
+            mode (str, optional): 'dense' / 'hybrid' (None일 경우 Config에서 가져옴)
+
+        Returns:
+            List[List[Document]]: 입력 순서대로의 검색 결과
+        """
+        mode = mode or Config.SEARCH_MODE
+        if mode not in ("dense", "hybrid"):
+            raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+        filter_list = filters if isinstance(filters, list) else [filters] * len(queries)
+        if len(filter_list) != len(queries):
+            raise ValueError("질의 수와 검색 조건 수가 다릅니다.")
+        index_filters = [build_index_filter(f) for f in filter_list]
+        if not queries:
+            return []
+
+        start = time.perf_counter()
+        candidate_k = max(top_k, Config.HYBRID_CANDIDATE_K) if mode == "hybrid" else top_k
+        vectors = self.embed_queries(queries)
+
+        index = self._current_index()
+        if self.is_local:
+            responses = index.query_many(
+                vectors, top_k=candidate_k, namespace=self.DBname, filter=index_filters, include_metadata=True
             )
-        filtered_results = index.search(
-            namespace=self.DBname, 
-            query={
-                "inputs": {"text": query}, 
-                "top_k": top_k,
-                #"filter": {"document_id": "document1"}
-            },
-            fields=["values","metadata"]
+        else:
+            responses = list(self._search_executor.map(
+                lambda args: self._query_index(args[0], candidate_k, args[1]), zip(vectors, index_filters)
+            ))
+        dense_results = [[self._match_to_document(match) for match in response["matches"]] for response in responses]
+
+        if mode == "dense":
+            results = dense_results
+        else:
+            results = []
+            for query, dense, index_filter in zip(queries, dense_results, index_filters):
+                fused = reciprocal_rank_fusion([dense, self._sparse_search(query, candidate_k, index_filter)], k=Config.RRF_K)
+                results.append(self._with_scores(fused[:top_k]))
+
+        elapsed = time.perf_counter() - start
+        metrics.increment("search.many_queries", len(queries))
+        metrics.observe("search.many_seconds", elapsed)
+        logger.info(f"🤖 {len(queries)}개 질의 일괄 검색 완료: {elapsed:.2f}초 ({len(queries) / max(elapsed, 1e-9):.1f} queries/sec)")
+        return results
+
+    def _query_index(self, vector: List[float], top_k: int, index_filter: Optional[Dict[str, Any]]):
+        return self._current_index().query(
+            namespace=self.DBname,
+            vector=vector,
+            top_k=top_k,
+            filter=index_filter,
+            include_metadata=True
         )
 
-        print(filtered_results)
-        '''
+    def _dense_search(self, query: str, top_k: int, index_filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        # 문서와 같은 e5 모델로 질의를 임베딩하여 검색 ('query: ' prefix)
+        response = self._query_index(self.embed_query(query), top_k, index_filter)
+        return [self._match_to_document(match) for match in response["matches"]]
+
+    @staticmethod
+    def _is_stale(source: Optional[tuple]) -> bool:
+        if source is None:
+            return False
+        stamp = catalog_stamp(source[0])
+        # 파일이 잠시 없으면(교체 중 등) 기존 인덱스를 계속 사용
+        return stamp is not None and stamp != source[1]
+
+    def _current_sparse(self) -> tuple:
+        """
+        BM25 인덱스를 반환합니다. 아직 없거나, 다른 워커 프로세스가 카탈로그 파일을 교체했으면 다시 만듭니다.
+        (카탈로그 새로고침은 한 워커에서만 실행되므로 나머지 워커는 파일 상태로 교체를 알아챔)
+        """
+        sparse = self._sparse
+        if sparse is not None and not self._is_stale(sparse[3]):
+            return sparse
+        with self._sparse_lock:
+            sparse = self._sparse
+            if sparse is None or self._is_stale(sparse[3]):
+                source = self._catalog_source(self.catalog_file)
+                # 현재 카탈로그로 만든 스냅샷이 있으면 JSON 카탈로그를 다시 읽지 않음
+                snapshot = load_snapshot()
+                if snapshot is not None and snapshot.is_current(self.catalog_file):
+                    self.build_sparse_index_from_snapshot(snapshot, source)
+                else:
+                    self.build_sparse_index(self.load_records(self.catalog_file), source)
+            return self._sparse
+
+    def _sparse_search(self, query: str, top_k: int, index_filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        sparse_index, sparse_documents, sparse_columns, _ = self._current_sparse()
+        documents = []
+        scores = sparse_index.score(query)
+        allowed = sparse_columns.mask(index_filter) if index_filter is not None else None
+        for doc_id in sorted(scores, key=scores.get, reverse=True):
+            if allowed is not None:
+                if not allowed[doc_id]:
+                    continue
+            elif index_filter is not None and not match_filter(sparse_documents[doc_id], index_filter):
+                continue
+            metadata = dict(sparse_documents[doc_id])
+            metadata["score"] = scores[doc_id]
+            documents.append(Document(page_content=metadata.get("summary") or "", metadata=metadata))
+            if len(documents) == top_k:
+                break
+        return documents
+
+    def _hybrid_search(self, query: str, top_k: int, index_filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """벡터 검색과 BM25 검색을 동시에 실행하고 RRF로 결합합니다."""
+        candidate_k = max(top_k, Config.HYBRID_CANDIDATE_K)
+        dense = self._search_executor.submit(self._dense_search, query, candidate_k, index_filter)
+        sparse = self._search_executor.submit(self._sparse_search, query, candidate_k, index_filter)
+        fused = reciprocal_rank_fusion([dense.result(), sparse.result()], k=Config.RRF_K)
+        return self._with_scores(fused[:top_k])
+
+    @staticmethod
+    def _with_scores(fused: List[Tuple[Document, float]]) -> List[Document]:
+        """RRF 점수를 metadata["score"]에 기록한 문서 리스트"""
+        documents = []
+        for document, score in fused:
+            document.metadata["score"] = score
+            documents.append(document)
+        return documents
+
+    @staticmethod
+    def _match_to_document(match) -> Document:
+        metadata = dict(match["metadata"] or {})
+        metadata["id"] = match["id"]
+        metadata["score"] = match["score"]
+        return Document(page_content=metadata.get("summary") or "", metadata=metadata)
+
 
 if __name__ == "__main__":
     load_dotenv()
     pinecone_db = DB_Pinecone("kt-agent",os.getenv("PINECONE_API_KEY"))
     pinecone_db.create_connection()
     pinecone_db.status()
-    #pinecone_db.input_json_data("src/data/all_categories.json")
-    pinecone_db.search_database("제조 기술과 AI 관련된 거 보여줘",30)    
\ No newline at end of file
+    #pinecone_db.reconcile(Config.CATALOG_FILE)
+    for doc in pinecone_db.search_database("제조 기술과 AI 관련된 거 보여줘",30):
+        print(doc.metadata.get("title"), doc.metadata.get("score"))
\ No newline at end of file
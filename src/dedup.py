@@ -0,0 +1,203 @@
+"""
+MinHash/LSH 기반 유사 중복 공고 탐지
+같은 공고가 여러 분야에 실리거나 공고명만 조금 바꿔 다시 올라오는 경우를 찾아
+하나의 대표(canonical) 공고로 묶습니다.
+
+1. 공고명 + 사업요약을 정규화한 뒤 글자 n-gram(shingle) 집합으로 변환
+2. MinHash 서명을 만들고 LSH 밴드 버킷으로 후보 쌍만 추림
+3. 후보 쌍은 실제 shingle Jaccard 유사도로 확인한 뒤 union-find로 묶음
+"""
+
+import logging
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from src.bm25 import strip_html
+from src.config import Config
+from src.embedding_cache import normalize_text
+from src.text_normalizer import program_text
+
+logger = logging.getLogger(__name__)
+
+MAX_HASH = np.uint64((1 << 32) - 1)
+# 서명을 한 번에 계산할 shingle 수 (임시 행렬 크기 제한: num_perm x 이 값 x 8바이트)
+SIGNATURE_BLOCK_SHINGLES = 16384
+
+
+def shingles(text: str, size: Optional[int] = None) -> Set[str]:
+    """HTML을 제거하고 정규화한 텍스트의 글자 n-gram 집합"""
+    size = size or Config.DEDUP_SHINGLE_SIZE
+    text = normalize_text(strip_html(text or "")).lower()
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """shingle 집합의 MinHash 서명 생성기"""
+
+    def __init__(self, num_perm: Optional[int] = None, seed: int = 1):
+        """
+        Args:
+            num_perm (int, optional): 해시 함수 수 (서명 길이, None일 경우 Config에서 가져옴)
+            seed (int): 해시 함수 난수 시드 (같은 시드면 항상 같은 서명)
+        """
+        self.num_perm = num_perm or Config.DEDUP_NUM_PERM
+        rng = np.random.default_rng(seed)
+        # multiply-shift 해시: ((a * x + b) mod 2^64) >> 32 (a는 홀수)
+        self.a = rng.integers(0, np.iinfo(np.uint64).max, size=self.num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, size=self.num_perm, dtype=np.uint64, endpoint=True)
+
+    @staticmethod
+    def _hash_items(items: Iterable[str]) -> np.ndarray:
+        return np.fromiter((zlib.crc32(item.encode("utf-8")) for item in items), dtype=np.uint64)
+
+    def _permute(self, hashes: np.ndarray) -> np.ndarray:
+        return (self.a[:, None] * hashes[None, :] + self.b[:, None]) >> np.uint64(32)
+
+    def signature(self, items: Iterable[str]) -> np.ndarray:
+        hashes = self._hash_items(items)
+        if hashes.size == 0:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        return self._permute(hashes).min(axis=1)
+
+    def signatures(self, item_sets: Sequence[Iterable[str]]) -> np.ndarray:
+        """
+        여러 집합의 서명을 블록 단위로 한 번에 계산합니다.
+
+        Returns:
+            np.ndarray: (집합 수, num_perm) 서명
+        """
+        result = np.full((len(item_sets), self.num_perm), MAX_HASH, dtype=np.uint64)
+        block, block_rows = [], []
+
+        def flush():
+            lengths = np.array([len(hashes) for hashes in block])
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            permuted = self._permute(np.concatenate(block))
+            result[block_rows] = np.minimum.reduceat(permuted, offsets, axis=1).T
+            block.clear()
+            block_rows.clear()
+
+        pending = 0
+        with np.errstate(over="ignore"):
+            for row, items in enumerate(item_sets):
+                hashes = self._hash_items(items)
+                if hashes.size == 0:
+                    continue
+                block.append(hashes)
+                block_rows.append(row)
+                pending += hashes.size
+                if pending >= SIGNATURE_BLOCK_SHINGLES:
+                    flush()
+                    pending = 0
+            if block:
+                flush()
+        return result
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            # 순서가 앞선 항목이 대표가 되도록 작은 인덱스를 루트로 사용
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def find_duplicate_groups(texts: Sequence[str],
+                          threshold: Optional[float] = None,
+                          num_perm: Optional[int] = None,
+                          bands: Optional[int] = None) -> List[List[int]]:
+    """
+    유사 중복 텍스트를 묶습니다.
+
+    Args:
+        texts (Sequence[str]): 텍스트 리스트
+        threshold (float, optional): 같은 공고로 볼 최소 shingle Jaccard 유사도
+        num_perm (int, optional): MinHash 서명 길이
+        bands (int, optional): LSH 밴드 수 (num_perm을 나누어 떨어져야 함)
+        (None인 설정값은 Config에서 가져옴)
+
+    Returns:
+        List[List[int]]: 입력 순서대로 정렬된 그룹별 인덱스 (첫 인덱스가 대표, 중복이 없는 텍스트도 단독 그룹)
+    """
+    threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+    hasher = MinHasher(num_perm)
+    bands = bands or Config.DEDUP_BANDS
+    if hasher.num_perm % bands:
+        raise ValueError(f"num_perm({hasher.num_perm})은 bands({bands})로 나누어 떨어져야 합니다.")
+    rows = hasher.num_perm // bands
+
+    shingle_sets = [shingles(text) for text in texts]
+    signatures = hasher.signatures(shingle_sets)
+
+    buckets = defaultdict(list)
+    for i, signature in enumerate(signatures):
+        if not shingle_sets[i]:
+            continue
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows].tobytes())].append(i)
+
+    groups = _UnionFind(len(texts))
+    checked = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                    groups.union(i, j)
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(texts)):
+        clusters[groups.find(i)].append(i)
+    return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def deduplicate_records(records: Sequence[dict],
+                        text_fn: Callable[[dict], str] = program_text,
+                        id_field: str = "pblancId",
+                        **kwargs):
+    """
+    유사 중복 공고를 대표 공고로 묶습니다. (먼저 나온 공고가 대표)
+
+    Args:
+        records (Sequence[dict]): 공고 레코드 (같은 ID는 이미 하나로 합쳐진 상태)
+        text_fn (Callable[[dict], str]): 중복 판단 텍스트
+        id_field (str): 공고 ID 필드
+        **kwargs: find_duplicate_groups() 인자
+
+    Returns:
+        Tuple[List[dict], Dict[str, List[str]]]: (대표 공고 리스트, {대표 ID: 묶인 모든 원본 ID})
+    """
+    groups = find_duplicate_groups([text_fn(record) for record in records], **kwargs)
+    canonical = []
+    members = {}
+    for group in groups:
+        representative = records[group[0]]
+        canonical.append(representative)
+        members[representative[id_field]] = [records[i][id_field] for i in group]
+
+    removed = len(records) - len(canonical)
+    if removed:
+        logger.info(f"유사 중복 공고 {removed}개를 {sum(1 for ids in members.values() if len(ids) > 1)}개 대표 공고로 묶었습니다.")
+    return canonical, members
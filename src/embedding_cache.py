@@ -0,0 +1,229 @@
+"""
+내용 주소 기반(content-addressed) 영구 임베딩 캐시
+키는 (모델명 + 정규화된 텍스트)의 해시이며, 벡터는 디스크의 float 배열을 memory-map으로 읽어
+역직렬화 없이 조회합니다. 내용이 바뀌지 않은 문서는 재색인 시 다시 임베딩하지 않습니다.
+append-only이므로 문서(passage) 임베딩만 저장합니다. (검색 질의는 DB_Pinecone의 크기 제한 메모리 캐시)
+
+디렉터리 구성:
+    meta.json    - 모델명, 차원, 저장 형식
+    keys.txt     - 행 순서대로의 키 (한 줄에 하나, append-only)
+    vectors.f32  - (행 수, 차원) float32 배열 (append-only, fp16 형식이면 vectors.f16)
+    cache.lock   - 프로세스(API 워커) 간 쓰기 잠금
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.config import Config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# e5 계열 모델은 문서와 질의에 서로 다른 prefix를 붙여야 합니다. (캐시 키도 prefix를 붙인 텍스트 기준)
+E5_PASSAGE_PREFIX = "passage: "
+E5_QUERY_PREFIX = "query: "
+STORAGE_DTYPES = {"fp32": (np.float32, "f32"), "fp16": (np.float16, "f16")}
+KEY_LINE_BYTES = 41  # sha1 hex 40자 + 줄바꿈
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 NFC + 공백 정리)"""
+    return WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+class EmbeddingCache:
+    """memory-map 기반 영구 임베딩 캐시"""
+
+    def __init__(self, cache_dir: str, model_name: str, dtype: Optional[str] = None):
+        """
+        Args:
+            cache_dir (str): 캐시 루트 디렉터리 (모델별 하위 디렉터리를 사용)
+            model_name (str): 임베딩 모델명 (키와 디렉터리 이름에 포함)
+            dtype (str, optional): 새 캐시의 저장 형식 'fp32' / 'fp16' (None일 경우 Config에서 가져옴, 기존 캐시는 저장된 형식 유지)
+        """
+        self.model_name = model_name
+        self.dtype = dtype or Config.EMBEDDING_CACHE_DTYPE
+        if self.dtype not in STORAGE_DTYPES:
+            raise ValueError(f"지원하지 않는 저장 형식입니다: {self.dtype}")
+        self.path = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._n_rows = 0
+        self._vectors: Optional[np.ndarray] = None
+        self.dim: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @property
+    def _meta_file(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @property
+    def _keys_file(self) -> str:
+        return os.path.join(self.path, "keys.txt")
+
+    @property
+    def _vectors_file(self) -> str:
+        return os.path.join(self.path, f"vectors.{STORAGE_DTYPES[self.dtype][1]}")
+
+    @property
+    def _lock_file(self) -> str:
+        return os.path.join(self.path, "cache.lock")
+
+    @property
+    def _numpy_dtype(self):
+        return STORAGE_DTYPES[self.dtype][0]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def key(self, text: str) -> str:
+        """모델명과 정규화된 텍스트로 캐시 키를 만듭니다."""
+        return hashlib.sha1(f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _file_lock(self):
+        """다른 프로세스와 같은 캐시 디렉터리를 공유할 때 파일 상태를 읽고 쓰는 동안 잡는 잠금"""
+        with open(self._lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load(self):
+        with self._lock, self._file_lock():
+            self._sync()
+        if self._n_rows:
+            logger.info(f"임베딩 캐시 로드: {self._n_rows}개, {self.dtype} ({self.path})")
+
+    def _sync(self):
+        """
+        디스크의 캐시 파일과 메모리 상태를 맞춥니다. (self._lock과 파일 잠금을 잡은 상태에서 호출)
+
+        - 벡터를 쓴 뒤 키를 쓰므로, 중단된 쓰기로 한쪽에만 남은 행(부분 행 포함)은 잘라냅니다.
+          (남겨 두면 이후 추가되는 행 번호와 벡터 위치가 어긋남)
+        - 다른 프로세스가 추가한 행은 이어서 읽어 들입니다.
+        """
+        if self.dim is None:
+            if not os.path.exists(self._meta_file):
+                return
+            with open(self._meta_file, encoding="utf-8") as f:
+                meta = json.load(f)
+            # 기존 캐시는 저장된 형식을 그대로 사용 (형식이 섞이지 않도록)
+            self.dtype = meta.get("dtype", "fp32")
+            self.dim = meta["dim"]
+
+        row_bytes = np.dtype(self._numpy_dtype).itemsize * self.dim
+        keys_size = os.path.getsize(self._keys_file) if os.path.exists(self._keys_file) else 0
+        vectors_size = os.path.getsize(self._vectors_file) if os.path.exists(self._vectors_file) else 0
+        n_rows = min(keys_size // KEY_LINE_BYTES, vectors_size // row_bytes)
+        if vectors_size != n_rows * row_bytes:
+            logger.warning(f"임베딩 캐시 벡터 파일 정리: {vectors_size - n_rows * row_bytes}바이트 ({self.path})")
+            os.truncate(self._vectors_file, n_rows * row_bytes)
+        if keys_size != n_rows * KEY_LINE_BYTES:
+            logger.warning(f"임베딩 캐시 키 파일 정리: {keys_size // KEY_LINE_BYTES - n_rows}개 ({self.path})")
+            os.truncate(self._keys_file, n_rows * KEY_LINE_BYTES)
+
+        if n_rows < self._n_rows:
+            self._rows, self._n_rows = {}, 0
+        if n_rows > self._n_rows:
+            with open(self._keys_file, "rb") as f:
+                f.seek(self._n_rows * KEY_LINE_BYTES)
+                keys = f.read((n_rows - self._n_rows) * KEY_LINE_BYTES).decode("ascii").split()
+            for offset, key in enumerate(keys):
+                self._rows.setdefault(key, self._n_rows + offset)
+        if n_rows != self._n_rows or self._vectors is None:
+            self._n_rows = n_rows
+            self._map_vectors(n_rows)
+
+    def _map_vectors(self, n_rows: int):
+        if n_rows == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(self._vectors_file, dtype=self._numpy_dtype, mode="r", shape=(n_rows, self.dim))
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        텍스트 리스트의 캐시된 벡터를 조회합니다.
+
+        Returns:
+            List[Optional[List[float]]]: 입력 순서대로의 벡터 (캐시에 없으면 None)
+        """
+        results: List[Optional[List[float]]] = []
+        with self._lock:
+            for text in texts:
+                row = self._rows.get(self.key(text))
+                results.append(None if row is None else self._vectors[row].astype(np.float32).tolist())
+            hits = sum(vector is not None for vector in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        metrics.increment("embedding_cache.hits", hits)
+        metrics.increment("embedding_cache.misses", len(results) - hits)
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """
+        텍스트와 벡터를 캐시에 추가합니다. (이미 있는 키는 건너뜀)
+        여러 프로세스가 같은 캐시 디렉터리에 추가해도 행 번호가 어긋나지 않도록, 파일 잠금 안에서
+        디스크 상태를 다시 읽고 벡터 파일 크기 기준으로 이어 씁니다.
+        """
+        with self._lock, self._file_lock():
+            self._sync()
+            new_keys, new_vectors, seen = [], [], set()
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_vectors.append(vector)
+            if not new_keys:
+                return
+
+            array = np.asarray(new_vectors, dtype=self._numpy_dtype)
+            if self.dim is None:
+                self.dim = array.shape[1]
+                with open(self._meta_file, "w", encoding="utf-8") as f:
+                    json.dump({"model_name": self.model_name, "dim": self.dim, "dtype": self.dtype}, f)
+            elif array.shape[1] != self.dim:
+                raise ValueError(f"임베딩 차원이 캐시와 다릅니다: {array.shape[1]} != {self.dim}")
+
+            with open(self._vectors_file, "ab") as f:
+                f.write(array.tobytes())
+            with open(self._keys_file, "a", encoding="utf-8") as f:
+                f.write("".join(f"{key}\n" for key in new_keys))
+
+            start_row = self._n_rows
+            for offset, key in enumerate(new_keys):
+                self._rows[key] = start_row + offset
+            self._n_rows = start_row + len(new_keys)
+            self._map_vectors(self._n_rows)
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 크기와 적중률"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "entries": len(self._rows),
+            "bytes": len(self._rows) * (self.dim or 0) * np.dtype(self._numpy_dtype).itemsize,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0
+        }
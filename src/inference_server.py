@@ -0,0 +1,403 @@
+"""
+추론 서버 / 원격 LLM 클라이언트
+모델(vLLM 엔진)은 오래 실행되는 추론 서버 프로세스 하나만 로드하고,
+API 워커 프로세스들은 로컬 소켓(multiprocessing.connection)으로 생성을 요청합니다.
+요청 파싱, JSON 응답 구성, 카탈로그 조회 같은 CPU 작업은 워커 수만큼 여러 코어로 나누고,
+모든 워커의 동시 요청은 한 엔진에 들어가 연속 배칭(continuous batching)으로 함께 처리됩니다.
+
+프로토콜 (연결당 한 번에 한 요청, 메시지는 dict):
+    {"op": "ping"}                                        -> {"ok": True, "model": ...}
+    {"op": "generate", "prompt", "kwargs", "deadline"}    -> {"text": ...} / {"cancelled": 사유} / {"error": ...}
+    {"op": "stream", "prompt", "kwargs", "deadline"}      -> {"delta": ...} ... -> {"done": True} / {"cancelled": ...} / {"error": ...}
+    생성 중 {"op": "cancel", "reason"}을 보내거나 연결을 끊으면 엔진 요청을 abort합니다.
+
+메시지는 pickle로 주고받으므로 연결은 반드시 인증 키(INFERENCE_SERVER_AUTHKEY)로 인증하고,
+TCP 주소는 루프백(127.0.0.1 / ::1 / localhost)만 허용합니다.
+backend/main.py가 추론 서버를 함께 실행할 때 키가 없으면 임의의 키를 만들어 환경 변수로 넘깁니다.
+
+실행:
+    python -m src.inference_server           (INFERENCE_SERVER_ADDRESS에서 대기)
+"""
+
+import asyncio
+import ipaddress
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from src.cancellation import CancelToken, GenerationCancelled
+from src.config import Config
+from src.metrics import metrics
+from src.vllm_engine import AbortableVLLM, create_local_llm
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "K-intelligence/Midm-2.0-Base-Instruct"
+DEFAULT_MAX_NEW_TOKENS = 10000
+# 생성 결과를 기다리는 동안 취소 메시지를 확인하는 간격 (초)
+POLL_INTERVAL = 0.05
+
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    "host:port"는 TCP 주소로, 그 외에는 유닉스 소켓 경로로 해석합니다.
+
+    Raises:
+        ValueError: 루프백이 아닌 TCP 주소인 경우 (메시지를 pickle로 주고받으므로 외부에 열지 않음)
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and host and port.isdigit() and "/" not in address:
+        if not _is_loopback(host.strip("[]")):
+            raise ValueError(f"추론 서버 TCP 주소는 루프백만 사용할 수 있습니다: {address}")
+        return host.strip("[]"), int(port)
+    return address
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _authkey(authkey: Optional[str]) -> bytes:
+    """연결 인증 키 (기본값 없이 반드시 설정되어야 함)"""
+    authkey = authkey or Config.INFERENCE_SERVER_AUTHKEY
+    if not authkey:
+        raise ValueError("INFERENCE_SERVER_AUTHKEY가 설정되지 않았습니다.")
+    return authkey.encode("utf-8")
+
+
+def ensure_authkey() -> str:
+    """
+    추론 서버 인증 키가 없으면 임의의 키를 만들어 Config와 환경 변수에 설정합니다.
+    (이후 시작되는 추론 서버 / API 워커 프로세스가 환경 변수로 같은 키를 받음)
+
+    Returns:
+        str: 인증 키
+    """
+    if not Config.INFERENCE_SERVER_AUTHKEY:
+        Config.INFERENCE_SERVER_AUTHKEY = secrets.token_hex(32)
+        os.environ["INFERENCE_SERVER_AUTHKEY"] = Config.INFERENCE_SERVER_AUTHKEY
+    return Config.INFERENCE_SERVER_AUTHKEY
+
+
+def _send_cancel(conn: Connection, reason: Optional[str]):
+    """생성 중인 요청의 취소를 서버에 알립니다. (이미 끊긴 연결은 무시)"""
+    try:
+        conn.send({"op": "cancel", "reason": reason or "client_cancelled"})
+    except OSError:
+        pass
+
+
+class InferenceServer:
+    """모델을 소유하고 워커들의 생성 요청을 처리하는 추론 서버"""
+
+    def __init__(self, llm, model_name: str, max_concurrency: Optional[int] = None):
+        """
+        Args:
+            llm: AbortableVLLM 또는 invoke()를 제공하는 LLM
+            model_name (str): 모델명 (ping 응답용)
+            max_concurrency (int, optional): 동시에 처리할 최대 요청 수 (None일 경우 Config에서 가져옴)
+        """
+        self.llm = llm
+        self.model_name = model_name
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency or Config.INFERENCE_SERVER_MAX_CONCURRENCY,
+            thread_name_prefix="inference"
+        )
+
+    def serve_forever(self, address: Optional[str] = None, authkey: Optional[str] = None):
+        """주소에서 연결을 받아 연결마다 스레드로 처리합니다."""
+        address = parse_address(address or Config.INFERENCE_SERVER_ADDRESS)
+        if isinstance(address, str) and os.path.exists(address):
+            os.remove(address)  # 이전 실행이 남긴 소켓 파일
+        with Listener(address, authkey=_authkey(authkey)) as listener:
+            logger.info(f"추론 서버 대기 중: {address} (모델 {self.model_name})")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # 인증 실패 등 잘못된 연결은 무시하고 계속 대기
+                    logger.warning(f"추론 서버 연결 실패: {e}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), name="inference-conn", daemon=True).start()
+
+    def _serve_connection(self, conn: Connection):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                op = request.get("op")
+                if op == "ping":
+                    conn.send({"ok": True, "model": self.model_name})
+                elif op in ("generate", "stream"):
+                    if not self._handle(conn, request):
+                        return
+                elif op == "cancel":
+                    continue  # 이미 끝난 요청에 대한 취소
+                else:
+                    conn.send({"error": f"지원하지 않는 요청입니다: {op}"})
+
+    def _handle(self, conn: Connection, request: Dict[str, Any]) -> bool:
+        """
+        생성 요청을 실행하면서 결과를 보내고, 같은 연결로 들어오는 취소 메시지를 처리합니다.
+
+        Returns:
+            bool: 연결을 계속 사용할 수 있으면 True (클라이언트가 끊었으면 False)
+        """
+        token = CancelToken(request.get("deadline"))
+        results: queue.Queue = queue.Queue()
+        self._executor.submit(self._run, request, token, results)
+        metrics.increment(f"inference_server.{request['op']}")
+
+        connected = True
+        while True:
+            # 클라이언트의 취소 메시지 / 연결 종료 확인
+            try:
+                while connected and conn.poll(0):
+                    message = conn.recv()
+                    if message.get("op") == "cancel":
+                        token.cancel(message.get("reason") or "client_cancelled")
+            except (EOFError, OSError):
+                connected = False
+                token.cancel("client_disconnected")
+
+            try:
+                kind, value = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if connected:
+                try:
+                    conn.send({kind: value})
+                except OSError:
+                    connected = False
+                    token.cancel("client_disconnected")
+            if kind != "delta":
+                return connected
+
+    def _run(self, request: Dict[str, Any], token: CancelToken, results: queue.Queue):
+        """(실행 스레드) 생성 결과를 results 큐에 넣습니다. 마지막 항목은 항상 text/done/cancelled/error 중 하나"""
+        kwargs = request.get("kwargs") or {}
+        try:
+            if request["op"] == "generate":
+                results.put(("text", self._generate(request["prompt"], token, kwargs)))
+            else:
+                asyncio.run(self._stream(request["prompt"], token, kwargs, results))
+                results.put(("done", True))
+        except GenerationCancelled as e:
+            results.put(("cancelled", e.reason))
+        except Exception as e:
+            logger.error(f"추론 서버 생성 실패: {e}")
+            results.put(("error", str(e)))
+
+    def _generate(self, prompt: str, token: CancelToken, kwargs: Dict[str, Any]) -> str:
+        if isinstance(self.llm, AbortableVLLM):
+            return self.llm.invoke(prompt, cancel_token=token, **kwargs)
+        # abort API가 없는 엔진은 호출 전후로만 취소 여부를 확인
+        token.check()
+        text = self.llm.invoke(prompt, **kwargs)
+        token.check()
+        return text
+
+    async def _stream(self, prompt: str, token: CancelToken, kwargs: Dict[str, Any], results: queue.Queue):
+        if not isinstance(self.llm, AbortableVLLM):
+            raise RuntimeError("스트리밍은 AbortableVLLM 엔진에서만 지원합니다.")
+        token.check()
+        # 취소되면 이 태스크를 취소하여 astream이 엔진 요청을 abort하도록 함
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        unregister = token.add_callback(lambda: loop.call_soon_threadsafe(task.cancel))
+        try:
+            async with asyncio.timeout(token.remaining()):
+                async with aclosing(self.llm.astream(prompt, **kwargs)) as stream:
+                    async for delta in stream:
+                        results.put(("delta", delta))
+        except (asyncio.CancelledError, TimeoutError):
+            pass
+        finally:
+            unregister()
+        token.check()
+
+
+class RemoteLLM:
+    """추론 서버에 생성을 요청하는 클라이언트 (AbortableVLLM과 같은 invoke/astream 인터페이스)"""
+
+    def __init__(self, address: Optional[str] = None, authkey: Optional[str] = None,
+                 connect_timeout: Optional[float] = None):
+        """
+        Args:
+            address (str, optional): 추론 서버 주소 (None일 경우 Config에서 가져옴)
+            authkey (str, optional): 연결 인증 키 (None일 경우 Config에서 가져옴)
+            connect_timeout (float, optional): 서버 기동(모델 로드)을 기다릴 최대 시간 (None일 경우 Config에서 가져옴)
+        """
+        self.address = parse_address(address or Config.INFERENCE_SERVER_ADDRESS)
+        self._authkey = _authkey(authkey)
+        self._idle: List[Connection] = []
+        self._lock = threading.Lock()
+        self.model = self._wait_until_ready(
+            Config.INFERENCE_SERVER_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        )
+
+    def __repr__(self) -> str:
+        return f"RemoteLLM(address={self.address!r}, model={self.model!r})"
+
+    def _wait_until_ready(self, timeout: float) -> str:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                conn = self._acquire()
+                conn.send({"op": "ping"})
+                reply = conn.recv()
+                self._release(conn)
+                logger.info(f"추론 서버 연결 완료: {self.address} (모델 {reply['model']})")
+                return reply["model"]
+            except (OSError, EOFError):
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(f"추론 서버에 연결할 수 없습니다: {self.address}")
+                time.sleep(1.0)
+
+    def _acquire(self) -> Connection:
+        """유휴 연결을 재사용하거나 새로 연결합니다. (연결당 한 번에 한 요청)"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return Client(self.address, authkey=self._authkey)
+
+    def _release(self, conn: Connection):
+        with self._lock:
+            self._idle.append(conn)
+
+    @staticmethod
+    def _request(op: str, prompt: str, cancel_token: Optional[CancelToken], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "op": op,
+            "prompt": prompt,
+            "kwargs": kwargs,
+            # 서버도 같은 데드라인으로 엔진 요청을 abort
+            "deadline": cancel_token.remaining() if cancel_token is not None else None
+        }
+
+    def invoke(self, prompt: str, cancel_token: Optional[CancelToken] = None, **kwargs) -> str:
+        """
+        추론 서버에서 전체 응답을 생성합니다. (호출 스레드는 완료까지 대기)
+
+        Args:
+            prompt (str): 입력 프롬프트
+            cancel_token (CancelToken, optional): 취소/데드라인 토큰 (취소되면 서버에 취소 메시지 전송)
+            **kwargs: SamplingParams 인자 (예: max_tokens)
+
+        Returns:
+            str: 생성된 텍스트
+
+        Raises:
+            GenerationCancelled: 토큰이 취소되었거나 데드라인을 넘긴 경우
+        """
+        if cancel_token is not None:
+            cancel_token.check()
+
+        start = time.perf_counter()
+        conn = self._acquire()
+        unregister = lambda: None
+        try:
+            conn.send(self._request("generate", prompt, cancel_token, kwargs))
+            if cancel_token is not None:
+                unregister = cancel_token.add_callback(lambda: _send_cancel(conn, cancel_token.reason))
+            reply = conn.recv()
+        except BaseException:
+            conn.close()
+            raise
+        finally:
+            unregister()
+        self._release(conn)
+        metrics.observe("inference.remote_seconds", time.perf_counter() - start)
+
+        if "cancelled" in reply:
+            if cancel_token is not None:
+                cancel_token.cancel(reply["cancelled"])
+            raise GenerationCancelled(reply["cancelled"])
+        if "error" in reply:
+            raise RuntimeError(f"추론 서버 생성 실패: {reply['error']}")
+        return reply["text"]
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        추론 서버에서 생성되는 텍스트를 조각(delta) 단위로 돌려줍니다.
+        스트림 소비가 중간에 중단되면 서버에 취소를 보내 엔진 요청을 abort합니다.
+        """
+        loop = asyncio.get_running_loop()
+        conn = await loop.run_in_executor(None, self._acquire)
+        finished = False
+        try:
+            conn.send(self._request("stream", prompt, None, kwargs))
+            while True:
+                reply = await loop.run_in_executor(None, conn.recv)
+                if "delta" in reply:
+                    yield reply["delta"]
+                    continue
+                finished = True
+                if "error" in reply:
+                    raise RuntimeError(f"추론 서버 생성 실패: {reply['error']}")
+                if "cancelled" in reply:
+                    raise GenerationCancelled(reply["cancelled"])
+                return
+        finally:
+            if finished:
+                self._release(conn)
+            else:
+                # 응답이 남아 있을 수 있는 연결은 재사용하지 않음 (끊으면 서버가 abort)
+                _send_cancel(conn, "stream_closed")
+                conn.close()
+                metrics.increment("generation.aborted")
+
+    def close(self):
+        """유휴 연결을 닫습니다."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def serve(address: Optional[str] = None, model_name: str = DEFAULT_MODEL, authkey: Optional[str] = None):
+    """모델을 로드하고 추론 서버를 실행합니다. (반환하지 않음)"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    start = time.perf_counter()
+    logger.info(f"추론 서버 모델 로드 중: {model_name}")
+    # 여러 워커의 동시 요청을 한 엔진에서 배칭하고 취소/스트리밍하려면 AsyncLLMEngine이 필요
+    # (langchain VLLM의 오프라인 vllm.LLM은 스레드 안전하지 않고 배칭/스트리밍도 되지 않음)
+    llm = create_local_llm(model_name, DEFAULT_MAX_NEW_TOKENS, abortable=True)
+    logger.info(f"추론 서버 모델 로드 완료: {time.perf_counter() - start:.1f}초")
+    InferenceServer(llm, model_name).serve_forever(address, authkey)
+
+
+def start_server_process(address: Optional[str] = None, model_name: str = DEFAULT_MODEL):
+    """
+    추론 서버를 별도 프로세스로 시작합니다. (CUDA를 쓰므로 spawn 방식)
+    인증 키가 없으면 임의의 키를 만들어 이후 시작되는 API 워커도 환경 변수로 같은 키를 사용하게 합니다.
+
+    Returns:
+        multiprocessing.Process: 추론 서버 프로세스
+    """
+    parse_address(address or Config.INFERENCE_SERVER_ADDRESS)  # 루프백이 아니면 시작 전에 실패
+    process = get_context("spawn").Process(
+        target=serve, args=(address, model_name, ensure_authkey()), name="inference-server", daemon=True
+    )
+    process.start()
+    logger.info(f"추론 서버 프로세스 시작: pid={process.pid}")
+    return process
+
+
+if __name__ == "__main__":
+    serve()
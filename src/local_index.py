@@ -0,0 +1,610 @@
+"""
+프로세스 내 로컬 벡터 인덱스 (Pinecone Index 대체용)
+DB_Pinecone이 사용하는 Pinecone Index API의 일부(upsert/query/fetch/delete/list/describe_index_stats)를
+같은 형태로 제공하여, 오프라인 실행/CI/벤치마크에서 Pinecone 없이 검색할 수 있게 합니다.
+
+- 작은 카탈로그: NumPy brute-force (코사인 유사도)
+- 큰 카탈로그: IVF(k-means 코어스 양자화) 근사 검색
+- Pinecone 스타일 메타데이터 필터 ($eq, $ne, $in, $nin, $gt, $gte, $lt, $lte, $exists, $and, $or)
+- 선택적 압축(VectorCodec: fp16/int8, 차원 축소)으로 1차 검색 후 원본 벡터로 재채점
+- save/load로 디스크에 저장
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.config import Config
+from src.vector_codec import VectorCodec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAMESPACE = ""
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    """단일 값에 대한 필터 연산자 평가"""
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    raise ValueError(f"지원하지 않는 필터 연산자입니다: {operator}")
+
+
+def match_filter(metadata: Optional[Dict[str, Any]], filter: Optional[Dict[str, Any]]) -> bool:
+    """
+    Pinecone 메타데이터 필터 문법으로 메타데이터가 조건을 만족하는지 확인합니다.
+    리스트 값 필드는 원소 중 하나라도 조건을 만족하면 일치로 봅니다. ($ne/$nin은 모든 원소가 만족해야 함)
+
+    Args:
+        metadata (Dict[str, Any]): 벡터 메타데이터
+        filter (Dict[str, Any]): 필터 (예: {"region": {"$eq": "중소벤처기업부"}, "reqst_end": {"$gte": 20250901}})
+
+    Returns:
+        bool: 조건 만족 여부
+    """
+    if not filter:
+        return True
+    metadata = metadata or {}
+
+    for field, condition in filter.items():
+        if field == "$and":
+            if not all(match_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+        if field == "$or":
+            if not any(match_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        value = metadata.get(field)
+        for operator, operand in condition.items():
+            if operator == "$exists":
+                if (field in metadata) != bool(operand):
+                    return False
+                continue
+            if isinstance(value, list):
+                if operator in ("$ne", "$nin"):
+                    matched = all(_compare(v, operator, operand) for v in value)
+                else:
+                    matched = any(_compare(v, operator, operand) for v in value)
+            else:
+                matched = _compare(value, operator, operand)
+            if not matched:
+                return False
+    return True
+
+
+def _save_array(path: str, array: np.ndarray):
+    """임시 파일에 쓴 뒤 교체합니다. (같은 경로를 memory-map으로 열고 있어도 안전)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _remove_stale_arrays(path: str, manifest: Dict[str, Any]):
+    """index.json이 가리키지 않는 이전 세대의 배열/코덱 파일을 지웁니다. (memory-map으로 열려 있어도 안전)"""
+    keep = {manifest.get("codec_file")}
+    for entry in manifest["namespaces"]:
+        keep.update((entry.get("vectors_file"), entry.get("codes_file")))
+    for name in os.listdir(path):
+        if name in keep or not name.startswith(("vectors_", "codes_", "codec")):
+            continue
+        if name.endswith((".npy", ".npz")):
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+
+
+class _Namespace:
+    """네임스페이스별 벡터 저장소 (행 단위 배열 + IVF 보조 인덱스)"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.metadata: List[Dict[str, Any]] = []
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self.size = 0
+        # IVF 상태
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_size = 0
+        # 압축 코드 (코덱이 학습된 뒤에는 바뀐 행만 인코딩, 코덱을 다시 학습하면 None으로 무효화)
+        self._codes: Optional[np.ndarray] = None
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self.size]
+
+    @property
+    def codes(self) -> Optional[np.ndarray]:
+        return None if self._codes is None else self._codes[:self.size]
+
+    @codes.setter
+    def codes(self, codes: Optional[np.ndarray]):
+        self._codes = codes
+
+    def _ensure_capacity(self, size: int):
+        # 스냅샷 memory-map을 그대로 쓰는 읽기 전용 벡터는 처음 수정할 때 복사
+        if size <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+        capacity = max(size, 2 * len(self._vectors), 64)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:self.size] = self._vectors[:self.size]
+        self._vectors = grown
+        assignments = np.full(capacity, -1, dtype=np.int32)
+        assignments[:self.size] = self.assignments[:self.size]
+        self.assignments = assignments
+
+    def upsert(self, vector_id: str, vector: np.ndarray, metadata: Dict[str, Any],
+               code: Optional[np.ndarray] = None):
+        """code가 주어지면 압축 코드도 이 행만 갱신합니다. (없으면 코드를 무효화)"""
+        row = self.rows.get(vector_id)
+        if row is None:
+            row = self.size
+            self._ensure_capacity(row + 1)
+            self.ids.append(vector_id)
+            self.metadata.append(metadata)
+            self.rows[vector_id] = row
+            self.size += 1
+        else:
+            self.metadata[row] = metadata
+        self._vectors[row] = vector
+        if code is None:
+            self._codes = None
+        elif self._codes is not None:
+            if row >= len(self._codes):
+                grown = np.zeros((len(self._vectors),) + self._codes.shape[1:], dtype=self._codes.dtype)
+                grown[:row] = self._codes[:row]
+                self._codes = grown
+            self._codes[row] = code
+        if self.centroids is not None:
+            self.assignments[row] = int(np.argmax(self.centroids @ vector))
+
+    def delete(self, vector_id: str):
+        row = self.rows.pop(vector_id, None)
+        if row is None:
+            return
+        self._ensure_capacity(self.size)
+        last = self.size - 1
+        if row != last:
+            # 마지막 행을 삭제된 자리로 옮겨 배열을 연속으로 유지
+            moved_id = self.ids[last]
+            self._vectors[row] = self._vectors[last]
+            self.assignments[row] = self.assignments[last]
+            if self._codes is not None:
+                self._codes[row] = self._codes[last]
+            self.ids[row] = moved_id
+            self.metadata[row] = self.metadata[last]
+            self.rows[moved_id] = row
+        self.ids.pop()
+        self.metadata.pop()
+        self.size -= 1
+
+    def reorder(self, ids: Sequence[str]):
+        """ids에 있는 행을 그 순서대로 앞에 두고 나머지 행을 뒤에 둡니다. (IVF 배정과 압축 코드도 함께 이동)"""
+        order = [self.rows[vector_id] for vector_id in ids if vector_id in self.rows]
+        listed = set(order)
+        order.extend(row for row in range(self.size) if row not in listed)
+        order = np.asarray(order, dtype=np.int64)
+        if np.array_equal(order, np.arange(self.size)):
+            return
+        self._vectors = self.vectors[order]
+        self.assignments = self.assignments[:self.size][order]
+        if self._codes is not None:
+            self._codes = self.codes[order]
+        self.ids = [self.ids[row] for row in order]
+        self.metadata = [self.metadata[row] for row in order]
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+
+    def train_ivf(self, n_lists: int, iterations: int = 10, sample_size: int = 20000, seed: int = 0):
+        """k-means로 코어스 양자화기를 학습하고 모든 행을 리스트에 배정합니다."""
+        vectors = self.vectors
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(self.size, size=min(sample_size, self.size), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for k in range(n_lists):
+                members = sample[labels == k]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[k] = centroid / (np.linalg.norm(centroid) + 1e-12)
+
+        self.centroids = centroids
+        self.assignments[:self.size] = np.argmax(vectors @ centroids.T, axis=1)
+        self.trained_size = self.size
+
+
+class LocalIndex:
+    """Pinecone Index 호환 로컬 벡터 인덱스 (코사인 유사도)"""
+
+    def __init__(self, dimension: Optional[int] = None,
+                 ann_threshold: Optional[int] = None,
+                 nprobe: Optional[int] = None,
+                 codec: Union[None, str, VectorCodec] = "config",
+                 rescore_factor: Optional[int] = None):
+        """
+        Args:
+            dimension (int, optional): 벡터 차원 (None이면 첫 upsert에서 결정)
+            ann_threshold (int, optional): 이 개수 이상이면 IVF 근사 검색 사용 (None일 경우 Config에서 가져옴)
+            nprobe (int, optional): IVF 검색 시 탐색할 리스트 수 (None일 경우 Config에서 가져옴)
+            codec (VectorCodec, optional): 1차 검색용 압축 코덱 ("config"면 Config에서 생성, None이면 압축하지 않음)
+            rescore_factor (int, optional): 압축 검색 시 top_k * rescore_factor개 후보를 원본 벡터로 재채점 (0이면 재채점 안 함)
+        """
+        self.dimension = dimension
+        self.ann_threshold = ann_threshold or Config.LOCAL_INDEX_ANN_THRESHOLD
+        self.nprobe = nprobe or Config.LOCAL_INDEX_NPROBE
+        self.codec = VectorCodec.from_config() if codec == "config" else codec
+        self.rescore_factor = Config.VECTOR_RESCORE_FACTOR if rescore_factor is None else rescore_factor
+        self._codec_fit_size = 0
+        self._namespaces: Dict[str, _Namespace] = {}
+        # 병렬 업서트/검색에서 배열 갱신과 IVF 학습이 섞이지 않도록 보호
+        self._lock = threading.RLock()
+
+    def _namespace(self, namespace: Optional[str], create: bool = False) -> Optional[_Namespace]:
+        name = namespace or DEFAULT_NAMESPACE
+        ns = self._namespaces.get(name)
+        if ns is None and create:
+            ns = self._namespaces[name] = _Namespace(self.dimension)
+        return ns
+
+    def _normalize(self, vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        if self.dimension is None:
+            self.dimension = vector.shape[-1]
+        elif vector.shape[-1] != self.dimension:
+            raise ValueError(f"벡터 차원이 인덱스와 다릅니다: {vector.shape[-1]} != {self.dimension}")
+        norm = np.linalg.norm(vector, axis=-1, keepdims=True)
+        return vector / np.maximum(norm, 1e-12)
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None, **kwargs) -> Dict[str, int]:
+        """
+        벡터를 추가하거나 갱신합니다.
+
+        Args:
+            vectors (List[Dict]): {"id", "values", "metadata"} 리스트
+            namespace (str, optional): 네임스페이스
+        """
+        if not vectors:
+            return {"upserted_count": 0}
+        values = self._normalize([item["values"] for item in vectors])
+        with self._lock:
+            ns = self._namespace(namespace, create=True)
+            # 코덱이 학습되어 있으면 추가/갱신된 행만 인코딩 (다음 검색에서 전체를 다시 인코딩하지 않음)
+            codes = self.codec.encode(values) if ns.codes is not None else [None] * len(values)
+            for item, vector, code in zip(vectors, values, codes):
+                ns.upsert(item["id"], vector, dict(item.get("metadata") or {}), code)
+        return {"upserted_count": len(vectors)}
+
+    def _maybe_train(self, ns: _Namespace):
+        """카탈로그가 충분히 크면 IVF를 학습(또는 크기가 두 배가 되면 재학습)합니다."""
+        if ns.size < self.ann_threshold:
+            return
+        if ns.centroids is None or ns.size > 2 * ns.trained_size:
+            n_lists = max(int(np.sqrt(ns.size)), 1)
+            logger.info(f"로컬 인덱스 IVF 학습: {ns.size}개 벡터, {n_lists}개 리스트")
+            ns.train_ivf(n_lists)
+
+    def _ensure_codes(self, ns: _Namespace) -> bool:
+        """압축 코덱을 쓰면 코덱 학습/코드 인코딩을 준비하고 True를 반환합니다."""
+        if self.codec is None:
+            return False
+        if not self.codec.fitted or ns.size > 2 * self._codec_fit_size:
+            logger.info(f"로컬 인덱스 코덱 학습: {self.codec} ({ns.size}개 벡터)")
+            self.codec.fit(ns.vectors)
+            self._codec_fit_size = ns.size
+            for other in self._namespaces.values():
+                other.codes = None
+        if ns.codes is None or len(ns.codes) != ns.size:
+            ns.codes = self.codec.encode(ns.vectors)
+        return True
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """메모리에 올라간 원본 벡터, memory-map으로 연 원본 벡터, 압축 코드가 차지하는 바이트 수"""
+        with self._lock:
+            namespaces = list(self._namespaces.values())
+            return {
+                "vectors": sum(ns.vectors.nbytes for ns in namespaces if not isinstance(ns._vectors, np.memmap)),
+                "mapped_vectors": sum(ns.vectors.nbytes for ns in namespaces if isinstance(ns._vectors, np.memmap)),
+                "codes": sum(ns.codes.nbytes for ns in namespaces if ns.codes is not None)
+            }
+
+    def _uses_ivf(self, ns: _Namespace) -> bool:
+        self._maybe_train(ns)
+        return ns.centroids is not None and ns.size >= self.ann_threshold
+
+    def _candidate_rows(self, ns: _Namespace, query: np.ndarray) -> Optional[np.ndarray]:
+        """IVF 사용 시 탐색할 행 번호 (brute-force면 None)"""
+        if not self._uses_ivf(ns):
+            return None
+        probe = np.argsort(-(ns.centroids @ query))[:self.nprobe]
+        return np.nonzero(np.isin(ns.assignments[:ns.size], probe))[0]
+
+    def _top_k(self, ns: _Namespace, rows: Optional[np.ndarray], scores: np.ndarray,
+               top_k: int, filter: Optional[Dict[str, Any]]) -> List[tuple]:
+        """점수 상위부터 필터를 만족하는 top_k개의 (행, 점수)를 고릅니다."""
+        if filter is None and top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k)[:top_k]
+            order = candidates[np.argsort(-scores[candidates])]
+        else:
+            order = np.argsort(-scores)
+
+        results = []
+        for i in order:
+            row = int(i) if rows is None else int(rows[i])
+            if filter is not None and not match_filter(ns.metadata[row], filter):
+                continue
+            results.append((row, float(scores[i])))
+            if len(results) == top_k:
+                break
+        return results
+
+    def _scan(self, ns: _Namespace, rows: Optional[np.ndarray], query: np.ndarray, top_k: int,
+              filter: Optional[Dict[str, Any]]) -> List[tuple]:
+        """후보 행(None이면 전체)을 채점합니다. 압축 코덱을 쓰면 코드로 1차 검색 후 원본 벡터로 재채점합니다."""
+        if not self._ensure_codes(ns):
+            candidates = ns.vectors if rows is None else ns.vectors[rows]
+            return self._top_k(ns, rows, candidates @ query, top_k, filter)
+
+        codes = ns.codes if rows is None else ns.codes[rows]
+        if not self.rescore_factor:
+            return self._top_k(ns, rows, self.codec.score(codes, query), top_k, filter)
+
+        shortlist = self._top_k(ns, rows, self.codec.score(codes, query), top_k * self.rescore_factor, filter)
+        if not shortlist:
+            return []
+        shortlist_rows = np.array([row for row, _ in shortlist])
+        exact = ns.vectors[shortlist_rows] @ query
+        order = np.argsort(-exact)[:top_k]
+        return [(int(shortlist_rows[i]), float(exact[i])) for i in order]
+
+    def _search(self, ns: _Namespace, query: np.ndarray, top_k: int,
+                filter: Optional[Dict[str, Any]]) -> List[tuple]:
+        rows = self._candidate_rows(ns, query)
+        results = self._scan(ns, rows, query, top_k, filter)
+
+        if rows is not None and len(results) < min(top_k, ns.size):
+            # 필터 때문에 탐색 리스트 안에서 충분히 찾지 못한 경우 전체 탐색
+            results = self._scan(ns, None, query, top_k, filter)
+        return results
+
+    @staticmethod
+    def _to_matches(ns: _Namespace, results: List[tuple], include_metadata: bool,
+                    include_values: bool) -> List[Dict[str, Any]]:
+        matches = []
+        for row, score in results:
+            match = {"id": ns.ids[row], "score": score}
+            if include_metadata:
+                match["metadata"] = ns.metadata[row]
+            if include_values:
+                match["values"] = ns.vectors[row].tolist()
+            matches.append(match)
+        return matches
+
+    def query(self, vector, top_k: int = 10, namespace: Optional[str] = None,
+              filter: Optional[Dict[str, Any]] = None, include_metadata: bool = False,
+              include_values: bool = False, **kwargs) -> Dict[str, Any]:
+        """
+        코사인 유사도 상위 top_k 벡터를 검색합니다.
+
+        Returns:
+            Dict[str, Any]: {"matches": [{"id", "score", "metadata"(, "values")}], "namespace"}
+        """
+        with self._lock:
+            ns = self._namespace(namespace)
+            matches = []
+            if ns is not None and ns.size > 0:
+                results = self._search(ns, self._normalize(vector), top_k, filter)
+                matches = self._to_matches(ns, results, include_metadata, include_values)
+        return {"matches": matches, "namespace": namespace or DEFAULT_NAMESPACE}
+
+    def query_many(self, vectors, top_k: int = 10, namespace: Optional[str] = None,
+                   filter: Union[None, Dict[str, Any], List[Optional[Dict[str, Any]]]] = None,
+                   include_metadata: bool = False, include_values: bool = False) -> List[Dict[str, Any]]:
+        """
+        여러 질의 벡터를 한 번에 검색합니다. brute-force 구간에서는 한 번의 행렬곱으로 모든 점수를 계산합니다.
+
+        Args:
+            vectors: (질의 수, 차원) 질의 벡터
+            filter: 모든 질의에 같은 필터(dict) 또는 질의별 필터 리스트
+
+        Returns:
+            List[Dict[str, Any]]: 질의 순서대로의 query() 응답
+        """
+        filters = filter if isinstance(filter, list) else [filter] * len(vectors)
+        if len(filters) != len(vectors):
+            raise ValueError("질의 수와 필터 수가 다릅니다.")
+
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns is None or ns.size == 0 or len(vectors) == 0:
+                all_results = [[] for _ in vectors]
+            else:
+                queries = self._normalize(vectors)
+                if self._uses_ivf(ns) or self.codec is not None:
+                    all_results = [self._search(ns, q, top_k, f) for q, f in zip(queries, filters)]
+                else:
+                    scores = queries @ ns.vectors.T
+                    all_results = [self._top_k(ns, None, row, top_k, f) for row, f in zip(scores, filters)]
+            responses = [
+                {"matches": self._to_matches(ns, results, include_metadata, include_values) if results else [],
+                 "namespace": namespace or DEFAULT_NAMESPACE}
+                for results in all_results
+            ]
+        return responses
+
+    def reorder(self, ids: Sequence[str], namespace: Optional[str] = None):
+        """
+        행 순서를 ids 순서로 맞춥니다. (카탈로그 순서로 저장해 두면 카탈로그 스냅샷의 임베딩 열과 행이 일치)
+
+        Args:
+            ids (Sequence[str]): 앞에 둘 벡터 ID 순서 (인덱스에 없는 ID는 건너뛰고, ids에 없는 행은 뒤에 둠)
+            namespace (str, optional): 네임스페이스
+        """
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns is not None:
+                ns.reorder(ids)
+
+    def matrix(self, namespace: Optional[str] = None) -> Tuple[List[str], np.ndarray]:
+        """네임스페이스의 (행 순서의 벡터 ID, (행 수, 차원) 정규화된 벡터 배열)"""
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns is None:
+                return [], np.zeros((0, self.dimension or 0), dtype=np.float32)
+            return list(ns.ids), ns.vectors
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """id로 벡터와 메타데이터를 조회합니다."""
+        vectors = {}
+        with self._lock:
+            ns = self._namespace(namespace)
+            for vector_id in ids if ns is not None else []:
+                row = ns.rows.get(vector_id)
+                if row is not None:
+                    vectors[vector_id] = {
+                        "id": vector_id,
+                        "values": ns.vectors[row].tolist(),
+                        "metadata": ns.metadata[row]
+                    }
+        return {"vectors": vectors, "namespace": namespace or DEFAULT_NAMESPACE}
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: bool = False,
+               namespace: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """id 목록 또는 네임스페이스 전체를 삭제합니다."""
+        name = namespace or DEFAULT_NAMESPACE
+        with self._lock:
+            if delete_all:
+                self._namespaces.pop(name, None)
+                return {}
+            ns = self._namespaces.get(name)
+            if ns is not None:
+                for vector_id in ids or []:
+                    ns.delete(vector_id)
+        return {}
+
+    def list(self, namespace: Optional[str] = None, prefix: Optional[str] = None,
+             limit: int = 100, **kwargs) -> Iterator[List[str]]:
+        """네임스페이스의 id를 limit개씩 나누어 반환합니다. (Pinecone list와 같은 페이지 단위)"""
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns is None:
+                return
+            ids = [vector_id for vector_id in ns.ids if prefix is None or vector_id.startswith(prefix)]
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def describe_index_stats(self, **kwargs) -> Dict[str, Any]:
+        namespaces = {name: {"vector_count": ns.size} for name, ns in self._namespaces.items()}
+        return {
+            "dimension": self.dimension,
+            "total_vector_count": sum(ns.size for ns in self._namespaces.values()),
+            "namespaces": namespaces
+        }
+
+    def save(self, path: str):
+        """
+        인덱스를 디렉터리에 저장합니다. (벡터는 .npy, id/메타데이터는 JSON)
+        배열 파일은 저장할 때마다 새 세대 이름으로 쓰고 index.json을 마지막에 교체하므로,
+        중간에 중단되어도 index.json은 항상 온전한 한 세대의 파일만 가리킵니다. (이전 세대 파일은 교체 후 삭제)
+        """
+        os.makedirs(path, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+        manifest = {"dimension": self.dimension, "namespaces": [], "codec": None, "codec_file": None}
+        with self._lock:
+            for i, (name, ns) in enumerate(self._namespaces.items()):
+                entry = {"name": name, "ids": list(ns.ids), "metadata": list(ns.metadata),
+                         "vectors_file": f"vectors_{generation}_{i}.npy", "codes_file": None}
+                _save_array(os.path.join(path, entry["vectors_file"]), ns.vectors)
+                if self._ensure_codes(ns):
+                    entry["codes_file"] = f"codes_{generation}_{i}.npy"
+                    _save_array(os.path.join(path, entry["codes_file"]), ns.codes)
+                manifest["namespaces"].append(entry)
+            if self.codec is not None:
+                manifest["codec"] = repr(self.codec)
+                manifest["codec_file"] = f"codec_{generation}.npz"
+                with open(os.path.join(path, manifest["codec_file"]), "wb") as f:
+                    np.savez(f, **self.codec.state())
+
+        tmp_file = os.path.join(path, "index.json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_file, os.path.join(path, "index.json"))
+        _remove_stale_arrays(path, manifest)
+        logger.info(f"로컬 인덱스 저장 완료: {path} ({self.describe_index_stats()['total_vector_count']}개)")
+
+    @classmethod
+    def load(cls, path: str, shared_vectors: Optional[Dict[str, Tuple[Sequence[str], np.ndarray]]] = None,
+             **kwargs) -> "LocalIndex":
+        """
+        save()로 저장한 인덱스를 불러옵니다.
+        압축 코덱을 쓰는 경우 원본 벡터는 memory-map(copy-on-write)으로 열어 재채점할 때만 읽습니다.
+
+        Args:
+            path (str): 인덱스 디렉터리
+            shared_vectors (Dict, optional): {네임스페이스: (벡터 ID 순서, 벡터 배열)} - 저장된 ID 순서와 같으면
+                                             벡터 파일 대신 이 배열(예: 카탈로그 스냅샷의 memory-map 임베딩 열)을 복사 없이 사용
+        """
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        index = cls(dimension=manifest["dimension"], **kwargs)
+        # 저장 당시와 같은 코덱 설정이면 학습된 코덱과 코드를 그대로 사용
+        restore_codes = index.codec is not None and manifest.get("codec") == repr(index.codec)
+        if restore_codes:
+            with np.load(os.path.join(path, manifest.get("codec_file") or "codec.npz")) as state:
+                index.codec = VectorCodec.from_state(dict(state))
+
+        for i, entry in enumerate(manifest["namespaces"]):
+            # 세대 이름이 없는 예전 형식의 인덱스는 vectors_{i}.npy / codes_{i}.npy
+            vectors_file = os.path.join(path, entry.get("vectors_file") or f"vectors_{i}.npy")
+            ns = index._namespace(entry["name"], create=True)
+            shared = (shared_vectors or {}).get(entry["name"])
+            if (shared is not None and shared[1].shape == (len(entry["ids"]), manifest["dimension"])
+                    and list(shared[0]) == entry["ids"]):
+                # 읽기 전용 배열을 그대로 사용 (업서트/삭제할 때 복사)
+                ns._vectors = shared[1]
+                ns.assignments = np.full(len(ns._vectors), -1, dtype=np.int32)
+            elif index.codec is not None:
+                ns._vectors = np.load(vectors_file, mmap_mode="c")
+                ns.assignments = np.full(len(ns._vectors), -1, dtype=np.int32)
+            else:
+                vectors = np.load(vectors_file)
+                ns._ensure_capacity(len(vectors))
+                ns._vectors[:len(vectors)] = vectors
+            if restore_codes:
+                ns.codes = np.load(os.path.join(path, entry.get("codes_file") or f"codes_{i}.npy"))
+                index._codec_fit_size = max(index._codec_fit_size, len(ns.codes))
+            ns.ids = list(entry["ids"])
+            ns.metadata = list(entry["metadata"])
+            ns.rows = {vector_id: row for row, vector_id in enumerate(ns.ids)}
+            ns.size = len(ns.ids)
+        logger.info(f"로컬 인덱스 로드 완료: {path} ({index.describe_index_stats()['total_vector_count']}개)")
+        return index
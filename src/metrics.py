@@ -0,0 +1,86 @@
+"""
+프로세스 내 간단한 메트릭 수집기
+카운터, 소요 시간(count/total/max), 값 분포(토큰 수 등 시간이 아닌 값의 히스토그램)를 모아
+/api/metrics 등에서 조회할 수 있게 합니다.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+
+class Metrics:
+    """스레드 안전한 카운터/타이머/값 히스토그램 모음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._values: Dict[str, Dict[str, Any]] = {}
+
+    def increment(self, name: str, value: int = 1):
+        """카운터를 증가시킵니다."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        """소요 시간을 기록합니다."""
+        with self._lock:
+            timing = self._timings.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            timing['count'] += 1
+            timing['total'] += seconds
+            timing['max'] = max(timing['max'], seconds)
+
+    def record(self, name: str, value: float):
+        """
+        시간이 아닌 값(토큰 수, 문서 수 등)을 기록합니다.
+        count/합계/최대와 함께 2의 거듭제곱 상한 버킷(<=1, <=2, <=4, ...)별 개수를 모읍니다.
+        """
+        bucket = 1 if value <= 1 else 2 ** math.ceil(math.log2(value))
+        with self._lock:
+            stats = self._values.setdefault(name, {'count': 0, 'total': 0.0, 'max': value, 'buckets': {}})
+            stats['count'] += 1
+            stats['total'] += value
+            stats['max'] = max(stats['max'], value)
+            stats['buckets'][bucket] = stats['buckets'].get(bucket, 0) + 1
+
+    @contextmanager
+    def timer(self, name: str):
+        """with 블록의 소요 시간을 기록합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 메트릭 값을 복사하여 반환합니다."""
+        with self._lock:
+            timings = {
+                name: {
+                    'count': timing['count'],
+                    'avg_seconds': timing['total'] / timing['count'] if timing['count'] else 0.0,
+                    'max_seconds': timing['max']
+                }
+                for name, timing in self._timings.items()
+            }
+            values = {
+                name: {
+                    'count': stats['count'],
+                    'avg': stats['total'] / stats['count'],
+                    'max': stats['max'],
+                    'histogram': {f"<={bucket}": count for bucket, count in sorted(stats['buckets'].items())}
+                }
+                for name, stats in self._values.items()
+            }
+            return {'counters': dict(self._counters), 'timings': timings, 'values': values}
+
+
+# 프로세스 전역 메트릭
+metrics = Metrics()
@@ -5,6 +5,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 from src.config import Config, CATEGORY_CODES,HASHTAGS
+from src.text_normalizer import normalize_record
+from src.catalog_refresh import publish_catalog
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -115,8 +117,11 @@ class BizInfoAPI:
         filepath = os.path.join(Config.OUTPUT_DIR, filename)
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
+            # 임시 파일에 쓴 뒤 교체 (읽는 쪽은 항상 온전한 이전 파일 또는 새 파일을 봄)
+            tmp_path = f"{filepath}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, filepath)
             
             logger.info(f"데이터가 성공적으로 저장되었습니다: {filepath}")
             return filepath
@@ -160,18 +165,20 @@ class BizInfoAPI:
         logger.info(f"기술 분야 지원사업 데이터 저장 완료: {filepath}")
 
 
-    def categories_list_search(self,category_list: list):
+    def categories_list_search(self,category_list: list, prepare=None):
         # 분야별 코드 정의
         """
         Argument : category_list : list
         Example : ["기술", "금융"]
         카테고리 리스트를 입력받아서 리스트 전체의 지원사업을 반환하는 함수입니다. (현재 파일출력)
-        Return : category_data : dict
+        prepare : 카탈로그 교체 전에 호출할 prepare(staged_file, catalog) -> 스냅샷 문서 임베딩 (publish_catalog 참고, 벡터 인덱스 동기화 등)
+        Return : filepath : str (교체된 카탈로그 파일 경로, Config.CATALOG_FILE)
         """
         # 새로운 딕셔너리 만들기
         categories = {k: CATEGORY_CODES[k] for k in category_list}
         category_data = {}
         extract_category_data = {}
+        failed = []
 
         for name, code in categories.items():
             logger.info(f"{name} 분야 조회 중...")
@@ -182,13 +189,16 @@ class BizInfoAPI:
                     search_lclas_id=code,
                     search_cnt=20
                 )
+                # 정리된 본문/짧은 요약을 원본 옆에 저장 (프롬프트/임베딩에서 재사용)
+                for record in data.get('jsonArray', []):
+                    normalize_record(record)
                 
                 category_data[name] = data
                 # 개별 파일로도 저장
                 self.save_to_json(data, f"data/{name}_support_programs.json")
                 
                 try:
-                    file_path = 'src/data/all_categories.json'
+                    file_path = Config.CATALOG_FILE
                     with open(file_path, 'r', encoding='utf-8') as f:
                         data_for_extract = json.load(f) # 파일에서 JSON 데이터를 읽어와 Python 딕셔너리로 변환
                     
@@ -206,10 +216,17 @@ class BizInfoAPI:
                 
             except Exception as e:
                 logger.error(f"{name} 분야 조회 실패: {e}")
-        
-        # 전체 분야 데이터를 하나의 파일로 저장
-        filepath = self.save_to_json(category_data, "data/all_categories.json")
+                failed.append(name)
+
+        # 일부 분야라도 조회에 실패하면 현재 카탈로그를 그대로 유지
+        if failed:
+            raise RuntimeError(f"지원사업 조회 실패로 카탈로그를 교체하지 않았습니다: {', '.join(failed)}")
+
+        # 전체 분야 데이터를 옆에서 준비한 뒤 카탈로그 파일/캐시/스냅샷을 한 번에 교체
+        filepath = Config.CATALOG_FILE
+        publish_catalog(category_data, filepath, prepare=prepare)
         logger.info(f"전체 분야 데이터 저장 완료: {filepath}")
+        return filepath
 
 
 if __name__ == "__main__":
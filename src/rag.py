@@ -1,44 +1,67 @@
 
-from langchain_pinecone import PineconeVectorStore
 from langchain.chains import create_retrieval_chain
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel, BaseLLM
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import Runnable, RunnableLambda, RunnablePassthrough
+import asyncio
+import json
 import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+from src.config import Config
+from src.context_builder import ContextBuilder
 from src.db_connector import DB_Pinecone
+from src.embedding_cache import normalize_text
+from src.metrics import metrics
+from src.semantic_cache import SemanticCache
+from src.ttl_cache import TTLCache
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("rag initialize")
 
+def streams_tokens(llm) -> bool:
+    """
+    LLM이 생성 중인 답변을 토큰 단위로 스트리밍하는지 확인합니다.
+    (_stream/_astream을 구현하지 않은 langchain LLM(VLLM 등)은 astream이 완성된 답변을 한 번에 돌려줌)
+    """
+    if not isinstance(llm, Runnable):
+        # AbortableVLLM / RemoteLLM
+        return callable(getattr(llm, "astream", None))
+    for base in (BaseLLM, BaseChatModel):
+        if isinstance(llm, base):
+            return type(llm)._stream is not base._stream or type(llm)._astream is not base._astream
+    return True
+
 class Ragchain:
-    def __init__(self,dbcon:DB_Pinecone,llm_model):
+    def __init__(self,dbcon:DB_Pinecone,llm_model,top_k:Optional[int]=None,filters:Optional[Dict[str, Any]]=None):
+        """
+        Args:
+            dbcon (DB_Pinecone): 벡터 DB 연결
+            llm_model: 답변 생성 LLM
+            top_k (int, optional): 질의마다 검색할 문서 수 (None일 경우 Config에서 가져옴)
+            filters (Dict[str, Any], optional): 검색 조건 (DB_Pinecone.search_database 참고)
+        """
         self.pinecone = dbcon
-        self.vectorstore = PineconeVectorStore(
-            index=dbcon.index,
-            embedding=dbcon.embed_model,
-            text_key="metadata.summary",    
-            namespace="kt-agent"  
-        )
-        logger.info(f"✅ 벡터스토어 변환 성공했습니다. ")
+        self.top_k = top_k or Config.RAG_TOP_K
+        self.filters = filters
         self.llm = llm_model
+        self.streaming = streams_tokens(self.llm)
         logger.info(f"✅ RAG에 사용 될 LLM 모델로드에 성공했습니다. : {self.llm} ")
+        if not self.streaming:
+            logger.warning("⚠️ LLM이 토큰 스트리밍을 지원하지 않아 astream은 완성된 답변을 한 번에 반환합니다.")
 
         #### Retriever
-        #self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 30})
-        #temper = self.retriever.invoke("AI관련된 사업 추천해줘")
-
-        def format_docs(docs):
-            logger.info(f"✅ docs를 보여드립니다. {docs}")
-            if len(docs) == 0:
-                logger.info("✅ 해당하는 문서가 없습니다!")
-                return None
-            # 검색한 문서 결과를 하나의 문단으로 합쳐줍니다.
-            return "\n\n".join(doc.page_content for doc in docs)
+        # 생성 시점에 한 번 검색하지 않고, 질의마다 검색 (같은 질의는 캐시된 결과 재사용)
+        self.retrieval_cache = TTLCache(Config.RAG_RETRIEVAL_CACHE_SIZE, Config.RAG_RETRIEVAL_CACHE_TTL_SECONDS)
+        self.retriever = RunnableLambda(self.retrieve, afunc=self.aretrieve)
+        # 검색 결과를 중복 제거 / MMR / 토큰 예산 패킹으로 압축하여 컨텍스트 구성
+        self.context_builder = ContextBuilder()
+        # 표현만 다른 같은 의도의 질문은 생성한 답변을 재사용 (카탈로그 버전별)
+        self.answer_cache = SemanticCache()
 
-
-        docs = self.pinecone.search_database("AI관련된 사업 추천해줘",30)
-        context=format_docs(docs)
         #### Prompt
         self.system_prompt = (
             """
@@ -76,16 +99,154 @@ class Ragchain:
             ("human", "{input}")
         ])
         
-        # Chainning
+        # Chainning (검색과 입력 전달은 병렬 단계로 실행되며, ainvoke/abatch로 비동기 동시 처리 가능)
+        # Runnable이 아닌 엔진(AbortableVLLM / RemoteLLM)은 문자열 프롬프트를 받는 단계로 감쌈
+        generate = self.llm if isinstance(self.llm, Runnable) else RunnableLambda(self.generate, afunc=self.agenerate)
         self.rag_chain = (
-            {"context": context, "input": RunnablePassthrough()}
+            {"context": RunnableLambda(self.build_context, afunc=self.abuild_context), "input": RunnablePassthrough()}
             | self.prompt
-            | self.llm
+            | generate
             | StrOutputParser()
         )
 
         logger.info(f"✅ RAG whole Prompt : {self.prompt} \n\n ")
 
+    def build_context(self, question: str) -> Optional[str]:
+        """질의로 문서를 검색하고 압축된 컨텍스트를 만듭니다."""
+        return self.context_builder.build(question, self.retrieve(question))
+
+    async def abuild_context(self, question: str) -> Optional[str]:
+        """build_context()의 비동기 버전"""
+        return self.context_builder.build(question, await self.aretrieve(question))
+
+    def generate(self, prompt_value) -> str:
+        """Runnable이 아닌 엔진으로 프롬프트에 대한 답변을 생성합니다."""
+        return self.llm.invoke(prompt_value.to_string())
+
+    async def agenerate(self, prompt_value) -> str:
+        """generate()의 비동기 버전 (생성은 스레드에서 대기)"""
+        return await asyncio.to_thread(self.generate, prompt_value)
+
+    def _cache_scope(self):
+        """캐시 범위: 카탈로그 버전과 검색 조건이 같을 때만 결과를 재사용"""
+        return (self.pinecone.catalog_version, self.top_k, json.dumps(self.filters, ensure_ascii=False, sort_keys=True, default=str))
+
+    def _cache_key(self, question: str):
+        return (normalize_text(question),) + self._cache_scope()
+
+    def retrieve(self, question: str) -> List[Document]:
+        """
+        질의에 맞는 지원사업 문서를 검색합니다. (같은 질의는 캐시된 결과 재사용)
+
+        Args:
+            question (str): 사용자 질의
+
+        Returns:
+            List[Document]: 검색된 문서 (캐시와 공유되므로 수정하지 않아야 함)
+        """
+        key = self._cache_key(question)
+        docs = self.retrieval_cache.get(key)
+        if docs is not None:
+            metrics.increment("rag.retrieval_cache_hits")
+            return docs
+
+        metrics.increment("rag.retrieval_cache_misses")
+        with metrics.timer("rag.retrieval_seconds"):
+            docs = self.pinecone.search_database(question, self.top_k, filters=self.filters)
+        self.retrieval_cache.put(key, docs)
+        return docs
+
+    async def aretrieve(self, question: str) -> List[Document]:
+        """retrieve()의 비동기 버전 (검색은 스레드에서 실행되어 이벤트 루프를 막지 않음)"""
+        return await asyncio.to_thread(self.retrieve, question)
+
+    def cached_answer(self, question: str, scope):
+        """
+        시맨틱 캐시에서 비슷한 질문의 답변을 찾습니다.
+
+        Args:
+            question (str): 사용자 질의
+            scope: 캐시 범위 (_cache_scope())
+
+        Returns:
+            Tuple[Optional[str], Optional[List[float]]]: (캐시된 답변 또는 None, 질문 임베딩)
+        """
+        if not self.answer_cache.enabled:
+            return None, None
+        # 질의 임베딩은 DB_Pinecone의 질의 캐시에 남으므로 이후 검색에서 다시 계산하지 않음
+        vector = self.pinecone.embed_query(question)
+        hit = self.answer_cache.lookup(vector, scope)
+        if hit is None:
+            metrics.increment("rag.answer_cache_misses")
+            return None, vector
+        answer, similarity = hit
+        metrics.increment("rag.answer_cache_hits")
+        logger.info(f"✅ 시맨틱 캐시 적중 (유사도 {similarity:.3f})")
+        return answer, vector
+
+    def invoke(self, question: str) -> str:
+        """질의에 대해 검색 -> 답변 생성을 실행합니다. (비슷한 질문의 답변이 캐시에 있으면 바로 반환)"""
+        # 생성 중에 카탈로그가 갱신되더라도 답변은 생성을 시작한 시점의 버전으로 저장
+        scope = self._cache_scope()
+        answer, vector = self.cached_answer(question, scope)
+        if answer is not None:
+            return answer
+        answer = self.rag_chain.invoke(question)
+        if vector is not None:
+            self.answer_cache.store(question, vector, answer, scope)
+        return answer
+
+    async def ainvoke(self, question: str) -> str:
+        """invoke()의 비동기 버전"""
+        scope = self._cache_scope()
+        answer, vector = await asyncio.to_thread(self.cached_answer, question, scope)
+        if answer is not None:
+            return answer
+        answer = await self.rag_chain.ainvoke(question)
+        if vector is not None:
+            self.answer_cache.store(question, vector, answer, scope)
+        return answer
+
+    async def astream(self, question: str) -> AsyncIterator[str]:
+        """
+        검색을 마친 뒤 LLM이 생성하는 답변을 조각 단위로 돌려줍니다.
+        첫 조각까지의 시간(검색 포함)은 rag.ttft_seconds 지표로 기록합니다.
+
+        Args:
+            question (str): 사용자 질의
+
+        Yields:
+            str: 답변 텍스트 조각
+        """
+        start = time.perf_counter()
+        scope = self._cache_scope()
+        answer, vector = await asyncio.to_thread(self.cached_answer, question, scope)
+        if answer is not None:
+            metrics.observe("rag.ttft_seconds", time.perf_counter() - start)
+            yield answer
+            return
+
+        context = await self.abuild_context(question)
+        prompt_value = await self.prompt.ainvoke({"context": context, "input": question})
+        # langchain LLM/채팅 모델은 PromptValue를, 그 외 스트리밍 엔진(AbortableVLLM)은 문자열 프롬프트를 받음
+        prompt = prompt_value if isinstance(self.llm, Runnable) else prompt_value.to_string()
+
+        chunks = []
+        async for chunk in self.llm.astream(prompt):
+            text = chunk if isinstance(chunk, str) else chunk.content
+            if not text:
+                continue
+            if not chunks:
+                ttft = time.perf_counter() - start
+                metrics.observe("rag.ttft_seconds", ttft)
+                logger.info(f"✅ 첫 토큰까지 {ttft:.2f}초")
+            chunks.append(text)
+            yield text
+
+        metrics.observe("rag.stream_seconds", time.perf_counter() - start)
+        if vector is not None and chunks:
+            self.answer_cache.store(question, vector, "".join(chunks), scope)
+
 
 
 
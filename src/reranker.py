@@ -0,0 +1,173 @@
+"""
+2단계 지원사업 선별 (recall -> rerank)
+LLM 호출 전에 CPU에서 후보를 좁혀, LLM은 최종 top-K의 추천사유 작성에만 사용합니다.
+
+1단계: BM25(lexical) 또는 임베딩으로 후보 recall
+2단계: 가벼운 cross-encoder 또는 lexical 스코어링 헤드로 rerank
+"""
+
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.bm25 import BM25Index
+from src.catalog import catalog_stamp, load_catalog
+from src.catalog_snapshot import load_snapshot
+from src.config import Config
+from src.text_normalizer import program_text
+from src.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def build_user_query(user: User) -> str:
+    """사용자 정보를 검색 질의 문자열로 변환합니다."""
+    return f"{' '.join(user.category_list)} {user.main_business_summary}".strip()
+
+
+class LexicalReranker:
+    """
+    idf 가중 질의 커버리지 기반 스코어링 헤드 (모델 없이 CPU에서 동작)
+    idf는 후보 목록이 아니라 전체 카탈로그로 계산하고(카탈로그가 교체되면 다시 계산) 카탈로그에 없는 질의 토큰도
+    고정 idf로 분모에 넣으므로, 0~1 점수는 후보 집합과 무관하여 캐스케이드 임계값과 비교할 수 있습니다.
+    """
+
+    def __init__(self, corpus: Optional[List[str]] = None, json_file=None):
+        """
+        Args:
+            corpus (List[str], optional): idf를 계산할 문서 (None일 경우 카탈로그의 지원사업)
+            json_file: 카탈로그 JSON 경로 (None일 경우 Config.CATALOG_FILE, 파일이 없으면 모든 토큰을 같은 가중치로 계산)
+        """
+        self.json_file = json_file
+        self._fixed = corpus is not None
+        self._idf_index: Optional[BM25Index] = BM25Index().fit(corpus) if self._fixed else None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def idf_index(self) -> BM25Index:
+        """idf를 계산한 전체 카탈로그 인덱스"""
+        if self._fixed:
+            return self._idf_index
+        stamp = catalog_stamp(self.json_file)
+        with self._lock:
+            if self._idf_index is None or stamp != self._stamp:
+                self._idf_index, self._stamp = BM25Index().fit(self._catalog_texts() if stamp else []), stamp
+            return self._idf_index
+
+    def _catalog_texts(self) -> List[str]:
+        # 현재 카탈로그로 만든 스냅샷이 있으면 JSON 카탈로그를 파싱하지 않음
+        snapshot = load_snapshot()
+        if snapshot is not None and snapshot.is_current(self.json_file):
+            return [snapshot.program_text(row) for row in range(len(snapshot))]
+        return [program_text(program) for program in load_catalog(self.json_file).records]
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        idf_index = self.idf_index()
+        return [idf_index.coverage(query, text) for text in texts]
+
+
+class CrossEncoderReranker:
+    """sentence-transformers CrossEncoder 기반 reranker (0~1 점수)"""
+
+    def __init__(self, model_name: str, batch_size: int = 16):
+        """
+        Args:
+            model_name (str): CrossEncoder 모델명 (예: cross-encoder/mmarco-mMiniLMv2-L12-H384-v1)
+            batch_size (int): 추론 배치 크기
+        """
+        from sentence_transformers import CrossEncoder
+
+        logger.info(f"CrossEncoder reranker 로드 중: {model_name}")
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        if not texts:
+            return []
+        logits = self.model.predict([(query, text) for text in texts], batch_size=self.batch_size)
+        return [1 / (1 + math.exp(-float(logit))) for logit in logits]
+
+
+def create_reranker(model_name: Optional[str] = None):
+    """
+    설정에 맞는 reranker를 생성합니다.
+    모델명이 없거나 sentence-transformers가 설치되지 않은 경우 lexical 스코어링 헤드를 사용합니다.
+    """
+    model_name = Config.RERANKER_MODEL if model_name is None else model_name
+    if not model_name:
+        return LexicalReranker()
+    try:
+        return CrossEncoderReranker(model_name)
+    except ImportError:
+        logger.warning("sentence-transformers가 설치되지 않아 lexical reranker를 사용합니다.")
+        return LexicalReranker()
+
+
+class TwoStageSelector:
+    """recall + rerank 2단계 후보 선별기"""
+
+    def __init__(self,
+                 reranker=None,
+                 recall_k: Optional[int] = None,
+                 top_k: Optional[int] = None,
+                 embedder=None):
+        """
+        Args:
+            reranker: score(query, texts) -> List[float]를 제공하는 객체 (None일 경우 설정에 따라 생성)
+            recall_k (int, optional): 1단계 recall 후보 수 (None일 경우 Config에서 가져옴)
+            top_k (int, optional): 2단계 이후 최종 후보 수 (None일 경우 Config에서 가져옴)
+            embedder: embed_query/embed_passages를 제공하는 객체 (예: DB_Pinecone - e5 prefix/임베딩 캐시 적용, None일 경우 BM25 recall)
+        """
+        self.reranker = reranker or create_reranker()
+        self.recall_k = recall_k or Config.TWO_STAGE_RECALL_K
+        self.top_k = top_k or Config.TWO_STAGE_TOP_K
+        self.embedder = embedder
+
+    def _recall(self, query: str, texts: List[str]) -> List[int]:
+        """1단계: 후보 recall"""
+        if len(texts) <= self.recall_k:
+            return list(range(len(texts)))
+
+        if self.embedder is not None:
+            import numpy as np
+
+            query_vector = np.asarray(self.embedder.embed_query(query), dtype=np.float32)
+            doc_vectors = np.asarray(self.embedder.embed_passages(texts), dtype=np.float32)
+            sims = doc_vectors @ query_vector / (
+                np.linalg.norm(doc_vectors, axis=1) * np.linalg.norm(query_vector) + 1e-12
+            )
+            return [int(i) for i in np.argsort(-sims)[:self.recall_k]]
+
+        bm25 = BM25Index().fit(texts)
+        recalled = [doc_id for doc_id, _ in bm25.search(query, self.recall_k)]
+        if len(recalled) < self.recall_k:
+            # 질의 토큰과 겹치지 않는 문서는 원래 순서대로 채웁니다.
+            seen = set(recalled)
+            recalled.extend(i for i in range(len(texts)) if i not in seen)
+            recalled = recalled[:self.recall_k]
+        return recalled
+
+    def select(self, user: User, programs: List[Dict]) -> List[Tuple[Dict, float]]:
+        """
+        사용자에게 적합한 최종 후보를 선별합니다.
+
+        Args:
+            user (User): 사용자 정보
+            programs (List[Dict]): 전체 후보 지원사업 (pblancNm, bsnsSumryCn 포함)
+
+        Returns:
+            List[Tuple[Dict, float]]: (지원사업, 0~1 rerank 점수) 리스트 (점수 내림차순)
+        """
+        if not programs:
+            return []
+
+        query = build_user_query(user)
+        texts = [program_text(program) for program in programs]
+
+        recalled = self._recall(query, texts)
+        scores = self.reranker.score(query, [texts[i] for i in recalled])
+        ranked = sorted(zip(recalled, scores), key=lambda item: item[1], reverse=True)[:self.top_k]
+
+        logger.info(f"2단계 선별 완료: 전체 {len(programs)}개 -> recall {len(recalled)}개 -> top {len(ranked)}개")
+        return [(programs[i], score) for i, score in ranked]
@@ -0,0 +1,80 @@
+"""
+시맨틱 답변 캐시
+표현만 다른 같은 의도의 질문("AI 관련 사업 추천", "인공지능 지원사업 알려줘")에
+이미 생성한 답변을 재사용합니다.
+
+질문 임베딩과 캐시된 질문 임베딩의 코사인 유사도가 임계값 이상이면 적중으로 봅니다.
+항목은 범위(scope, 카탈로그 버전 + 검색 조건)별로 구분되어, 카탈로그가 바뀌면
+이전 답변은 더 이상 조회되지 않고 LRU/TTL로 자연스럽게 제거됩니다.
+"""
+
+import logging
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from src.config import Config
+from src.embedding_cache import normalize_text
+from src.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """임베딩 유사도 기반 LRU + TTL 답변 캐시"""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None, threshold: Optional[float] = None):
+        """
+        Args:
+            maxsize (int, optional): 최대 항목 수 (0이면 캐시 비활성화)
+            ttl (float, optional): 항목 유효 시간 (초)
+            threshold (float, optional): 적중으로 볼 최소 코사인 유사도
+            (None인 설정값은 Config에서 가져옴)
+        """
+        self.maxsize = Config.SEMANTIC_CACHE_SIZE if maxsize is None else maxsize
+        self.threshold = Config.SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self._entries = TTLCache(max(self.maxsize, 1), Config.SEMANTIC_CACHE_TTL_SECONDS if ttl is None else ttl)
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, vector: List[float], scope: Hashable) -> Optional[Tuple[str, float]]:
+        """
+        가장 유사한 캐시 질문의 답변을 찾습니다.
+
+        Args:
+            vector (List[float]): 정규화된 질문 임베딩
+            scope (Hashable): 캐시 범위 (같은 범위의 항목만 비교)
+
+        Returns:
+            Optional[Tuple[str, float]]: (답변, 유사도), 임계값 미만이면 None
+        """
+        if not self.enabled:
+            return None
+        candidates = [(key, entry) for key, entry in self._entries.items() if key[0] == scope]
+        if not candidates:
+            return None
+
+        matrix = np.asarray([entry[0] for _, entry in candidates], dtype=np.float32)
+        scores = matrix @ np.asarray(vector, dtype=np.float32)
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+        if similarity < self.threshold:
+            return None
+        # 적중한 항목은 LRU 순서를 갱신
+        key, (_, answer) = candidates[best]
+        self._entries.get(key)
+        return answer, similarity
+
+    def store(self, question: str, vector: List[float], answer: str, scope: Hashable):
+        """질문 임베딩과 답변을 저장합니다. (같은 범위의 같은 질문은 덮어씀)"""
+        if not self.enabled:
+            return
+        self._entries.put((scope, normalize_text(question)), (vector, answer))
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,305 @@
+"""
+메모리 효율적인 지원사업 레코드
+기업마당 JSON 레코드(21개 키 dict)를 그대로 들고 있지 않고,
+
+- 자주 읽는 필드만 __slots__ 속성으로 보관하고
+- 기관명/분야/해시태그처럼 반복되는 문자열은 intern하여 하나의 객체를 공유하며
+- 읽지 않는 나머지 필드(원본 HTML 본문 포함)는 한 덩어리의 UTF-8 JSON 바이트로 두었다가 접근할 때만 풀어 씁니다.
+
+파싱은 지연되지 않습니다. 카탈로그를 읽을 때 JSON 전체를 한 번 파싱하고, 나머지 필드는 레코드마다 곧바로
+JSON 바이트로 다시 직렬화합니다. (압축은 하지 않음 - 로드 시간을 늘리지 않고 dict보다 작은 메모리만 얻음)
+JSON 파싱 자체를 건너뛰려면 카탈로그 스냅샷(src.catalog_snapshot)을 사용합니다.
+
+dict와 같은 방식(record["pblancNm"], record.get(...))으로도 읽을 수 있어 기존 코드에 그대로 넘길 수 있습니다.
+대량 필터링에는 분야/기관/해시태그/신청기간을 배열로 모은 ProgramColumns를 사용합니다.
+"""
+
+import json
+import re
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 신청기간 "20250825 ~ 20250919" 형식 (그 외 "상시 접수", "예산 소진시까지" 등은 기간 제한 없음으로 저장)
+APPLICATION_PERIOD_PATTERN = re.compile(r"(\d{8})\s*~\s*(\d{8})")
+OPEN_ENDED_PERIOD = (0, 99991231)
+
+
+def parse_application_period(text: Optional[str]) -> Tuple[int, int]:
+    """
+    신청기간 문자열을 (시작일, 종료일) YYYYMMDD 정수로 변환합니다.
+
+    Returns:
+        Tuple[int, int]: 기간을 알 수 없으면 (0, 99991231)
+    """
+    found = APPLICATION_PERIOD_PATTERN.search(text or "")
+    if not found:
+        return OPEN_ENDED_PERIOD
+    return int(found.group(1)), int(found.group(2))
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+def split_hashtags(value) -> Tuple[str, ...]:
+    """"AI,제조" 형식 문자열(또는 리스트)을 intern된 해시태그 튜플로 변환합니다."""
+    if isinstance(value, (list, tuple)):
+        tags = value
+    else:
+        tags = (value or "").split(",")
+    return tuple(sys.intern(tag.strip()) for tag in tags if tag and tag.strip())
+
+
+# 반복되는 값이 많아 intern하는 필드
+INTERNED_FIELDS = ("pldirSportRealmLclasCodeNm", "jrsdInsttNm", "excInsttNm")
+
+
+@dataclass(slots=True)
+class SupportProgram:
+    """지원사업 공고 (자주 읽는 필드만 속성으로 보관, 값이 None인 속성 필드는 없는 필드로 취급)"""
+
+    pblancId: str
+    pblancNm: Optional[str] = None
+    pldirSportRealmLclasCodeNm: Optional[str] = None
+    jrsdInsttNm: Optional[str] = None
+    excInsttNm: Optional[str] = None
+    reqstBeginEndDe: Optional[str] = None
+    rceptEngnHmpgUrl: Optional[str] = None
+    pblancUrl: Optional[str] = None
+    fileNm: Optional[str] = None
+    cleanSumryCn: Optional[str] = None
+    compactSumryCn: Optional[str] = None
+    tags: Tuple[str, ...] = ()
+    # 나머지 필드 (UTF-8 JSON 바이트, 접근할 때만 풀어 씀)
+    _extra: bytes = b""
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "SupportProgram":
+        """기업마당 JSON 레코드로 만듭니다."""
+        values = {}
+        extra = {}
+        for key, value in record.items():
+            if key in _ATTRIBUTE_FIELDS:
+                values[key] = _intern(value) if key in INTERNED_FIELDS else value
+            elif key == "hashtags":
+                values["tags"] = split_hashtags(value)
+            else:
+                extra[key] = value
+        program = cls(**values)
+        program._extra = _pack(extra)
+        return program
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        """속성으로 보관하지 않은 나머지 필드 (매번 새로 풀어 쓰므로 반복 접근은 피할 것)"""
+        return _unpack(self._extra)
+
+    @property
+    def application_period(self) -> Tuple[int, int]:
+        return parse_application_period(self.reqstBeginEndDe)
+
+    # dict와 같은 방식의 접근 (기존 레코드 dict를 받던 코드와 호환)
+    def __getitem__(self, key: str) -> Any:
+        if key in _ATTRIBUTE_FIELDS:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if key == "hashtags":
+            return ",".join(self.tags)
+        return self.extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        if key in _ATTRIBUTE_FIELDS:
+            return getattr(self, key) is not None
+        return key == "hashtags" or key in self.extra
+
+    def __setitem__(self, key: str, value: Any):
+        if key in _ATTRIBUTE_FIELDS:
+            setattr(self, key, _intern(value) if key in INTERNED_FIELDS else value)
+        elif key == "hashtags":
+            self.tags = split_hashtags(value)
+        else:
+            extra = self.extra
+            extra[key] = value
+            self._extra = _pack(extra)
+
+    def keys(self) -> List[str]:
+        return list(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """원본 형식의 레코드 dict"""
+        record = self.extra
+        for key in _ATTRIBUTE_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                record[key] = value
+        record["hashtags"] = ",".join(self.tags)
+        return record
+
+
+_ATTRIBUTE_FIELDS = frozenset(
+    field.name for field in fields(SupportProgram) if field.name not in ("tags", "_extra")
+)
+
+
+def _pack(values: Dict[str, Any]) -> bytes:
+    if not values:
+        return b""
+    return json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _unpack(data: bytes) -> Dict[str, Any]:
+    if not data:
+        return {}
+    return json.loads(data)
+
+
+class _StringColumn:
+    """반복되는 문자열 열 (값 테이블 + 정수 코드)"""
+
+    def __init__(self, values: Iterable[str]):
+        table: Dict[str, int] = {}
+        self.codes = np.fromiter((table.setdefault(value, len(table)) for value in values), dtype=np.int32)
+        self.table = table
+
+    def codes_of(self, values: Iterable[Any]) -> np.ndarray:
+        return np.array([self.table[value] for value in values if value in self.table], dtype=np.int32)
+
+
+class ProgramColumns:
+    """
+    대량 필터링용 열(column) 지향 카탈로그 뷰
+    열 이름은 인덱스 메타데이터와 같습니다. (category, region, hashtags, reqst_begin, reqst_end)
+    """
+
+    def __init__(self, records: Sequence):
+        """
+        Args:
+            records (Sequence): SupportProgram 또는 레코드 dict 리스트 (행 순서 유지)
+        """
+        self.size = len(records)
+        self.ids = [record.get("pblancId") for record in records]
+        self.category = _StringColumn(record.get("pldirSportRealmLclasCodeNm") or "" for record in records)
+        self.region = _StringColumn(record.get("jrsdInsttNm") or "" for record in records)
+
+        periods = np.array(
+            [parse_application_period(record.get("reqstBeginEndDe")) for record in records] or np.zeros((0, 2)),
+            dtype=np.int32
+        ).reshape(-1, 2)
+        self.reqst_begin = periods[:, 0]
+        self.reqst_end = periods[:, 1]
+
+        # 해시태그: 행별 가변 길이 목록을 (태그 코드, 행 번호) 두 배열로 저장
+        tag_lists = [
+            record.tags if isinstance(record, SupportProgram) else split_hashtags(record.get("hashtags"))
+            for record in records
+        ]
+        self.hashtags = _StringColumn(tag for tags in tag_lists for tag in tags)
+        self.hashtag_rows = np.repeat(np.arange(self.size, dtype=np.int32), [len(tags) for tags in tag_lists])
+
+    @classmethod
+    def from_metadata(cls, documents: Sequence[Dict[str, Any]]) -> "ProgramColumns":
+        """
+        인덱스 메타데이터(+id) 리스트로 만듭니다. (레코드 없이 카탈로그 스냅샷으로 BM25 인덱스를 만들 때)
+
+        Args:
+            documents (Sequence[Dict]): category, region, hashtags(리스트), reqst_begin, reqst_end, id를 가진 메타데이터
+        """
+        columns = cls.__new__(cls)
+        columns.size = len(documents)
+        columns.ids = [document.get("id") for document in documents]
+        columns.category = _StringColumn(document.get("category") or "" for document in documents)
+        columns.region = _StringColumn(document.get("region") or "" for document in documents)
+        columns.reqst_begin = np.array([document["reqst_begin"] for document in documents], dtype=np.int32)
+        columns.reqst_end = np.array([document["reqst_end"] for document in documents], dtype=np.int32)
+        columns.hashtags = _StringColumn(tag for document in documents for tag in document["hashtags"])
+        columns.hashtag_rows = np.repeat(
+            np.arange(columns.size, dtype=np.int32), [len(document["hashtags"]) for document in documents]
+        )
+        return columns
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _string_mask(self, column: _StringColumn, operator: str, operand) -> Optional[np.ndarray]:
+        values = operand if isinstance(operand, (list, tuple, set)) else [operand]
+        matched = np.isin(column.codes, column.codes_of(values))
+        if operator in ("$eq", "$in"):
+            return matched
+        if operator in ("$ne", "$nin"):
+            return ~matched
+        return None
+
+    def _hashtag_mask(self, operator: str, operand) -> Optional[np.ndarray]:
+        values = operand if isinstance(operand, (list, tuple, set)) else [operand]
+        hit_rows = self.hashtag_rows[np.isin(self.hashtags.codes, self.hashtags.codes_of(values))]
+        any_matched = np.bincount(hit_rows, minlength=self.size).astype(bool)
+        if operator in ("$eq", "$in"):
+            return any_matched
+        if operator in ("$ne", "$nin"):
+            return ~any_matched
+        return None
+
+    @staticmethod
+    def _numeric_mask(column: np.ndarray, operator: str, operand) -> Optional[np.ndarray]:
+        if operator in ("$in", "$nin"):
+            matched = np.isin(column, list(operand) if isinstance(operand, (list, tuple, set)) else [operand])
+            return matched if operator == "$in" else ~matched
+        compare = {"$eq": np.equal, "$ne": np.not_equal, "$gt": np.greater, "$gte": np.greater_equal,
+                   "$lt": np.less, "$lte": np.less_equal}.get(operator)
+        return compare(column, operand) if compare is not None else None
+
+    def mask(self, index_filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        인덱스 메타데이터 필터(Pinecone 문법, local_index.match_filter와 같은 의미)를 행 단위 bool 배열로 계산합니다.
+
+        Returns:
+            Optional[np.ndarray]: (행 수,) bool 배열, 열로 계산할 수 없는 조건이 있으면 None
+        """
+        result = np.ones(self.size, dtype=bool)
+        if not index_filter:
+            return result
+
+        for field, condition in index_filter.items():
+            if field in ("$and", "$or"):
+                masks = [self.mask(sub) for sub in condition]
+                if any(sub_mask is None for sub_mask in masks):
+                    return None
+                if masks:
+                    combined = np.logical_and.reduce(masks) if field == "$and" else np.logical_or.reduce(masks)
+                    result &= combined
+                elif field == "$or":
+                    result[:] = False
+                continue
+
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, operand in condition.items():
+                if field in ("category", "region"):
+                    sub_mask = self._string_mask(getattr(self, field), operator, operand)
+                elif field == "hashtags":
+                    sub_mask = self._hashtag_mask(operator, operand)
+                elif field in ("reqst_begin", "reqst_end"):
+                    sub_mask = self._numeric_mask(getattr(self, field), operator, operand)
+                else:
+                    sub_mask = None
+                if sub_mask is None:
+                    return None
+                result &= sub_mask
+        return result
+
+    def rows(self, index_filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """필터를 만족하는 행 번호 (열로 계산할 수 없으면 None)"""
+        mask = self.mask(index_filter)
+        return None if mask is None else np.flatnonzero(mask)
+
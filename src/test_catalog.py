@@ -0,0 +1,248 @@
+"""
+카탈로그 로더 / 유사 중복 제거 테스트 스크립트
+"""
+
+import copy
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from src.catalog import Catalog, load_catalog, program_key
+from src.catalog_refresh import publish_catalog
+from src.catalog_snapshot import CatalogSnapshot, load_snapshot, write_snapshot
+from src.config import Config
+from src.dedup import find_duplicate_groups
+from src.local_index import match_filter
+from src.support_program import ProgramColumns, SupportProgram, parse_application_period, split_hashtags
+from src.text_normalizer import COMPACT_FIELD, CLEAN_FIELD, normalize_record, program_text
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SUMMARY = (
+    "<p>중소벤처기업부에서는 인공지능 기반 제조 혁신을 위해 스마트공장 구축 기업을 모집합니다.</p>"
+    "<p>☞ 지원내용: 솔루션 도입비의 50% 이내, 최대 1억원</p><p>☞ 신청방법: 온라인 접수</p>"
+)
+
+
+def _record(pblanc_id: str, name: str, summary: str) -> dict:
+    return {"pblancId": pblanc_id, "pblancNm": name, "bsnsSumryCn": summary}
+
+
+def _raw_catalog() -> dict:
+    original = _record("P1", "2025년 스마트공장 구축 지원사업 공고", SUMMARY)
+    repost = _record("P2", "2025년 스마트공장 구축 지원사업 재공고", SUMMARY)
+    other = _record("P3", "수출 바우처 사업 참여기업 모집", "<p>해외 마케팅 비용을 바우처로 지원합니다.</p>")
+    return {
+        "기술": {"jsonArray": [original, other]},
+        # 같은 공고(P1)가 다른 분야에도 실리고, 공고명만 바꾼 재공고(P2)가 있음
+        "경영": {"jsonArray": [copy.deepcopy(original), repost]},
+    }
+
+
+def test_find_duplicate_groups():
+    """MinHash/LSH 유사 중복 탐지 테스트"""
+    logger.info("=== 유사 중복 탐지 테스트 ===")
+    texts = [
+        "스마트공장 구축 지원사업 " + SUMMARY,
+        "수출 바우처 사업 참여기업 모집 해외 마케팅 비용을 바우처로 지원합니다.",
+        "스마트공장 구축 지원사업(재공고) " + SUMMARY,
+        "",
+    ]
+    groups = find_duplicate_groups(texts, threshold=0.8)
+    assert groups == [[0, 2], [1], [3]], groups
+
+
+def test_catalog_dedup():
+    """대표 공고 / 원본 매핑 / 분야별 목록 테스트"""
+    logger.info("=== 카탈로그 중복 제거 테스트 ===")
+    catalog = Catalog(_raw_catalog(), dedup=True)
+
+    assert [record["pblancId"] for record in catalog.records] == ["P1", "P3"]
+    assert catalog.canonical_ids["P2"] == "P1"
+    assert catalog.canonical("P2")["pblancId"] == "P1"
+    assert [record["pblancId"] for record in catalog.originals("P1")] == ["P1", "P2"]
+    # 한 분야 안에서는 같은 대표 공고가 한 번만 나오고, 원본 인덱스를 유지
+    assert [(index, record["pblancId"]) for index, record in catalog.categories["경영"]] == [(0, "P1")]
+    assert [(index, record["pblancId"]) for index, record in catalog.categories["기술"]] == [(0, "P1"), (1, "P3")]
+
+    without_dedup = Catalog(_raw_catalog(), dedup=False)
+    assert [record["pblancId"] for record in without_dedup.records] == ["P1", "P3", "P2"]
+
+
+def test_missing_pblanc_id():
+    """공고 ID가 없는 레코드는 내용 키로 구분하는지 테스트"""
+    logger.info("=== 공고 ID 없는 레코드 테스트 ===")
+    no_id = {"pblancNm": "관광 숙박 지원", "bsnsSumryCn": "<p>숙박 시설 개선 비용 지원</p>"}
+    other = {"pblancNm": "창업 도약 패키지", "bsnsSumryCn": "<p>창업 3~7년 기업 지원</p>"}
+    key = program_key(no_id)
+    # 내용이 같으면 같은 키, 다르면 다른 키 (None으로 충돌하지 않음)
+    assert key.startswith("content-") and key == program_key(copy.deepcopy(no_id)) != program_key(other)
+    assert program_key({"pblancId": "P1", "pblancNm": "관광 숙박 지원"}) == "P1"
+
+    raw = {
+        "기술": {"jsonArray": [copy.deepcopy(no_id), copy.deepcopy(other), _record("P3", "수출 바우처", "")]},
+        "경영": {"jsonArray": [copy.deepcopy(no_id)]},
+    }
+    catalog = Catalog(raw, dedup=False)
+    assert [record["pblancId"] for record in catalog.records] == [key, program_key(other), "P3"]
+    assert catalog.canonical(key)["pblancNm"] == "관광 숙박 지원"
+    assert [record["pblancId"] for _, record in catalog.categories["경영"]] == [key]
+
+
+def test_normalize_record():
+    """수집 시 정규화 (HTML/글머리 기호/안내 문구 제거, 짧은 요약) 테스트"""
+    logger.info("=== 텍스트 정규화 테스트 ===")
+    record = normalize_record(_record(
+        "P9", "테스트 공고",
+        "<p>지원대상: 중소기업&amp;nbsp;</p>\r\n\r\n<p>☞ 지원내용 : 최대 1억원 지원.</p>"
+        "<p>☞ 지원내용 : 최대 1억원 지원.</p><p>자세한 지원내용 공고문 참조</p>"
+        "<p>참여를 희망하는 기업의 많은 관심과 참여 바랍니다.</p>"
+    ))
+    assert record[CLEAN_FIELD] == "지원대상: 중소기업\n지원내용 : 최대 1억원 지원.", record[CLEAN_FIELD]
+    assert record[COMPACT_FIELD] == "지원대상: 중소기업 지원내용 : 최대 1억원 지원."
+    assert record["bsnsSumryCn"].startswith("<p>")  # 원본 유지
+
+    # 카탈로그 로드 시에도 정규화 필드가 채워짐
+    catalog = Catalog(_raw_catalog(), dedup=False)
+    assert all(CLEAN_FIELD in record and "<p>" not in record[CLEAN_FIELD] for record in catalog.records)
+
+
+def test_support_program():
+    """SupportProgram dict 호환 접근 / 열 지향 필터 테스트"""
+    logger.info("=== SupportProgram 테스트 ===")
+    records = [
+        {"pblancId": "A1", "pblancNm": "스마트공장", "pldirSportRealmLclasCodeNm": "기술", "jrsdInsttNm": "중소벤처기업부",
+         "reqstBeginEndDe": "20250801 ~ 20250831", "hashtags": "AI,제조", "bsnsSumryCn": "<p>본문</p>"},
+        {"pblancId": "A2", "pblancNm": "수출 바우처", "pldirSportRealmLclasCodeNm": "수출", "jrsdInsttNm": "산업통상자원부",
+         "reqstBeginEndDe": "상시 접수", "hashtags": "수출"},
+        {"pblancId": "A3", "pblancNm": "AI 바우처", "pldirSportRealmLclasCodeNm": "기술", "jrsdInsttNm": "과학기술정보통신부",
+         "reqstBeginEndDe": "20250901 ~ 20250930", "hashtags": "AI"},
+    ]
+    programs = [SupportProgram.from_record(dict(record)) for record in records]
+
+    program = programs[0]
+    assert program["pblancNm"] == "스마트공장" and program["bsnsSumryCn"] == "<p>본문</p>"
+    assert program["hashtags"] == "AI,제조" and program.tags == ("AI", "제조")
+    assert program.get("rceptEngnHmpgUrl", "") == "" and "rceptEngnHmpgUrl" not in program
+    assert program.application_period == (20250801, 20250831)
+    assert program.to_dict() == records[0]
+    # 반복되는 기관/분야 문자열은 같은 객체를 공유
+    assert programs[2].pldirSportRealmLclasCodeNm is program.pldirSportRealmLclasCodeNm
+
+    columns = ProgramColumns(programs)
+    metadata = []
+    for record in records:
+        begin, end = parse_application_period(record.get("reqstBeginEndDe"))
+        metadata.append({"category": record["pldirSportRealmLclasCodeNm"], "region": record["jrsdInsttNm"],
+                         "hashtags": list(split_hashtags(record.get("hashtags"))),
+                         "reqst_begin": begin, "reqst_end": end})
+    filters = [
+        {"category": "기술"},
+        {"region": {"$nin": ["중소벤처기업부"]}},
+        {"hashtags": {"$in": ["AI", "없는태그"]}},
+        {"$and": [{"reqst_begin": {"$lte": 20250915}}, {"reqst_end": {"$gte": 20250915}}]},
+        {"$or": [{"category": "수출"}, {"hashtags": {"$ne": "AI"}}]},
+    ]
+    for index_filter in filters:
+        expected = [match_filter(meta, index_filter) for meta in metadata]
+        assert columns.mask(index_filter).tolist() == expected, index_filter
+    # 열로 계산할 수 없는 조건은 None (호출자가 match_filter로 처리)
+    assert columns.mask({"region": {"$exists": True}}) is None
+
+
+def test_catalog_snapshot():
+    """memory-map 스냅샷이 카탈로그와 같은 내용을 복사 없이 읽는지 테스트"""
+    logger.info("=== 카탈로그 스냅샷 테스트 ===")
+    catalog = Catalog(_raw_catalog(), dedup=True)
+    embeddings = np.arange(len(catalog) * 4, dtype=np.float32).reshape(len(catalog), 4)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.snapshot")
+        write_snapshot(catalog, path, embeddings=embeddings)
+        snapshot = load_snapshot(path)
+        assert load_snapshot(path) is snapshot
+
+        assert list(snapshot.ids) == ["P1", "P3"]
+        assert list(snapshot.names) == [record["pblancNm"] for record in catalog.records]
+        assert snapshot.summaries[0] == catalog.records[0][COMPACT_FIELD]
+        # BM25/reranker idf를 스냅샷으로 만들 때 쓰는 열
+        assert snapshot.texts[0] == catalog.records[0][CLEAN_FIELD]
+        assert [snapshot.program_text(row) for row in range(len(snapshot))] == [program_text(r) for r in catalog.records]
+        assert list(snapshot.hashtags) == [record["hashtags"] for record in catalog.records]
+        assert snapshot.row("P3") == 1
+        assert snapshot.category_entries("경영") == [(0, 0)]
+        assert snapshot.category_entries("기술") == [(0, 0), (1, 1)]
+        # 열은 memory-map을 그대로 가리키는 읽기 전용 배열
+        assert list(snapshot.reqst_end) == [record.application_period[1] for record in catalog.records]
+        assert not snapshot.reqst_end.flags.owndata and not snapshot.reqst_end.flags.writeable
+        assert np.array_equal(snapshot.embeddings, embeddings)
+        assert not snapshot.embeddings.flags.owndata and not snapshot.embeddings.flags.writeable
+        assert not snapshot.is_current(path)  # 원본 파일 정보가 없는 스냅샷
+
+        # 파일을 교체하면 새 스냅샷을 열고, 이미 연 스냅샷은 이전 내용을 계속 읽음
+        write_snapshot(Catalog(_raw_catalog(), dedup=False), path)
+        refreshed = load_snapshot(path)
+        assert refreshed is not snapshot and len(refreshed) == 3 and refreshed.embeddings is None
+        assert list(snapshot.ids) == ["P1", "P3"]
+        assert isinstance(CatalogSnapshot(path), CatalogSnapshot)
+
+
+def test_load_catalog_cache():
+    """파일이 바뀌지 않으면 카탈로그를 재사용하는지 테스트"""
+    logger.info("=== 카탈로그 캐시 테스트 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "all_categories.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(_raw_catalog(), f, ensure_ascii=False)
+
+        first = load_catalog(path, dedup=True)
+        assert load_catalog(path, dedup=True) is first
+
+        raw = _raw_catalog()
+        raw["기술"]["jsonArray"].append(_record("P4", "창업 도약 패키지", "<p>창업 3~7년차 기업의 사업화를 지원합니다.</p>"))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False)
+        assert len(load_catalog(path, dedup=True)) == 3
+
+
+def test_publish_catalog():
+    """새 카탈로그를 옆에서 만든 뒤 파일/캐시/스냅샷을 함께 교체하는지 테스트"""
+    logger.info("=== 카탈로그 교체 테스트 ===")
+    snapshot_file = Config.CATALOG_SNAPSHOT_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.CATALOG_SNAPSHOT_FILE = os.path.join(tmp, "catalog.snapshot")
+        try:
+            path = os.path.join(tmp, "all_categories.json")
+            publish_catalog(_raw_catalog(), path)
+            assert len(load_catalog(path)) == 2
+
+            raw = _raw_catalog()
+            raw["기술"]["jsonArray"].append(_record("P4", "창업 도약 패키지", "<p>창업 3~7년차 기업의 사업화를 지원합니다.</p>"))
+            catalog = publish_catalog(raw, path)
+            # 교체 직후 요청은 파일을 다시 파싱하지 않고 미리 만든 카탈로그를 사용
+            assert load_catalog(path) is catalog and len(catalog) == 3
+            snapshot = load_snapshot()
+            assert snapshot.is_current(path) and len(snapshot) == 3
+            # 임시 파일이 남지 않음
+            assert sorted(os.listdir(tmp)) == ["all_categories.json", "catalog.snapshot"]
+        finally:
+            Config.CATALOG_SNAPSHOT_FILE = snapshot_file
+
+
+if __name__ == "__main__":
+    logger.info("카탈로그 테스트 시작")
+
+    test_find_duplicate_groups()
+    test_catalog_dedup()
+    test_missing_pblanc_id()
+    test_normalize_record()
+    test_support_program()
+    test_catalog_snapshot()
+    test_load_catalog_cache()
+    test_publish_catalog()
+
+    logger.info("모든 테스트 완료!")
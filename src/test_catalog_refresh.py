@@ -0,0 +1,143 @@
+"""
+카탈로그 백그라운드 새로고침 작업 테스트 스크립트
+"""
+
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from src.catalog_refresh import CatalogRefresher
+from src.metrics import metrics
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class _RecordingRefresher(CatalogRefresher):
+    """작업이 실행 스레드에 들어갈 때의 상태를 기록하는 refresher"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.entry_states = []
+
+    def _run(self, job):
+        self.entry_states.append(job.state)
+        super()._run(job)
+
+
+def _wait_until_done(job, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while job.active:
+        assert time.monotonic() < deadline, "작업이 끝나지 않았습니다."
+        time.sleep(0.01)
+
+
+def test_succeeded_and_dedup():
+    """queued -> running -> succeeded 전이와 실행 중 재요청 중복 제거 테스트"""
+    logger.info("=== 새로고침 성공 / 중복 요청 테스트 ===")
+    release = threading.Event()
+    with tempfile.TemporaryDirectory() as tmp:
+        refresher = _RecordingRefresher(lambda: release.wait(2) and {"catalog_file": "all_categories.json"},
+                                        lock_file=os.path.join(tmp, "catalog.refresh.lock"))
+        job = refresher.submit()
+        time.sleep(0.1)
+        assert refresher.entry_states == ['queued']
+        assert job.state == 'running' and job.started_at is not None
+
+        # 실행 중에는 새 작업을 만들지 않고 같은 작업을 반환
+        assert refresher.submit() is job
+        assert len(refresher.jobs()) == 1
+
+        release.set()
+        _wait_until_done(job)
+        assert job.state == 'succeeded'
+        assert job.result == {"catalog_file": "all_categories.json"}
+        assert job.to_dict()['duration_seconds'] is not None
+
+        # 끝난 뒤의 요청은 새 작업
+        second = refresher.submit('schedule')
+        assert second is not job and second.trigger == 'schedule'
+        _wait_until_done(second)
+        assert [j.id for j in refresher.jobs()] == [job.id, second.id]
+
+
+def test_failed():
+    """새로고침 함수가 실패하면 failed로 끝나는지 테스트"""
+    logger.info("=== 새로고침 실패 테스트 ===")
+
+    def refresh():
+        raise RuntimeError("지원사업 조회 실패")
+
+    failed_before = metrics.get("catalog_refresh.failed")
+    with tempfile.TemporaryDirectory() as tmp:
+        refresher = CatalogRefresher(refresh, lock_file=os.path.join(tmp, "catalog.refresh.lock"))
+        job = refresher.submit()
+        _wait_until_done(job)
+        assert job.state == 'failed' and job.error == "지원사업 조회 실패"
+        assert job.finished_at is not None
+        assert metrics.get("catalog_refresh.failed") == failed_before + 1
+
+
+def test_skipped_across_workers():
+    """다른 워커가 잠금을 잡고 있으면 skipped가 되고, 작업 상태는 다른 워커에서도 조회되는지 테스트"""
+    logger.info("=== 워커 간 새로고침 테스트 ===")
+    release = threading.Event()
+    with tempfile.TemporaryDirectory() as tmp:
+        lock_file = os.path.join(tmp, "catalog.refresh.lock")
+        first = CatalogRefresher(lambda: release.wait(2) and "first", lock_file=lock_file)
+        second = CatalogRefresher(lambda: "second", lock_file=lock_file)
+
+        running = first.submit()
+        time.sleep(0.1)
+        skipped = second.submit()
+        _wait_until_done(skipped)
+        assert skipped.state == 'skipped'
+        assert skipped.result == {'running_job_id': running.id}
+
+        # 작업을 실행하지 않은 워커에서도 상태 조회
+        assert second.get(running.id).state == 'running'
+        release.set()
+        _wait_until_done(running)
+        assert second.get(running.id).state == 'succeeded'
+        assert second.get(running.id).result == "first"
+        assert first.get(skipped.id).state == 'skipped'
+        assert second.get("../../etc") is None
+
+        # 잠금이 풀리면 다시 실행 가능
+        with open(lock_file, "a+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            blocked = second.submit()
+            _wait_until_done(blocked)
+            assert blocked.state == 'skipped'
+        retried = second.submit()
+        _wait_until_done(retried)
+        assert retried.state == 'succeeded' and retried.result == "second"
+
+
+def test_history():
+    """보관 개수를 넘는 오래된 작업 상태는 지워지는지 테스트"""
+    logger.info("=== 작업 보관 개수 테스트 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        refresher = CatalogRefresher(lambda: None, lock_file=os.path.join(tmp, "catalog.refresh.lock"), history=3)
+        jobs = []
+        for _ in range(5):
+            jobs.append(refresher.submit())
+            _wait_until_done(jobs[-1])
+            time.sleep(0.01)
+        assert [job.id for job in refresher.jobs()] == [job.id for job in jobs[-3:]]
+        assert refresher.get(jobs[0].id) is None
+
+
+if __name__ == "__main__":
+    logger.info("카탈로그 새로고침 테스트 시작")
+
+    test_succeeded_and_dedup()
+    test_failed()
+    test_skipped_across_workers()
+    test_history()
+
+    logger.info("모든 테스트 완료!")
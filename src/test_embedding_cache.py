@@ -0,0 +1,90 @@
+"""
+임베딩 캐시 테스트 스크립트
+"""
+
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from src.embedding_cache import EmbeddingCache
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def test_put_get():
+    """저장/조회/재로드 테스트"""
+    logger.info("=== 저장/조회 테스트 ===")
+    with tempfile.TemporaryDirectory() as path:
+        cache = EmbeddingCache(path, "test-model", dtype="fp32")
+        cache.put_many(["a", "b", "a"], [[1, 1], [2, 2], [5, 5]])
+        assert len(cache) == 2
+        assert cache.get_many(["a", "x", "b"]) == [[1.0, 1.0], None, [2.0, 2.0]]
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+        reloaded = EmbeddingCache(path, "test-model")
+        assert reloaded.get_many(["b", "a"]) == [[2.0, 2.0], [1.0, 1.0]]
+
+
+def test_torn_append():
+    """중단된 쓰기(키 없는 벡터 행 / 부분 행)가 이후 행 번호를 어긋나게 하지 않는지 테스트"""
+    logger.info("=== 중단된 쓰기 테스트 ===")
+    with tempfile.TemporaryDirectory() as path:
+        cache = EmbeddingCache(path, "test-model", dtype="fp32")
+        cache.put_many(["a", "b"], [[1, 1], [2, 2]])
+
+        # 벡터만 쓰이고 키는 쓰이지 못한 행
+        with open(cache._vectors_file, "ab") as f:
+            f.write(np.asarray([[9, 9]], dtype=np.float32).tobytes())
+        cache = EmbeddingCache(path, "test-model")
+        cache.put_many(["c"], [[3, 3]])
+        assert cache.get_many(["c"]) == [[3.0, 3.0]]
+        assert EmbeddingCache(path, "test-model").get_many(["a", "b", "c"]) == [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]]
+
+        # 실행 중인 캐시 뒤에서 부분 행이 남은 경우
+        with open(cache._vectors_file, "ab") as f:
+            f.write(b"\x00\x01\x02")
+        cache.put_many(["d"], [[4, 4]])
+        assert cache.get_many(["d"]) == [[4.0, 4.0]]
+        assert os.path.getsize(cache._vectors_file) == 4 * 2 * 4
+        assert EmbeddingCache(path, "test-model").get_many(["d", "a"]) == [[4.0, 4.0], [1.0, 1.0]]
+
+
+def test_shared_directory():
+    """같은 디렉터리를 공유하는 두 캐시 인스턴스(워커 프로세스)의 동시 추가 테스트"""
+    logger.info("=== 캐시 디렉터리 공유 테스트 ===")
+    with tempfile.TemporaryDirectory() as path:
+        first = EmbeddingCache(path, "test-model", dtype="fp32")
+        second = EmbeddingCache(path, "test-model", dtype="fp32")
+
+        def put(cache, prefix):
+            for i in range(50):
+                cache.put_many([f"{prefix}{i}"], [[i, i]])
+
+        threads = [threading.Thread(target=put, args=(first, "x")), threading.Thread(target=put, args=(second, "y"))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 다른 인스턴스가 추가한 행도 다음 추가 시 이어서 읽힘
+        second.put_many(["z"], [[0, 0]])
+        assert second.get_many(["x7", "y7", "x49"]) == [[7.0, 7.0], [7.0, 7.0], [49.0, 49.0]]
+        reloaded = EmbeddingCache(path, "test-model")
+        assert len(reloaded) == 101
+        assert reloaded.get_many([f"x{i}" for i in range(50)]) == [[float(i), float(i)] for i in range(50)]
+        assert reloaded.get_many([f"y{i}" for i in range(50)]) == [[float(i), float(i)] for i in range(50)]
+
+
+if __name__ == "__main__":
+    logger.info("임베딩 캐시 테스트 시작")
+
+    test_put_get()
+    test_torn_append()
+    test_shared_directory()
+
+    logger.info("모든 테스트 완료!")
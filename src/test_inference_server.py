@@ -0,0 +1,182 @@
+"""
+추론 서버 IPC 프로토콜 테스트 스크립트 (임시 디렉터리의 유닉스 소켓 + 가짜 엔진 사용)
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+from src.cancellation import CancelToken, GenerationCancelled
+from src.inference_server import InferenceServer, RemoteLLM
+from src.vllm_engine import AbortableVLLM
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+AUTHKEY = "test-authkey"
+
+
+class _FakeEngine(AbortableVLLM):
+    """모델 없이 취소 토큰을 확인하며 생성하는 엔진 ("slow"로 시작하는 프롬프트는 2초 동안 생성)"""
+
+    def __init__(self):
+        self.aborted = []  # (프롬프트, 사유)
+        self.deadlines = []
+
+    def invoke(self, prompt, cancel_token=None, **kwargs):
+        self.deadlines.append(cancel_token.remaining())
+        steps = 100 if prompt.startswith("slow") else 1
+        for _ in range(steps):
+            try:
+                cancel_token.check()
+            except GenerationCancelled as e:
+                self.aborted.append((prompt, e.reason))
+                raise
+            time.sleep(0.02)
+        return prompt.upper()
+
+    async def astream(self, prompt, **kwargs):
+        try:
+            for word in prompt.split():
+                await asyncio.sleep(0.05)
+                yield f"{word} "
+        except (asyncio.CancelledError, GeneratorExit):
+            self.aborted.append((prompt, "stream_closed"))
+            raise
+
+
+def _start_server():
+    engine = _FakeEngine()
+    address = os.path.join(tempfile.mkdtemp(), "inference.sock")
+    server = InferenceServer(engine, "fake-model", max_concurrency=8)
+    threading.Thread(target=server.serve_forever, args=(address, AUTHKEY), daemon=True).start()
+    return engine, address, RemoteLLM(address, AUTHKEY, connect_timeout=5)
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "조건을 기다리다 시간 초과"
+        time.sleep(0.01)
+
+
+def test_generate_and_reuse():
+    """생성 요청과 연결 재사용 테스트"""
+    logger.info("=== 생성 / 연결 재사용 테스트 ===")
+    engine, address, llm = _start_server()
+    assert llm.model == "fake-model"
+    assert llm.invoke("hello") == "HELLO"
+
+    conn = llm._idle[-1]
+    assert llm.invoke("again") == "AGAIN"
+    assert llm._idle == [conn]  # 순차 요청은 같은 연결을 재사용
+
+    threads = [threading.Thread(target=llm.invoke, args=(f"q{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert 1 <= len(llm._idle) <= 4
+    llm.close()
+
+
+def test_cancel_propagation():
+    """클라이언트 취소가 서버 엔진 요청까지 전달되는지 테스트"""
+    logger.info("=== 취소 전달 테스트 ===")
+    engine, address, llm = _start_server()
+    token = CancelToken()
+    threading.Timer(0.2, token.cancel, args=("client_cancelled",)).start()
+
+    start = time.perf_counter()
+    try:
+        llm.invoke("slow cancel", cancel_token=token)
+        assert False, "취소되어야 합니다."
+    except GenerationCancelled as e:
+        assert e.reason == "client_cancelled"
+    assert time.perf_counter() - start < 1.0
+    assert engine.aborted == [("slow cancel", "client_cancelled")]
+    # 취소 후에도 연결은 재사용 가능
+    assert llm.invoke("after") == "AFTER"
+    assert len(llm._idle) == 1
+
+
+def test_deadline_propagation():
+    """클라이언트 데드라인이 서버 엔진 요청에 적용되는지 테스트"""
+    logger.info("=== 데드라인 전달 테스트 ===")
+    engine, address, llm = _start_server()
+    token = CancelToken(0.3)
+    try:
+        llm.invoke("slow deadline", cancel_token=token)
+        assert False, "데드라인을 넘겨야 합니다."
+    except GenerationCancelled as e:
+        assert e.reason.startswith("deadline")
+    assert token.cancelled
+    assert 0 < engine.deadlines[-1] <= 0.3
+    assert engine.aborted[-1][0] == "slow deadline"
+
+
+def test_disconnect_abort():
+    """생성 중 연결이 끊기면 서버가 엔진 요청을 abort하는지 테스트"""
+    logger.info("=== 연결 종료 abort 테스트 ===")
+    engine, address, llm = _start_server()
+
+    conn = Client(address, authkey=AUTHKEY.encode("utf-8"))
+    conn.send({"op": "generate", "prompt": "slow disconnect", "kwargs": {}, "deadline": None})
+    time.sleep(0.1)
+    conn.close()
+    _wait_for(lambda: engine.aborted)
+    assert engine.aborted == [("slow disconnect", "client_disconnected")]
+
+    async def consume_partially():
+        stream = llm.astream("a b c d e f g h")
+        async for delta in stream:
+            assert delta == "a "
+            break
+        await stream.aclose()
+
+    asyncio.run(consume_partially())
+    _wait_for(lambda: len(engine.aborted) == 2)
+    assert engine.aborted[-1] == ("a b c d e f g h", "stream_closed")
+
+
+def test_stream():
+    """스트리밍 응답 테스트"""
+    logger.info("=== 스트리밍 테스트 ===")
+    engine, address, llm = _start_server()
+
+    async def consume():
+        return [delta async for delta in llm.astream("a b c")]
+
+    assert asyncio.run(consume()) == ["a ", "b ", "c "]
+    assert len(llm._idle) == 1  # 끝까지 읽은 스트림의 연결은 재사용
+
+
+def test_authkey():
+    """잘못된 인증 키로는 연결할 수 없는지 테스트"""
+    logger.info("=== 인증 키 테스트 ===")
+    engine, address, llm = _start_server()
+    try:
+        RemoteLLM(address, "wrong-key", connect_timeout=0)
+        assert False, "인증에 실패해야 합니다."
+    except AuthenticationError:
+        pass
+    assert llm.invoke("still ok") == "STILL OK"
+
+
+if __name__ == "__main__":
+    logger.info("추론 서버 테스트 시작")
+
+    test_generate_and_reuse()
+    test_cancel_propagation()
+    test_deadline_propagation()
+    test_disconnect_abort()
+    test_stream()
+    test_authkey()
+
+    logger.info("모든 테스트 완료!")
@@ -0,0 +1,267 @@
+"""
+로컬 벡터 인덱스 테스트 스크립트
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.local_index import LocalIndex, match_filter
+from src.vector_codec import VectorCodec
+from src.vector_upsert import iter_upsert_batches, parallel_upsert
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _random_items(n: int, dim: int = 64, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    regions = ["중소벤처기업부", "과학기술정보통신부", "산업통상자원부"]
+    return [
+        {
+            "id": f"PBLN_{i:06d}",
+            "values": vectors[i].tolist(),
+            "metadata": {"region": regions[i % 3], "reqst_end": 20250101 + i, "hashtags": ["AI", regions[i % 3]]}
+        }
+        for i in range(n)
+    ]
+
+
+def test_match_filter():
+    """메타데이터 필터 테스트"""
+    logger.info("=== 메타데이터 필터 테스트 ===")
+    metadata = {"region": "중소벤처기업부", "reqst_end": 20250930, "hashtags": ["AI", "제조"]}
+
+    assert match_filter(metadata, {"region": "중소벤처기업부"})
+    assert match_filter(metadata, {"reqst_end": {"$gte": 20250901, "$lte": 20251231}})
+    assert match_filter(metadata, {"hashtags": {"$in": ["제조", "바이오"]}})
+    assert not match_filter(metadata, {"hashtags": {"$nin": ["AI"]}})
+    assert match_filter(metadata, {"$or": [{"region": "산업통상자원부"}, {"hashtags": "AI"}]})
+    assert not match_filter(metadata, {"$and": [{"region": "중소벤처기업부"}, {"reqst_end": {"$lt": 20250101}}]})
+    assert match_filter(metadata, {"file_path": {"$exists": False}})
+
+
+def test_brute_force_search():
+    """brute-force 검색 / 필터 / 삭제 테스트"""
+    logger.info("=== brute-force 검색 테스트 ===")
+    items = _random_items(1000)
+    index = LocalIndex()
+    index.upsert(items, namespace="kt-agent")
+
+    start = time.perf_counter()
+    response = index.query(vector=items[42]["values"], top_k=5, namespace="kt-agent", include_metadata=True)
+    logger.info(f"검색 시간: {(time.perf_counter() - start) * 1000:.3f}ms")
+    assert response["matches"][0]["id"] == "PBLN_000042"
+    assert abs(response["matches"][0]["score"] - 1.0) < 1e-5
+
+    response = index.query(vector=items[42]["values"], top_k=5, namespace="kt-agent",
+                           filter={"region": "과학기술정보통신부"}, include_metadata=True)
+    assert len(response["matches"]) == 5
+    assert all(m["metadata"]["region"] == "과학기술정보통신부" for m in response["matches"])
+
+    index.delete(ids=["PBLN_000042"], namespace="kt-agent")
+    response = index.query(vector=items[42]["values"], top_k=1, namespace="kt-agent")
+    assert response["matches"][0]["id"] != "PBLN_000042"
+    assert index.describe_index_stats()["namespaces"]["kt-agent"]["vector_count"] == 999
+    assert index.fetch(["PBLN_000999"], namespace="kt-agent")["vectors"]["PBLN_000999"]["metadata"]["reqst_end"] == 20251100
+
+
+def test_ivf_search():
+    """IVF 근사 검색 재현율 테스트"""
+    logger.info("=== IVF 근사 검색 테스트 ===")
+    items = _random_items(5000, seed=1)
+    exact = LocalIndex(ann_threshold=10 ** 9)
+    approx = LocalIndex(ann_threshold=1000, nprobe=16)
+    exact.upsert(items)
+    approx.upsert(items)
+
+    rng = np.random.default_rng(2)
+    recalls = []
+    for _ in range(20):
+        query = rng.standard_normal(64)
+        truth = {m["id"] for m in exact.query(vector=query, top_k=10)["matches"]}
+        found = {m["id"] for m in approx.query(vector=query, top_k=10)["matches"]}
+        recalls.append(len(truth & found) / 10)
+    logger.info(f"IVF recall@10: {np.mean(recalls):.2f}")
+    assert np.mean(recalls) >= 0.5
+
+
+def test_query_many():
+    """다중 질의 일괄 검색 테스트 (단건 검색과 같은 결과, 입력 순서 유지)"""
+    logger.info("=== 다중 질의 검색 테스트 ===")
+    items = _random_items(2000)
+    index = LocalIndex()
+    index.upsert(items, namespace="kt-agent")
+    queries = [items[i]["values"] for i in range(0, 2000, 20)]
+    filters = [None if i % 2 else {"region": "중소벤처기업부"} for i in range(len(queries))]
+
+    start = time.perf_counter()
+    responses = index.query_many(queries, top_k=5, namespace="kt-agent", filter=filters)
+    batched = time.perf_counter() - start
+    start = time.perf_counter()
+    singles = [index.query(vector=q, top_k=5, namespace="kt-agent", filter=f) for q, f in zip(queries, filters)]
+    sequential = time.perf_counter() - start
+    logger.info(f"{len(queries)}개 질의: 일괄 {batched * 1000:.1f}ms / 단건 반복 {sequential * 1000:.1f}ms")
+
+    for response, single in zip(responses, singles):
+        assert [m["id"] for m in response["matches"]] == [m["id"] for m in single["matches"]]
+
+
+def test_compressed_index():
+    """int8 + PCA 압축 검색 / 재채점 / 저장 후 memory-map 로드 테스트"""
+    logger.info("=== 압축 인덱스 테스트 ===")
+    items = _random_items(2000)
+    index = LocalIndex(codec=VectorCodec("int8", 32, "pca"), rescore_factor=10)
+    index.upsert(items, namespace="kt-agent")
+
+    response = index.query(vector=items[42]["values"], top_k=5, namespace="kt-agent")
+    assert response["matches"][0]["id"] == "PBLN_000042"
+    assert abs(response["matches"][0]["score"] - 1.0) < 1e-5  # 재채점 후 원본 코사인 점수
+    memory = index.memory_bytes()
+    logger.info(f"메모리: {memory}")
+    assert memory["codes"] * 8 <= memory["vectors"]
+
+    with tempfile.TemporaryDirectory() as path:
+        index.save(path)
+        loaded = LocalIndex.load(path, codec=VectorCodec("int8", 32, "pca"), rescore_factor=10)
+        assert loaded.memory_bytes()["vectors"] == 0  # 원본 벡터는 memory-map
+        assert loaded.query(vector=items[42]["values"], top_k=5, namespace="kt-agent") == response
+        loaded.upsert(items[:1], namespace="kt-agent")
+        index.save(path)  # memory-map으로 연 파일을 덮어써도 안전해야 함
+        del loaded
+
+
+def test_incremental_codes():
+    """코덱 학습 후 업서트/삭제가 바뀐 행만 인코딩하는지 테스트"""
+    logger.info("=== 압축 코드 증분 갱신 테스트 ===")
+    items = _random_items(500)
+    codec = VectorCodec("int8", 32, "pca")
+    index = LocalIndex(codec=codec, rescore_factor=10)
+    index.upsert(items[:400], namespace="kt-agent")
+    index.query(vector=items[0]["values"], top_k=1, namespace="kt-agent")  # 코덱 학습 + 전체 인코딩
+
+    encoded = []
+    encode = codec.encode
+    codec.encode = lambda vectors: encoded.append(len(vectors)) or encode(vectors)
+    index.upsert(items[400:], namespace="kt-agent")
+    index.upsert([dict(items[3], values=items[4]["values"])], namespace="kt-agent")
+    index.delete(ids=["PBLN_000010", "PBLN_000499"], namespace="kt-agent")
+    response = index.query(vector=items[450]["values"], top_k=1, namespace="kt-agent")
+    assert encoded == [100, 1]  # 검색 시 전체를 다시 인코딩하지 않음
+    assert response["matches"][0]["id"] == "PBLN_000450"
+
+    ns = index._namespace("kt-agent")
+    assert ns.size == 498
+    assert np.array_equal(ns.codes, encode(ns.vectors))
+
+
+def test_save_load():
+    """저장/로드 테스트"""
+    logger.info("=== 저장/로드 테스트 ===")
+    items = _random_items(100)
+    index = LocalIndex()
+    index.upsert(items, namespace="kt-agent")
+
+    with tempfile.TemporaryDirectory() as path:
+        index.save(path)
+        first_files = set(os.listdir(path)) - {"index.json"}
+        # 다시 저장하면 새 세대 파일을 쓰고 index.json을 교체한 뒤 이전 세대 파일을 지움
+        extra = _random_items(101)[100:]
+        index.upsert(extra, namespace="kt-agent")
+        index.save(path)
+        files = set(os.listdir(path)) - {"index.json"}
+        assert len(files) == 1 and not files & first_files
+        assert LocalIndex.load(path).describe_index_stats()["total_vector_count"] == 101
+
+        # 배열을 쓰다 중단된 저장의 파일은 index.json이 가리키지 않으며 다음 저장 때 지워짐
+        open(os.path.join(path, "vectors_crashed_0.npy"), "wb").close()
+        index.delete(ids=[extra[0]["id"]], namespace="kt-agent")
+        index.save(path)
+        assert "vectors_crashed_0.npy" not in os.listdir(path)
+        loaded = LocalIndex.load(path)
+
+    assert loaded.describe_index_stats() == index.describe_index_stats()
+    assert [ids for ids in loaded.list(namespace="kt-agent", limit=30)][-1][-1] == "PBLN_000099"
+    response = loaded.query(vector=items[7]["values"], top_k=1, namespace="kt-agent", include_metadata=True)
+    assert response["matches"][0]["id"] == "PBLN_000007"
+    assert response["matches"][0]["metadata"]["hashtags"] == ["AI", "과학기술정보통신부"]
+
+
+def test_shared_vectors():
+    """카탈로그 순서로 저장한 인덱스를 스냅샷 임베딩 열(읽기 전용 배열)로 불러오는 테스트"""
+    logger.info("=== 공유 벡터 로드 테스트 ===")
+    items = _random_items(50)
+    index = LocalIndex()
+    index.upsert(items, namespace="kt-agent")
+    catalog_ids = [item["id"] for item in reversed(items)]
+    index.reorder(catalog_ids, namespace="kt-agent")
+    ids, vectors = index.matrix("kt-agent")
+    assert ids == catalog_ids
+
+    shared = np.frombuffer(vectors.tobytes(), dtype=np.float32).reshape(vectors.shape)  # 읽기 전용 (memory-map 대용)
+    with tempfile.TemporaryDirectory() as path:
+        index.save(path)
+        loaded = LocalIndex.load(path, shared_vectors={"kt-agent": (catalog_ids, shared)})
+        # ID 순서가 다르면 공유 배열을 쓰지 않고 벡터 파일을 읽음
+        fallback = LocalIndex.load(path, shared_vectors={"kt-agent": (ids[::-1], shared)})
+    assert np.shares_memory(loaded.matrix("kt-agent")[1], shared)
+    assert not np.shares_memory(fallback.matrix("kt-agent")[1], shared)
+    response = loaded.query(vector=items[7]["values"], top_k=1, namespace="kt-agent")
+    assert response["matches"][0]["id"] == "PBLN_000007"
+
+    # 업서트/삭제는 공유 배열을 복사한 뒤 수정
+    loaded.delete(ids=[catalog_ids[0]], namespace="kt-agent")
+    loaded.upsert(_random_items(51)[50:], namespace="kt-agent")
+    assert not shared.flags.writeable and loaded.describe_index_stats()["total_vector_count"] == 50
+
+
+class _FlakyIndex(LocalIndex):
+    """처음 몇 번의 업서트 호출이 실패하는 인덱스"""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def upsert(self, vectors, namespace=None, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("일시적인 네트워크 오류")
+        return super().upsert(vectors, namespace=namespace)
+
+
+def test_parallel_upsert():
+    """크기 제한 배치 병렬 업서트 / 재시도 테스트"""
+    logger.info("=== 병렬 업서트 테스트 ===")
+    items = _random_items(1000)
+
+    batches = list(iter_upsert_batches(items, max_count=100, max_bytes=50_000))
+    assert sum(len(batch) for batch in batches) == len(items)
+    assert all(len(batch) <= 100 for batch in batches)
+    assert len(batches) > 10  # 크기 제한으로 개수 제한보다 잘게 나뉨
+
+    index = _FlakyIndex(failures=3)
+    count = parallel_upsert(index, iter(items), namespace="kt-agent", total=len(items),
+                            max_count=100, max_bytes=50_000, max_workers=4, backoff=0.01)
+    assert count == len(items)
+    assert index.describe_index_stats()["total_vector_count"] == len(items)
+
+
+if __name__ == "__main__":
+    logger.info("로컬 벡터 인덱스 테스트 시작")
+
+    test_match_filter()
+    test_brute_force_search()
+    test_ivf_search()
+    test_query_many()
+    test_compressed_index()
+    test_incremental_codes()
+    test_save_load()
+    test_shared_vectors()
+    test_parallel_upsert()
+
+    logger.info("모든 테스트 완료!")
@@ -0,0 +1,89 @@
+"""
+RAG 체인 테스트 스크립트 (가짜 벡터 DB / LLM 사용)
+"""
+
+import asyncio
+import logging
+
+from langchain_core.documents import Document
+
+from src.metrics import metrics
+from src.rag import Ragchain
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class _FakeDB:
+    """검색 결과가 고정된 벡터 DB"""
+
+    catalog_version = "test"
+
+    def search_database(self, question, top_k, filters=None):
+        return [Document(page_content="AI 바우처 지원사업", metadata={"pblancId": "PBLN_000001"})]
+
+    def embed_query(self, question):
+        return [1.0, 0.0]
+
+
+class _FakeStreamingLLM:
+    """AbortableVLLM / RemoteLLM처럼 문자열 프롬프트를 받고 조각 단위로 생성하는 엔진"""
+
+    CHUNKS = ["추천 ", "지원사업: ", "AI 바우처"]
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        self.prompts.append(prompt)
+        return "".join(self.CHUNKS)
+
+    async def astream(self, prompt: str, **kwargs):
+        self.prompts.append(prompt)
+        for chunk in self.CHUNKS:
+            await asyncio.sleep(0.01)
+            yield chunk
+
+
+def test_invoke_with_engine():
+    """Runnable이 아닌 엔진으로 전체 답변 생성 테스트"""
+    logger.info("=== 엔진 invoke 테스트 ===")
+    llm = _FakeStreamingLLM()
+    rag = Ragchain(_FakeDB(), llm)
+    assert rag.streaming
+    assert rag.invoke("AI 지원사업 추천") == "추천 지원사업: AI 바우처"
+    assert isinstance(llm.prompts[0], str) and "AI 바우처 지원사업" in llm.prompts[0]
+    # 컨텍스트 크기는 소요 시간이 아닌 값 분포로 기록
+    snapshot = metrics.snapshot()
+    assert "rag.context_tokens" not in snapshot["timings"]
+    assert snapshot["values"]["rag.context_docs"]["max"] == 1
+    assert snapshot["values"]["rag.context_docs"]["histogram"] == {"<=1": 1}
+    # 같은 질문은 시맨틱 캐시에서 바로 반환
+    assert asyncio.run(rag.ainvoke("AI 지원사업 추천")) == "추천 지원사업: AI 바우처"
+    assert len(llm.prompts) == 1
+
+
+def test_astream():
+    """답변이 여러 조각으로 전달되고 첫 토큰까지의 시간이 기록되는지 테스트"""
+    logger.info("=== 스트리밍 테스트 ===")
+    rag = Ragchain(_FakeDB(), _FakeStreamingLLM())
+    before = metrics.snapshot()["timings"].get("rag.ttft_seconds", {}).get("count", 0)
+
+    async def collect():
+        return [chunk async for chunk in rag.astream("창업 지원사업 알려줘")]
+
+    chunks = asyncio.run(collect())
+    assert chunks == _FakeStreamingLLM.CHUNKS
+    ttft = metrics.snapshot()["timings"]["rag.ttft_seconds"]
+    assert ttft["count"] == before + 1
+    assert ttft["max_seconds"] < metrics.snapshot()["timings"]["rag.stream_seconds"]["max_seconds"]
+
+
+if __name__ == "__main__":
+    logger.info("RAG 체인 테스트 시작")
+
+    test_invoke_with_engine()
+    test_astream()
+
+    logger.info("모든 테스트 완료!")
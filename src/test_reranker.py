@@ -0,0 +1,105 @@
+"""
+lexical 스코어링 헤드 테스트 스크립트
+"""
+
+import logging
+import os
+import tempfile
+
+from src.bm25 import BM25Index
+from src.catalog_refresh import publish_catalog
+from src.config import Config
+from src.reranker import LexicalReranker, TwoStageSelector
+from src.user import User
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+QUERY = "인공지능 제조 수출 바우처"
+CANDIDATES = ["인공지능 교육 과정", "제조 혁신 바우처", "수출 바우처 지원"]
+
+
+def test_coverage_unseen_terms():
+    """색인에 없는 질의 토큰도 분모에 들어가는지 테스트"""
+    logger.info("=== 커버리지 테스트 ===")
+    index = BM25Index().fit(["인공지능 교육 과정"])
+    # "제조", "수출", "바우처"는 색인에 없지만 고정 idf로 분모에 포함
+    assert 0 < index.coverage(QUERY, "인공지능 교육 과정") < 0.5
+    assert index.coverage(QUERY, "관광 숙박") == 0.0
+    assert index.coverage("", "인공지능") == 0.0
+
+
+def test_score_independent_of_candidates():
+    """같은 후보의 점수가 함께 채점하는 후보 집합과 무관한지 테스트"""
+    logger.info("=== 후보 집합 독립성 테스트 ===")
+    reranker = LexicalReranker(corpus=CANDIDATES + ["관광 숙박 지원", "창업 도약 패키지"])
+    alone = reranker.score(QUERY, CANDIDATES[:1])[0]
+    together = reranker.score(QUERY, CANDIDATES)
+    assert abs(alone - together[0]) < 1e-12
+    assert alone < 1.0  # 후보에 없는 질의 토큰("제조", "수출", "바우처")도 분모에 포함
+    assert all(0 <= score <= 1 for score in together)
+
+
+def test_catalog_idf():
+    """카탈로그로 idf를 계산하고, 카탈로그가 교체되면 다시 계산하는지 테스트"""
+    logger.info("=== 카탈로그 idf 테스트 ===")
+    snapshot_file = Config.CATALOG_SNAPSHOT_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.CATALOG_SNAPSHOT_FILE = os.path.join(tmp, "catalog.snapshot")
+        try:
+            path = os.path.join(tmp, "all_categories.json")
+            # 카탈로그 파일이 없으면 모든 토큰을 같은 가중치로 계산
+            reranker = LexicalReranker(json_file=path)
+            assert len(reranker.idf_index()) == 0
+            # "인공지능"(+ bigram 3개)은 포함, "수출"은 미포함 -> 4/5
+            assert abs(reranker.score("인공지능 수출", ["인공지능"])[0] - 0.8) < 1e-9
+
+            programs = [{"pblancId": f"P{i}", "pblancNm": name, "bsnsSumryCn": ""} for i, name in enumerate(CANDIDATES)]
+            publish_catalog({"기술": {"jsonArray": programs}}, path)
+            first = reranker.idf_index()
+            assert len(first) == 3 and reranker.idf_index() is first
+
+            programs.append({"pblancId": "P9", "pblancNm": "관광 숙박 지원", "bsnsSumryCn": ""})
+            publish_catalog({"기술": {"jsonArray": programs}}, path)
+            assert len(reranker.idf_index()) == 4
+        finally:
+            Config.CATALOG_SNAPSHOT_FILE = snapshot_file
+
+
+class _PrefixEmbedder:
+    """DB_Pinecone처럼 문서/질의를 구분해 임베딩하는 테스트용 임베딩 (문서로 임베딩한 텍스트를 기록)"""
+
+    def __init__(self):
+        self.passages = []
+
+    def embed_query(self, query):
+        return [1.0, 0.0]
+
+    def embed_passages(self, texts):
+        self.passages.extend(texts)
+        return [[1.0, 0.0] if "바우처" in text else [0.0, 1.0] for text in texts]
+
+
+def test_embedding_recall():
+    """임베딩 recall이 embed_passages(문서 prefix/캐시 적용)로 후보를 임베딩하는지 테스트"""
+    logger.info("=== 임베딩 recall 테스트 ===")
+    embedder = _PrefixEmbedder()
+    selector = TwoStageSelector(reranker=LexicalReranker(corpus=CANDIDATES), recall_k=2, top_k=2, embedder=embedder)
+    programs = [{"pblancNm": name, "bsnsSumryCn": "<p>지원</p>"} for name in CANDIDATES]
+    user = User("테스트", "T1", ["기술"], "수출 바우처")
+    selected = selector.select(user, programs)
+    assert {program["pblancNm"] for program, _ in selected} == {"제조 혁신 바우처", "수출 바우처 지원"}
+    # 후보 텍스트는 중복 판단과 같은 program_text (HTML 정리)
+    assert embedder.passages == [f"{name} 지원" for name in CANDIDATES], embedder.passages
+
+
+if __name__ == "__main__":
+    logger.info("lexical 스코어링 헤드 테스트 시작")
+
+    test_coverage_unseen_terms()
+    test_score_independent_of_candidates()
+    test_catalog_idf()
+    test_embedding_recall()
+
+    logger.info("모든 테스트 완료!")
@@ -0,0 +1,94 @@
+"""
+시맨틱 답변 캐시 테스트 스크립트
+"""
+
+import logging
+import time
+
+import numpy as np
+
+from src.semantic_cache import SemanticCache
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def test_threshold():
+    """임계값 이상으로 유사한 질문만 적중하는지 테스트"""
+    logger.info("=== 유사도 임계값 테스트 ===")
+    cache = SemanticCache(maxsize=8, ttl=60, threshold=0.9)
+    cache.store("AI 관련 사업 추천", _unit(1, 0, 0), "AI 바우처", scope="v1")
+
+    answer, similarity = cache.lookup(_unit(1, 0.2, 0), "v1")  # cos ≈ 0.98
+    assert answer == "AI 바우처" and similarity > 0.9
+    assert cache.lookup(_unit(1, 1, 0), "v1") is None  # cos ≈ 0.71
+    # 같은 범위의 같은 질문은 덮어씀
+    cache.store("AI 관련  사업 추천", _unit(1, 0, 0), "AI 바우처 (수정)", scope="v1")
+    assert len(cache) == 1 and cache.lookup(_unit(1, 0, 0), "v1")[0] == "AI 바우처 (수정)"
+
+
+def test_scope_isolation():
+    """카탈로그 버전/검색 조건이 다른 범위의 답변은 재사용하지 않는지 테스트"""
+    logger.info("=== 캐시 범위 테스트 ===")
+    cache = SemanticCache(maxsize=8, ttl=60, threshold=0.9)
+    cache.store("수출 지원사업", _unit(0, 1, 0), "수출 바우처", scope=("v1", 5, "null"))
+
+    assert cache.lookup(_unit(0, 1, 0), ("v1", 5, "null"))[0] == "수출 바우처"
+    assert cache.lookup(_unit(0, 1, 0), ("v2", 5, "null")) is None  # 카탈로그 교체 후
+    assert cache.lookup(_unit(0, 1, 0), ("v1", 5, '{"category": "기술"}')) is None
+
+    cache.store("수출 지원사업", _unit(0, 1, 0), "새 수출 바우처", scope=("v2", 5, "null"))
+    assert cache.lookup(_unit(0, 1, 0), ("v2", 5, "null"))[0] == "새 수출 바우처"
+    assert cache.lookup(_unit(0, 1, 0), ("v1", 5, "null"))[0] == "수출 바우처"
+
+
+def test_lru_eviction():
+    """크기를 넘으면 가장 오래 조회하지 않은 답변부터 제거되는지 테스트"""
+    logger.info("=== LRU 제거 테스트 ===")
+    cache = SemanticCache(maxsize=2, ttl=60, threshold=0.9)
+    cache.store("a", _unit(1, 0, 0), "A", scope="v1")
+    cache.store("b", _unit(0, 1, 0), "B", scope="v1")
+    assert cache.lookup(_unit(1, 0, 0), "v1")[0] == "A"  # a를 최근 사용으로 갱신
+    cache.store("c", _unit(0, 0, 1), "C", scope="v1")
+
+    assert len(cache) == 2
+    assert cache.lookup(_unit(0, 1, 0), "v1") is None
+    assert cache.lookup(_unit(1, 0, 0), "v1")[0] == "A"
+    assert cache.lookup(_unit(0, 0, 1), "v1")[0] == "C"
+
+
+def test_ttl_eviction():
+    """유효 시간이 지난 답변은 조회되지 않는지 테스트"""
+    logger.info("=== TTL 제거 테스트 ===")
+    cache = SemanticCache(maxsize=8, ttl=0.05, threshold=0.9)
+    cache.store("a", _unit(1, 0, 0), "A", scope="v1")
+    assert cache.lookup(_unit(1, 0, 0), "v1")[0] == "A"
+    time.sleep(0.1)
+    assert cache.lookup(_unit(1, 0, 0), "v1") is None
+
+
+def test_disabled():
+    """크기가 0이면 저장/조회하지 않는지 테스트"""
+    logger.info("=== 비활성화 테스트 ===")
+    cache = SemanticCache(maxsize=0, ttl=60, threshold=0.9)
+    cache.store("a", _unit(1, 0, 0), "A", scope="v1")
+    assert not cache.enabled and len(cache) == 0
+    assert cache.lookup(_unit(1, 0, 0), "v1") is None
+
+
+if __name__ == "__main__":
+    logger.info("시맨틱 캐시 테스트 시작")
+
+    test_threshold()
+    test_scope_isolation()
+    test_lru_eviction()
+    test_ttl_eviction()
+    test_disabled()
+
+    logger.info("모든 테스트 완료!")
@@ -4,6 +4,9 @@ Transformers 매처 테스트 스크립트
 
 import json
 import logging
+import torch
+from tokenizers import Regex, Tokenizer, models, pre_tokenizers
+from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
 from user import User
 from transformer_matcher import TransformerMatcher
 
@@ -12,6 +15,53 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+class _TinyMatcher(TransformerMatcher):
+    """무작위 가중치의 작은 Llama 모델과 글자 단위 토크나이저를 쓰는 매처 (모델 다운로드 없음, 그리디 생성)"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        super().__init__(model_name="tiny-llama", device="cpu", cpu_dtype="fp32")
+
+    def _initialize_model(self):
+        vocab = {"[PAD]": 0, "[UNK]": 1, "[EOS]": 2}
+        for char in sorted(set("".join(self.texts))):
+            vocab.setdefault(char, len(vocab))
+        tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+        tokenizer.pre_tokenizer = pre_tokenizers.Split(Regex("."), behavior="isolated")
+        self.tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="[UNK]",
+                                                 pad_token="[PAD]", eos_token="[EOS]")
+        self.tokenizer.padding_side = "left"
+
+        torch.manual_seed(0)
+        config = LlamaConfig(vocab_size=len(vocab), hidden_size=32, intermediate_size=64, num_hidden_layers=2,
+                             num_attention_heads=4, num_key_value_heads=4, max_position_embeddings=512,
+                             pad_token_id=0, eos_token_id=2)
+        self.model = LlamaForCausalLM(config).eval()
+
+    def _generation_config(self, max_new_tokens=None):
+        generation_config = super()._generation_config(max_new_tokens)
+        generation_config.update(do_sample=False, temperature=None, top_p=None)
+        return generation_config
+
+
+def test_batch_matches_single():
+    """왼쪽 패딩 배치 생성 결과가 프롬프트별 단독 생성 결과와 같은지 테스트"""
+    logger.info("=== 배치 / 단독 생성 비교 테스트 ===")
+    prefix = "지원사업 1: AI 바우처\n지원사업 2: 수출 바우처\n"
+    suffixes = ["사업분야: 기술", "사업분야: 금융, 경영\n사업내용: 핀테크", "창업"]
+    matcher = _TinyMatcher([prefix] + suffixes)
+
+    single = [matcher.generate_responses([suffix], max_new_tokens=8, batch_size=1)[0] for suffix in suffixes]
+    # 길이가 다른 프롬프트를 한 배치로 묶어도 (왼쪽 패딩) 입력 순서와 결과가 같아야 함
+    assert matcher.generate_responses(suffixes, max_new_tokens=8, batch_size=3) == single
+    assert matcher.generate_responses(suffixes, max_new_tokens=8, batch_size=2) == single
+
+    # prefix KV 캐시 + 왼쪽 패딩된 suffix 배치 == 전체 프롬프트 단독 생성
+    full = [matcher.generate_responses([prefix + suffix], max_new_tokens=8, batch_size=1)[0] for suffix in suffixes]
+    assert matcher.generate_with_prefix(prefix, suffixes, max_new_tokens=8, batch_size=3) == full
+    assert matcher.generate_with_prefix(prefix, suffixes, max_new_tokens=8, batch_size=1) == full
+
+
 def test_extract_support_programs():
     """지원사업 정보 추출 테스트"""
     logger.info("=== 지원사업 정보 추출 테스트 ===")
@@ -60,7 +110,7 @@ def test_user_matching():
     
     for i, user in enumerate(test_users, 1):
         logger.info(f"\n--- 테스트 사용자 {i}: {user.name} ---")
-        logger.info(f"사업분야: {user.category}")
+        logger.info(f"사업분야: {user.category_list}")
         logger.info(f"사업내용: {user.main_business_summary}")
         
         try:
@@ -132,6 +182,9 @@ if __name__ == "__main__":
     logger.info("Transformers 매처 테스트 시작")
     
     try:
+        # 0. 배치 / 단독 생성 비교 테스트 (작은 무작위 모델)
+        test_batch_matches_single()
+
         # 1. 모델 로딩 테스트
         test_model_loading()
         
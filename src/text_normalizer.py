@@ -0,0 +1,137 @@
+"""
+지원사업 공고 텍스트 정규화
+bsnsSumryCn에는 HTML 태그/엔티티, 글머리 기호(☞, ○, ■ 등), 연속된 \r\n, 반복되는 안내 문구가 섞여 있습니다.
+수집(ingest) 시점에 레코드마다 한 번만 정리하여 원본 옆에 저장하고,
+프롬프트 / 임베딩 / 토큰 계산에서는 저장된 필드를 그대로 사용합니다.
+
+- cleanSumryCn: HTML과 장식 문자를 제거하고 안내 문구를 뺀 전체 본문
+- compactSumryCn: 정리된 본문의 앞부분 문장들로 만든 짧은 요약
+"""
+
+import html
+import re
+import unicodedata
+from typing import List, Optional
+
+from src.config import Config
+
+CLEAN_FIELD = "cleanSumryCn"
+COMPACT_FIELD = "compactSumryCn"
+
+BLOCK_TAG_PATTERN = re.compile(r"<\s*(br|/p|/div|/li|/tr|/h\d)\b[^>]*>", re.IGNORECASE)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+INVISIBLE_PATTERN = re.compile("[\u200b\u200c\u200d\ufeff]")
+BULLET_PATTERN = re.compile(r"^[\s☞○●◎◇◆□■▶▷►▪•·※★☆✔✓➢➤→\-*]+")
+SPACE_PATTERN = re.compile("[ \t\u00a0\u3000]+")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?。])\s+|\n+")
+# 공고마다 반복되는 안내 문구 (내용 없이 토큰만 차지함)
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r"많은\s*(관심|참여|신청)",
+        r"(아래|다음)와\s*같이\s*(공고|안내|모집)",
+        r"공고하오니",
+    )
+]
+# "자세한 지원내용 공고문 참조"처럼 공고문을 가리키기만 하는 짧은 문장
+REFERENCE_PATTERN = re.compile(r"(공고문|첨부\s*파일|붙임|첨부)\s*(을|를)?\s*(참조|참고)")
+REFERENCE_MAX_CHARS = 30
+
+
+def split_sentences(text: str) -> List[str]:
+    """문장 단위로 나눕니다. (마침표/줄바꿈 기준)"""
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.split(text) if sentence and sentence.strip()]
+
+
+def _is_boilerplate(sentence: str) -> bool:
+    if len(sentence) <= REFERENCE_MAX_CHARS and REFERENCE_PATTERN.search(sentence):
+        return True
+    return any(pattern.search(sentence) for pattern in BOILERPLATE_PATTERNS)
+
+
+def clean_text(text: Optional[str]) -> str:
+    """
+    공고 본문을 정리합니다.
+
+    Args:
+        text (str): 원본 본문 (HTML 포함 가능)
+
+    Returns:
+        str: 줄 단위로 정리된 본문 (중복된 줄과 안내 문구 제거)
+    """
+    # 이중으로 이스케이프된 엔티티(&amp;lt; 등)까지 풀기
+    text = html.unescape(html.unescape(text or ""))
+    text = BLOCK_TAG_PATTERN.sub("\n", text)
+    text = TAG_PATTERN.sub(" ", text)
+    text = INVISIBLE_PATTERN.sub("", unicodedata.normalize("NFC", text))
+
+    lines, seen = [], set()
+    for raw_line in text.replace("\r", "\n").split("\n"):
+        line = SPACE_PATTERN.sub(" ", BULLET_PATTERN.sub("", raw_line)).strip()
+        if not line or line in seen:
+            continue
+        seen.add(line)
+        sentences = [sentence for sentence in split_sentences(line) if not _is_boilerplate(sentence)]
+        if sentences:
+            lines.append(" ".join(sentences))
+    return "\n".join(lines)
+
+
+def compact_summary(cleaned: str, max_sentences: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    """
+    정리된 본문의 앞부분 문장으로 짧은 요약을 만듭니다.
+
+    Args:
+        cleaned (str): clean_text() 결과
+        max_sentences (int, optional): 최대 문장 수
+        max_chars (int, optional): 최대 글자 수 (넘으면 문장 단위로 자르고, 첫 문장도 넘으면 글자 수로 자름)
+        (None인 설정값은 Config에서 가져옴)
+    """
+    max_sentences = max_sentences or Config.SUMMARY_MAX_SENTENCES
+    max_chars = max_chars or Config.SUMMARY_MAX_CHARS
+
+    selected, length = [], 0
+    for sentence in split_sentences(cleaned)[:max_sentences]:
+        if length + len(sentence) > max_chars:
+            break
+        selected.append(sentence)
+        length += len(sentence) + 1
+    if not selected and cleaned:
+        return cleaned[:max_chars].rstrip() + "…"
+    return " ".join(selected)
+
+
+def normalize_record(record: dict, force: bool = False) -> dict:
+    """
+    레코드에 정리된 본문(cleanSumryCn)과 짧은 요약(compactSumryCn)을 추가합니다. (원본 필드는 유지)
+
+    Args:
+        record (dict): 지원사업 레코드 (제자리에서 수정)
+        force (bool): 이미 정규화된 레코드도 다시 계산
+
+    Returns:
+        dict: 같은 레코드
+    """
+    if force or CLEAN_FIELD not in record or COMPACT_FIELD not in record:
+        cleaned = clean_text(record.get("bsnsSumryCn"))
+        record[CLEAN_FIELD] = cleaned
+        record[COMPACT_FIELD] = compact_summary(cleaned)
+    return record
+
+
+def clean_summary(record: dict) -> str:
+    """정리된 본문 (정규화되지 않은 레코드는 즉석에서 계산)"""
+    if CLEAN_FIELD in record:
+        return record[CLEAN_FIELD]
+    return clean_text(record.get("bsnsSumryCn"))
+
+
+def short_summary(record: dict) -> str:
+    """짧은 요약 (정규화되지 않은 레코드는 즉석에서 계산)"""
+    if COMPACT_FIELD in record:
+        return record[COMPACT_FIELD]
+    return compact_summary(clean_summary(record))
+
+
+def program_text(record: dict) -> str:
+    """공고 텍스트 (공고명 + 정리된 사업요약) - 중복 판단/후보 선별/스코어링에서 공통으로 사용"""
+    return f"{record.get('pblancNm') or ''} {clean_summary(record)}"
@@ -3,11 +3,14 @@ Transformers를 사용한 지원사업 매칭 시스템
 사용자의 사업분야와 지원사업 정보를 분석하여 적합한 지원사업을 추출합니다.
 """
 
+import copy
 import json
 import os
-from typing import Dict, List, Any
+import time
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 from user import User
+from config import Config
 from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
 
@@ -19,40 +22,101 @@ logger = logging.getLogger(__name__)
 class TransformerMatcher:
     """Transformers를 사용한 지원사업 매칭 클래스"""
     
-    def __init__(self, model_name: str = "K-intelligence/Midm-2.0-Base-Instruct"):
+    def __init__(self,
+                 model_name: str = "K-intelligence/Midm-2.0-Base-Instruct",
+                 device: Optional[str] = None,
+                 cpu_dtype: Optional[str] = None):
         """
         Args:
             model_name (str): 사용할 transformers 모델명
+            device (str, optional): auto / cpu / cuda (None일 경우 Config에서 가져옴)
+            cpu_dtype (str, optional): CPU 서빙 시 int8 / bf16 / fp32 (None일 경우 Config에서 가져옴)
         """
         self.model_name = model_name
+        self.device = self._resolve_device(device or Config.TRANSFORMER_DEVICE)
+        self.cpu_dtype = cpu_dtype or Config.TRANSFORMER_CPU_DTYPE
         self.tokenizer = None
         self.model = None
+        # 공통 prefix(카탈로그 프롬프트) -> (prefix 토큰, KV 캐시)
+        self._prefix_cache: Dict[str, Tuple[Any, Any]] = {}
         self._initialize_model()
-    
+
+    @staticmethod
+    def _resolve_device(device: str) -> str:
+        """auto 설정을 실제 디바이스로 변환합니다."""
+        if device == "auto":
+            return "cuda" if torch.cuda.is_available() else "cpu"
+        return device
+
+    @staticmethod
+    def _cpu_supports_bf16() -> bool:
+        """CPU가 bf16 연산을 하드웨어로 지원하는지 확인합니다."""
+        try:
+            with open("/proc/cpuinfo", encoding="utf-8") as f:
+                cpu_flags = f.read()
+        except OSError:
+            return False
+        return "avx512_bf16" in cpu_flags or "amx_bf16" in cpu_flags
+
     def _initialize_model(self):
-        """Transformers 모델 초기화"""
+        """Transformers 모델 초기화 (프로세스당 한 번만 로드)"""
         try:
-            logger.info(f"Transformers 모델 초기화 중: {self.model_name}")
-            
+            logger.info(f"Transformers 모델 초기화 중: {self.model_name} (device={self.device})")
+
             # 토크나이저 로드
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            
-            # 모델 로드 (CPU 사용)
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_name,
-                torch_dtype=torch.float32,
-                device_map="auto" if torch.cuda.is_available() else "cpu"
-            )
-            
+            # 배치 생성 시 프롬프트 끝이 정렬되도록 왼쪽 패딩 사용
+            self.tokenizer.padding_side = "left"
+
             # 패딩 토큰 설정
             if self.tokenizer.pad_token is None:
                 self.tokenizer.pad_token = self.tokenizer.eos_token
-            
+
+            if self.device == "cuda":
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    torch_dtype=torch.float16,
+                    device_map="auto"
+                )
+            else:
+                self.model = self._load_cpu_model()
+
+            self.model.eval()
             logger.info("Transformers 모델 초기화 완료")
-            
+
         except Exception as e:
             logger.error(f"Transformers 모델 초기화 실패: {e}")
             raise
+
+    def _load_cpu_model(self):
+        """CPU 서빙용 모델 로드 (bf16 또는 동적 int8 양자화)"""
+        if Config.TRANSFORMER_NUM_THREADS > 0:
+            torch.set_num_threads(Config.TRANSFORMER_NUM_THREADS)
+
+        if self.cpu_dtype == "bf16":
+            if self._cpu_supports_bf16():
+                logger.info("CPU bf16 모드로 모델을 로드합니다.")
+                return AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    torch_dtype=torch.bfloat16,
+                    low_cpu_mem_usage=True
+                )
+            logger.warning("CPU가 bf16을 지원하지 않아 int8 양자화로 대체합니다.")
+            self.cpu_dtype = "int8"
+
+        model = AutoModelForCausalLM.from_pretrained(
+            self.model_name,
+            torch_dtype=torch.float32,
+            low_cpu_mem_usage=True
+        )
+
+        if self.cpu_dtype == "int8":
+            # Linear 레이어 가중치를 int8로 동적 양자화
+            logger.info("CPU 동적 int8 양자화를 적용합니다.")
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        return model
     
     def extract_support_programs_info(self, all_categories_file: str) -> Dict[str, List[Dict]]:
         """
@@ -104,7 +168,7 @@ class TransformerMatcher:
         # 사용자 정보 요약
         user_info = f"""
 사용자 정보:
-- 사업분야: {', '.join(user.category)}
+- 사업분야: {', '.join(user.category_list)}
 - 사업내용: {user.main_business_summary}
 """
         
@@ -132,6 +196,47 @@ class TransformerMatcher:
         
         full_prompt = user_info + programs_info + matching_instruction
         return full_prompt
+
+    def create_catalog_prefix(self, support_programs: List[Dict]) -> str:
+        """
+        여러 사용자가 공유하는 카탈로그 prefix 생성 (KV 캐시 재사용용)
+        
+        Args:
+            support_programs (List[Dict]): 지원사업 정보 리스트
+            
+        Returns:
+            str: 지원사업 정보와 매칭 지시사항으로 구성된 prefix
+        """
+        programs_info = ""
+        for i, program in enumerate(support_programs):
+            programs_info += f"""
+지원사업 {i+1}:
+- 사업명: {program['pblancNm']}
+- 사업내용: {program['bsnsSumryCn']}
+"""
+
+        matching_instruction = """
+위의 지원사업 정보와 아래의 사용자 정보를 분석하여, 사용자의 사업분야와 사업내용에 가장 적합한 지원사업을 선택해주세요.
+
+분석 기준:
+1. 사용자의 사업분야와 지원사업의 분야 일치도
+2. 사용자의 사업내용과 지원사업 내용의 연관성
+3. 지원사업의 구체성과 실용성
+
+각 지원사업에 대해 0-10점의 적합도 점수를 매기고, 7점 이상인 지원사업만 선택해주세요.
+응답 형식: "지원사업 번호: 점수 (선택 이유)"
+"""
+        return programs_info + matching_instruction
+
+    def create_user_suffix(self, user: User) -> str:
+        """사용자별 prefix 뒤에 붙는 프롬프트 생성"""
+        return f"""
+사용자 정보:
+- 사업분야: {', '.join(user.category_list)}
+- 사업내용: {user.main_business_summary}
+
+응답:
+"""
     
     def generate_response(self, prompt: str, max_length: int = 1000) -> str:
         """
@@ -145,38 +250,195 @@ class TransformerMatcher:
             str: 생성된 응답
         """
         try:
-            # 입력 토큰화
+            # 입력 토큰화 (모델이 로드된 디바이스로 한 번만 이동)
             inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512)
-            
-            # GPU 사용 가능시 GPU로 이동
-            if torch.cuda.is_available():
-                inputs = {k: v.cuda() for k, v in inputs.items()}
-                self.model = self.model.cuda()
-            
+            inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
+
             # 생성 파라미터 설정
-            generation_config = {
-                'max_length': max_length,
-                'temperature': 0.1,
-                'top_p': 0.9,
-                'do_sample': True,
-                'pad_token_id': self.tokenizer.eos_token_id
-            }
-            
+            generation_config = self._generation_config()
+            generation_config['max_length'] = max_length
+
             # 응답 생성
-            with torch.no_grad():
+            with torch.inference_mode():
                 outputs = self.model.generate(**inputs, **generation_config)
-            
-            # 토큰을 텍스트로 디코딩
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # 프롬프트 부분 제거하고 응답만 반환
-            response = response[len(prompt):].strip()
-            
-            return response
-            
+
+            # 프롬프트 토큰을 제외한 응답 부분만 디코딩
+            prompt_length = inputs['input_ids'].shape[1]
+            response = self.tokenizer.decode(outputs[0, prompt_length:], skip_special_tokens=True)
+
+            return response.strip()
+
         except Exception as e:
             logger.error(f"응답 생성 실패: {e}")
             raise
+
+    def _generation_config(self, max_new_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """공통 생성 파라미터"""
+        generation_config = {
+            'temperature': 0.1,
+            'top_p': 0.9,
+            'do_sample': True,
+            'pad_token_id': self.tokenizer.pad_token_id
+        }
+        if max_new_tokens is not None:
+            generation_config['max_new_tokens'] = max_new_tokens
+        return generation_config
+
+    def _generate_ids(self, input_ids, attention_mask, max_new_tokens: int, past_key_values=None):
+        """토큰 ID를 입력받아 새로 생성된 토큰 ID만 반환합니다."""
+        generate_kwargs = self._generation_config(max_new_tokens)
+        if past_key_values is not None:
+            generate_kwargs['past_key_values'] = past_key_values
+
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                **generate_kwargs
+            )
+        return outputs[:, input_ids.shape[1]:]
+
+    def _decode(self, new_token_ids) -> List[str]:
+        return [text.strip() for text in self.tokenizer.batch_decode(new_token_ids, skip_special_tokens=True)]
+
+    def generate_responses(self, prompts: List[str], max_new_tokens: int = 512,
+                           batch_size: Optional[int] = None) -> List[str]:
+        """
+        여러 프롬프트를 왼쪽 패딩 배치로 한 번에 생성합니다.
+        패딩을 줄이기 위해 길이순으로 묶은 뒤 입력 순서대로 돌려줍니다.
+
+        Args:
+            prompts (List[str]): 입력 프롬프트 리스트
+            max_new_tokens (int): 프롬프트당 최대 생성 토큰 수
+            batch_size (int, optional): 배치 크기 (None일 경우 Config에서 가져옴)
+
+        Returns:
+            List[str]: 입력 순서와 동일한 응답 리스트
+        """
+        batch_size = batch_size or Config.TRANSFORMER_BATCH_SIZE
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+        responses: List[Optional[str]] = [None] * len(prompts)
+
+        try:
+            for start in range(0, len(order), batch_size):
+                batch_indices = order[start:start + batch_size]
+                inputs = self.tokenizer(
+                    [prompts[i] for i in batch_indices],
+                    return_tensors="pt",
+                    padding=True
+                ).to(self.model.device)
+                new_tokens = self._generate_ids(inputs['input_ids'], inputs['attention_mask'], max_new_tokens)
+                for i, text in zip(batch_indices, self._decode(new_tokens)):
+                    responses[i] = text
+            return responses
+
+        except Exception as e:
+            logger.error(f"배치 응답 생성 실패: {e}")
+            raise
+
+    def _get_prefix_cache(self, prefix: str):
+        """공통 prefix의 KV 캐시를 계산하거나 재사용합니다."""
+        cached = self._prefix_cache.get(prefix)
+        if cached is None:
+            logger.info("공통 prefix KV 캐시를 생성합니다.")
+            prefix_ids = self.tokenizer(prefix, return_tensors="pt").input_ids.to(self.model.device)
+            with torch.inference_mode():
+                outputs = self.model(input_ids=prefix_ids, use_cache=True)
+            cached = (prefix_ids, outputs.past_key_values)
+            # 카탈로그가 바뀌면 이전 캐시는 쓸모가 없으므로 최신 prefix 하나만 유지
+            self._prefix_cache = {prefix: cached}
+        return cached
+
+    def generate_with_prefix(self, prefix: str, suffixes: List[str], max_new_tokens: int = 512,
+                             batch_size: Optional[int] = None) -> List[str]:
+        """
+        공통 prefix의 KV 캐시를 재사용하여 suffix별 응답을 배치 생성합니다.
+        suffix는 prefix 뒤에서 왼쪽 패딩되며, 패딩 위치는 attention mask로 가려집니다.
+
+        Args:
+            prefix (str): 모든 요청이 공유하는 프롬프트 앞부분 (예: 카탈로그)
+            suffixes (List[str]): 요청별 프롬프트 뒷부분 (예: 사용자 정보)
+            max_new_tokens (int): 요청당 최대 생성 토큰 수
+            batch_size (int, optional): 배치 크기 (None일 경우 Config에서 가져옴)
+
+        Returns:
+            List[str]: suffix 순서와 동일한 응답 리스트
+        """
+        batch_size = batch_size or Config.TRANSFORMER_BATCH_SIZE
+        prefix_ids, prefix_past = self._get_prefix_cache(prefix)
+        responses: List[str] = []
+
+        try:
+            for start in range(0, len(suffixes), batch_size):
+                batch = suffixes[start:start + batch_size]
+                suffix_inputs = self.tokenizer(
+                    batch,
+                    return_tensors="pt",
+                    padding=True,
+                    add_special_tokens=False
+                ).to(self.model.device)
+
+                n = len(batch)
+                input_ids = torch.cat([prefix_ids.expand(n, -1), suffix_inputs['input_ids']], dim=-1)
+                attention_mask = torch.cat([
+                    torch.ones((n, prefix_ids.shape[1]), dtype=suffix_inputs['attention_mask'].dtype,
+                               device=self.model.device),
+                    suffix_inputs['attention_mask']
+                ], dim=-1)
+
+                # generate가 캐시를 덮어쓰므로 호출마다 복사본을 사용
+                past = copy.deepcopy(prefix_past)
+                if n > 1:
+                    past.batch_repeat_interleave(n)
+
+                new_tokens = self._generate_ids(input_ids, attention_mask, max_new_tokens, past_key_values=past)
+                responses.extend(self._decode(new_tokens))
+            return responses
+
+        except Exception as e:
+            logger.error(f"prefix 캐시 응답 생성 실패: {e}")
+            raise
+
+    def benchmark(self, suffixes: List[str], prefix: str = "", max_new_tokens: int = 128) -> Dict[str, Any]:
+        """
+        순차 생성, 배치 생성, prefix 캐시 배치 생성의 tokens/sec를 측정합니다.
+
+        Args:
+            suffixes (List[str]): 요청별 프롬프트 리스트
+            prefix (str): 모든 요청이 공유하는 프롬프트 앞부분 (빈 문자열이면 prefix 캐시 측정 생략)
+            max_new_tokens (int): 프롬프트당 최대 생성 토큰 수
+
+        Returns:
+            Dict[str, Any]: 모드별 생성 토큰 수, 소요 시간, tokens/sec
+        """
+        prompts = [prefix + suffix for suffix in suffixes]
+        modes = {
+            'sequential': lambda: [
+                response
+                for prompt in prompts
+                for response in self.generate_responses([prompt], max_new_tokens=max_new_tokens, batch_size=1)
+            ],
+            'batched': lambda: self.generate_responses(prompts, max_new_tokens=max_new_tokens),
+        }
+        if prefix:
+            modes['prefix_cached'] = lambda: self.generate_with_prefix(prefix, suffixes, max_new_tokens=max_new_tokens)
+
+        results = {}
+        for mode, run in modes.items():
+            start = time.perf_counter()
+            responses = run()
+            elapsed = time.perf_counter() - start
+            tokens = sum(len(self.tokenizer(r, add_special_tokens=False).input_ids) for r in responses)
+            results[mode] = {
+                'tokens': tokens,
+                'seconds': round(elapsed, 3),
+                'tokens_per_second': round(tokens / elapsed, 2) if elapsed > 0 else 0.0
+            }
+            logger.info(
+                f"벤치마크 [{mode}] (device={self.device}, dtype={self.cpu_dtype}): "
+                f"{tokens} tokens / {elapsed:.2f}s = {results[mode]['tokens_per_second']} tok/s"
+            )
+        return results
     
     def match_support_programs(self, user: User, extracted_data: Dict[str, List[Dict]]) -> List[Dict]:
         """
@@ -194,7 +456,7 @@ class TransformerMatcher:
             relevant_programs = []
             category_indices = {}  # 카테고리별 원본 인덱스 매핑
             
-            for user_category in user.category:
+            for user_category in user.category_list:
                 if user_category in extracted_data:
                     for program in extracted_data[user_category]:
                         relevant_programs.append(program)
@@ -226,6 +488,50 @@ class TransformerMatcher:
             logger.error(f"지원사업 매칭 실패: {e}")
             raise
     
+    def match_support_programs_batch(self, users: List[User], extracted_data: Dict[str, List[Dict]],
+                                     max_new_tokens: int = 512) -> List[List[Dict]]:
+        """
+        여러 사용자를 한 번에 매칭합니다. (CPU 서빙 모드)
+        같은 카테고리 조합의 사용자는 카탈로그 prefix KV 캐시를 공유하여 배치로 생성합니다.
+        
+        Args:
+            users (List[User]): 사용자 정보 리스트
+            extracted_data (Dict[str, List[Dict]]): 추출된 지원사업 정보
+            max_new_tokens (int): 사용자당 최대 생성 토큰 수
+            
+        Returns:
+            List[List[Dict]]: 사용자 순서와 동일한 매칭 결과 리스트
+        """
+        try:
+            # 카테고리 조합별로 사용자 그룹화
+            groups: Dict[Tuple[str, ...], List[int]] = {}
+            for i, user in enumerate(users):
+                groups.setdefault(tuple(user.category_list), []).append(i)
+
+            results: List[List[Dict]] = [[] for _ in users]
+            for categories, user_indices in groups.items():
+                relevant_programs = []
+                for category in categories:
+                    relevant_programs.extend(extracted_data.get(category, []))
+
+                if not relevant_programs:
+                    logger.warning(f"{list(categories)} 카테고리와 관련된 지원사업이 없습니다.")
+                    continue
+
+                logger.info(f"Transformers 배치 매칭 시작: {list(categories)} / {len(user_indices)}명")
+                prefix = self.create_catalog_prefix(relevant_programs)
+                suffixes = [self.create_user_suffix(users[i]) for i in user_indices]
+                responses = self.generate_with_prefix(prefix, suffixes, max_new_tokens=max_new_tokens)
+
+                for i, response in zip(user_indices, responses):
+                    results[i] = self._parse_matching_result(response, relevant_programs, {})
+
+            return results
+
+        except Exception as e:
+            logger.error(f"배치 매칭 실패: {e}")
+            raise
+    
     def _parse_matching_result(self, transformer_result: str, relevant_programs: List[Dict], category_indices: Dict) -> List[Dict]:
         """
         Transformers 결과를 파싱하여 매칭된 지원사업 추출
@@ -317,7 +623,7 @@ def main():
     )
     
     # 파일 경로 설정
-    all_categories_file = "src/all_categories.json"
+    all_categories_file = Config.CATALOG_FILE
     output_file = "src/transformer_matched_support_programs.json"
     
     try:
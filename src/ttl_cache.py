@@ -0,0 +1,74 @@
+"""
+크기 제한 LRU + TTL 인메모리 캐시
+반복되는 질의(빠른 답장, 분야 버튼, 재전송 메시지)의 계산 결과를 재사용합니다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class TTLCache:
+    """스레드 안전한 LRU + TTL 캐시"""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize (int): 최대 항목 수 (넘으면 가장 오래 사용하지 않은 항목부터 제거)
+            ttl (float, optional): 항목 유효 시간 (초, None이면 만료 없음)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """값을 조회합니다. 없거나 만료되었으면 default를 반환합니다."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """값을 저장합니다."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """만료되지 않은 (키, 값) 목록 (적중/미스 통계와 LRU 순서에 영향 없음)"""
+        with self._lock:
+            now = time.monotonic()
+            return [
+                (key, value) for key, (value, stored_at) in self._data.items()
+                if self.ttl is None or now - stored_at <= self.ttl
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 크기와 적중률"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
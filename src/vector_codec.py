@@ -0,0 +1,168 @@
+"""
+임베딩 압축 코덱
+multilingual-e5-large의 1024차원 fp32 벡터(4KB)를 더 작게 저장합니다.
+
+- 차원 축소: PCA(카탈로그로 학습) 또는 Matryoshka 방식 앞부분 절단 (축소 후 다시 정규화)
+- 값 압축: fp16(2배) 또는 차원별 scalar 양자화 int8(4배)
+
+압축 벡터로 1차 검색한 뒤 원본 벡터로 상위 후보를 재채점(rescoring)하는 용도로 사용합니다.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+DTYPES = ("fp32", "fp16", "int8")
+REDUCTIONS = ("pca", "matryoshka")
+# 점수 계산 시 코드를 float32로 바꾸는 블록 크기 (임시 메모리 제한)
+SCORE_BLOCK_ROWS = 8192
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorCodec:
+    """차원 축소 + fp16/int8 압축 코덱"""
+
+    def __init__(self, dtype: str = "fp32", dim: int = 0, reduction: str = "pca"):
+        """
+        Args:
+            dtype (str): 'fp32' / 'fp16' / 'int8'
+            dim (int): 축소할 차원 (0이면 축소하지 않음)
+            reduction (str): 'pca' / 'matryoshka'
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"지원하지 않는 dtype입니다: {dtype}")
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"지원하지 않는 차원 축소 방식입니다: {reduction}")
+        self.dtype = dtype
+        self.dim = dim
+        self.reduction = reduction
+        # 학습 파라미터
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.low: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self.fitted = False
+
+    @classmethod
+    def from_config(cls) -> Optional["VectorCodec"]:
+        """설정으로 코덱을 만듭니다. 압축하지 않는 설정(fp32, 원본 차원)이면 None"""
+        if Config.VECTOR_CODEC_DTYPE == "fp32" and not Config.VECTOR_CODEC_DIM:
+            return None
+        return cls(Config.VECTOR_CODEC_DTYPE, Config.VECTOR_CODEC_DIM, Config.VECTOR_CODEC_REDUCTION)
+
+    def __repr__(self) -> str:
+        return f"VectorCodec(dtype={self.dtype}, dim={self.dim or 'full'}, reduction={self.reduction})"
+
+    @property
+    def numpy_dtype(self):
+        return {"fp32": np.float32, "fp16": np.float16, "int8": np.int8}[self.dtype]
+
+    def bytes_per_vector(self, full_dim: int) -> int:
+        dim = self.dim if self.dim and self.dim < full_dim else full_dim
+        return dim * np.dtype(self.numpy_dtype).itemsize
+
+    def fit(self, vectors: np.ndarray, sample_size: int = 20000, seed: int = 0) -> "VectorCodec":
+        """
+        PCA 축(및 int8 양자화 범위)을 학습합니다. 필요 없는 설정이면 아무것도 하지 않습니다.
+
+        Args:
+            vectors (np.ndarray): (개수, 차원) 학습용 벡터
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) > sample_size:
+            vectors = vectors[np.random.default_rng(seed).choice(len(vectors), size=sample_size, replace=False)]
+
+        full_dim = vectors.shape[1]
+        if self.reduction == "pca" and self.dim and self.dim < full_dim:
+            self.mean = vectors.mean(axis=0)
+            # 학습 벡터 수가 차원보다 적으면 가능한 축 수까지만 사용
+            _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+            self.components = vt[:self.dim].astype(np.float32)
+
+        if self.dtype == "int8":
+            reduced = self.reduce(vectors)
+            self.low = reduced.min(axis=0)
+            scale = (reduced.max(axis=0) - self.low) / 255.0
+            self.scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+
+        self.fitted = True
+        return self
+
+    def reduce(self, vectors: np.ndarray) -> np.ndarray:
+        """차원 축소 후 정규화한 float32 벡터"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim and self.dim < vectors.shape[-1]:
+            if self.reduction == "matryoshka":
+                vectors = vectors[..., :self.dim]
+            else:
+                vectors = (vectors - self.mean) @ self.components.T
+        return _normalize_rows(vectors).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """벡터를 저장용 코드로 변환합니다."""
+        reduced = self.reduce(vectors)
+        if self.dtype == "int8":
+            codes = np.clip(np.round((reduced - self.low) / self.scale), 0, 255) - 128
+            return codes.astype(np.int8)
+        return reduced.astype(self.numpy_dtype)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """코드를 (축소된 차원의) float32 근사 벡터로 되돌립니다."""
+        if self.dtype == "int8":
+            return (codes.astype(np.float32) + 128) * self.scale + self.low
+        return codes.astype(np.float32)
+
+    def score(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """
+        코드와 질의의 근사 내적을 계산합니다. (코드 전체를 복원하지 않음)
+
+        Args:
+            codes (np.ndarray): (개수, 축소 차원) 코드
+            queries (np.ndarray): (차원,) 또는 (질의 수, 차원) 원본 차원 질의
+
+        Returns:
+            np.ndarray: (개수,) 또는 (질의 수, 개수) 점수
+        """
+        reduced = self.reduce(queries)
+        offset = 0.0
+        if self.dtype == "int8":
+            # x ≈ low + (code + 128) * scale  ->  x·q = low·q + 128 * scale·q + code·(scale * q)
+            weights = reduced * self.scale
+            offset = reduced @ self.low + 128 * weights.sum(axis=-1)
+        else:
+            weights = reduced
+
+        blocks = [
+            codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32, copy=False) @ weights.T
+            for start in range(0, len(codes), SCORE_BLOCK_ROWS)
+        ]
+        scores = np.concatenate(blocks) if blocks else np.zeros((0,) + weights.shape[:-1], dtype=np.float32)
+        return (scores + offset).T
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """save/load용 파라미터"""
+        state = {"config": np.array([self.dtype, str(self.dim), self.reduction])}
+        for name in ("mean", "components", "low", "scale"):
+            value = getattr(self, name)
+            if value is not None:
+                state[name] = value
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray]) -> "VectorCodec":
+        dtype, dim, reduction = [str(value) for value in state["config"]]
+        codec = cls(dtype, int(dim), reduction)
+        for name in ("mean", "components", "low", "scale"):
+            if name in state:
+                setattr(codec, name, np.asarray(state[name], dtype=np.float32))
+        codec.fitted = True
+        return codec
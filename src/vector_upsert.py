@@ -0,0 +1,147 @@
+"""
+벡터 인덱스 병렬 업서트
+벡터를 개수/요청 크기 제한에 맞춘 배치로 나누어, 제한된 수의 워커로 동시에 업서트합니다.
+입력은 이터러블로 받아 앞쪽 배치를 전송하는 동안 뒤쪽 벡터의 임베딩을 계속할 수 있습니다.
+배치마다 지수 백오프로 재시도하고, 진행률과 처리량을 로그로 남깁니다.
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.config import Config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+VectorItem = Dict[str, Any]
+
+
+def estimate_item_bytes(item: VectorItem) -> int:
+    """업서트 요청에서 벡터 하나가 차지하는 대략적인 크기 (JSON 직렬화 기준)"""
+    return len(json.dumps(item, ensure_ascii=False).encode("utf-8"))
+
+
+def iter_upsert_batches(items: Iterable[VectorItem],
+                        max_count: Optional[int] = None,
+                        max_bytes: Optional[int] = None) -> Iterator[List[VectorItem]]:
+    """
+    벡터를 개수와 요청 크기 제한을 모두 만족하는 배치로 나눕니다.
+
+    Args:
+        items (Iterable[VectorItem]): {"id", "values", "metadata"} 벡터
+        max_count (int, optional): 배치당 최대 벡터 수 (None일 경우 Config에서 가져옴)
+        max_bytes (int, optional): 배치당 최대 요청 크기 (None일 경우 Config에서 가져옴)
+
+    Yields:
+        List[VectorItem]: 업서트 배치
+    """
+    max_count = max_count or Config.UPSERT_BATCH_SIZE
+    max_bytes = max_bytes or Config.UPSERT_MAX_BYTES
+
+    batch: List[VectorItem] = []
+    batch_bytes = 0
+    for item in items:
+        item_bytes = estimate_item_bytes(item)
+        if item_bytes > max_bytes:
+            raise ValueError(f"벡터 하나가 요청 크기 제한을 넘습니다: {item['id']} ({item_bytes} bytes)")
+        if batch and (len(batch) >= max_count or batch_bytes + item_bytes > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(item)
+        batch_bytes += item_bytes
+    if batch:
+        yield batch
+
+
+def _upsert_with_retry(index, batch: List[VectorItem], namespace: str, max_retries: int, backoff: float) -> int:
+    for attempt in range(max_retries + 1):
+        try:
+            start = time.perf_counter()
+            index.upsert(vectors=batch, namespace=namespace)
+            metrics.observe("upsert.batch_seconds", time.perf_counter() - start)
+            return len(batch)
+        except Exception as e:
+            if attempt == max_retries:
+                metrics.increment("upsert.failed_batches")
+                raise
+            delay = backoff * (2 ** attempt)
+            metrics.increment("upsert.retries")
+            logger.warning(f"업서트 배치 재시도 {attempt + 1}/{max_retries} ({len(batch)}개, {delay:.1f}초 후): {e}")
+            time.sleep(delay)
+    return 0
+
+
+def parallel_upsert(index,
+                    items: Iterable[VectorItem],
+                    namespace: str,
+                    total: Optional[int] = None,
+                    max_count: Optional[int] = None,
+                    max_bytes: Optional[int] = None,
+                    max_workers: Optional[int] = None,
+                    max_retries: Optional[int] = None,
+                    backoff: Optional[float] = None) -> int:
+    """
+    벡터를 크기 제한 배치로 나누어 병렬 업서트합니다.
+
+    Args:
+        index: upsert(vectors, namespace)를 제공하는 인덱스 (Pinecone Index 또는 LocalIndex)
+        items (Iterable[VectorItem]): 업서트할 벡터 (제너레이터면 임베딩과 전송이 겹쳐 진행됨)
+        namespace (str): 네임스페이스
+        total (int, optional): 전체 벡터 수 (진행률 로그용)
+        max_count (int, optional): 배치당 최대 벡터 수
+        max_bytes (int, optional): 배치당 최대 요청 크기
+        max_workers (int, optional): 동시 업서트 수
+        max_retries (int, optional): 배치당 최대 재시도 횟수
+        backoff (float, optional): 첫 재시도 대기 시간 (초, 이후 2배씩 증가)
+
+    Returns:
+        int: 업서트한 벡터 수
+
+    Raises:
+        Exception: 재시도 후에도 실패한 배치가 있는 경우 (나머지 배치는 모두 처리한 뒤 첫 오류를 다시 발생)
+    """
+    max_workers = max_workers or Config.UPSERT_MAX_WORKERS
+    max_retries = Config.UPSERT_MAX_RETRIES if max_retries is None else max_retries
+    backoff = Config.UPSERT_RETRY_BACKOFF if backoff is None else backoff
+
+    start = time.perf_counter()
+    upserted = 0
+    n_batches = 0
+    errors: List[Exception] = []
+    pending = set()
+
+    def collect(done):
+        nonlocal upserted
+        for future in done:
+            try:
+                upserted += future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            elapsed = time.perf_counter() - start
+            progress = f"{upserted}/{total}" if total else f"{upserted}"
+            logger.info(f"🤖 업서트 진행: {progress}개 ({upserted / max(elapsed, 1e-9):.1f} vectors/sec)")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vector-upsert") as executor:
+        for batch in iter_upsert_batches(items, max_count, max_bytes):
+            # 전송 대기 배치 수를 제한하여 메모리에 벡터가 쌓이지 않게 함
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(_upsert_with_retry, index, batch, namespace, max_retries, backoff))
+            n_batches += 1
+        done, _ = wait(pending)
+        collect(done)
+
+    elapsed = time.perf_counter() - start
+    metrics.increment("upsert.vectors", upserted)
+    metrics.increment("upsert.batches", n_batches)
+    logger.info(f"🤖 업서트 완료: {upserted}개, {n_batches}개 배치, {elapsed:.2f}초 ({upserted / max(elapsed, 1e-9):.1f} vectors/sec)")
+
+    if errors:
+        logger.error(f"업서트 실패 배치 {len(errors)}개")
+        raise errors[0]
+    return upserted
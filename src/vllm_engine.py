@@ -0,0 +1,178 @@
+"""
+취소 가능한 vLLM 엔진 래퍼
+vLLM AsyncLLMEngine을 전용 이벤트 루프 스레드에서 구동하고,
+동기 invoke() 인터페이스를 제공하면서 취소/데드라인 시 engine.abort()로 배치 슬롯을 즉시 반환합니다.
+astream()으로 생성되는 텍스트를 조각 단위로 받을 수도 있습니다.
+"""
+
+import asyncio
+import logging
+import threading
+import uuid
+from typing import AsyncIterator, Optional
+
+from src.cancellation import CancelToken, GenerationCancelled
+from src.config import Config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AbortableVLLM:
+    """AsyncLLMEngine 기반 vLLM 래퍼 (langchain VLLM과 같은 invoke 인터페이스)"""
+
+    def __init__(self, model: str, max_new_tokens: int, trust_remote_code: bool = True):
+        """
+        Args:
+            model (str): vLLM 모델명
+            max_new_tokens (int): 기본 최대 생성 토큰 수
+            trust_remote_code (bool): 원격 코드 신뢰 여부
+        """
+        from vllm import AsyncEngineArgs, AsyncLLMEngine
+
+        self.model = model
+        self.max_new_tokens = max_new_tokens
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="vllm-engine-loop", daemon=True)
+        self._thread.start()
+
+        engine_args = AsyncEngineArgs(model=model, trust_remote_code=trust_remote_code)
+        self.engine = AsyncLLMEngine.from_engine_args(engine_args)
+
+    def invoke(self, prompt: str, cancel_token: Optional[CancelToken] = None, **kwargs) -> str:
+        """
+        프롬프트에 대한 전체 응답을 생성합니다. (호출 스레드는 완료까지 대기)
+
+        Args:
+            prompt (str): 입력 프롬프트
+            cancel_token (CancelToken, optional): 취소/데드라인 토큰
+            **kwargs: SamplingParams 인자 (예: max_tokens)
+
+        Returns:
+            str: 생성된 텍스트
+
+        Raises:
+            GenerationCancelled: 토큰이 취소되었거나 데드라인을 넘긴 경우
+        """
+        future = asyncio.run_coroutine_threadsafe(self._generate(prompt, cancel_token, **kwargs), self._loop)
+        return future.result()
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        생성되는 텍스트를 조각(delta) 단위로 돌려줍니다. (호출한 이벤트 루프에서 사용)
+        스트림 소비가 중간에 중단되면(클라이언트 연결 종료 등) 엔진 요청을 abort합니다.
+
+        Args:
+            prompt (str): 입력 프롬프트
+            **kwargs: SamplingParams 인자 (예: max_tokens)
+        """
+        from vllm import SamplingParams
+
+        kwargs.setdefault('max_tokens', self.max_new_tokens)
+        sampling_params = SamplingParams(**kwargs)
+        request_id = uuid.uuid4().hex
+        caller_loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def produce():
+            # 엔진 루프에서 생성하며 새로 생긴 텍스트만 호출 루프의 큐로 전달
+            sent = 0
+            try:
+                async for output in self.engine.generate(prompt, sampling_params, request_id):
+                    text = output.outputs[0].text
+                    if len(text) > sent:
+                        caller_loop.call_soon_threadsafe(queue.put_nowait, text[sent:])
+                        sent = len(text)
+            except Exception as e:
+                caller_loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                caller_loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        future = asyncio.run_coroutine_threadsafe(produce(), self._loop)
+        finished = False
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    finished = True
+                    return
+                if isinstance(item, Exception):
+                    finished = True
+                    raise item
+                yield item
+        finally:
+            if not finished:
+                asyncio.run_coroutine_threadsafe(self.engine.abort(request_id), self._loop)
+                future.cancel()
+                metrics.increment("generation.aborted")
+                logger.info(f"vLLM 스트리밍 중단: request_id={request_id}")
+
+    async def _generate(self, prompt: str, cancel_token: Optional[CancelToken], **kwargs) -> str:
+        from vllm import SamplingParams
+
+        kwargs.setdefault('max_tokens', self.max_new_tokens)
+        sampling_params = SamplingParams(**kwargs)
+        request_id = uuid.uuid4().hex
+
+        if cancel_token is None:
+            text = ""
+            async for output in self.engine.generate(prompt, sampling_params, request_id):
+                text = output.outputs[0].text
+            return text
+
+        cancel_token.check()
+        aborted = False
+
+        async def abort():
+            nonlocal aborted
+            if not aborted:
+                aborted = True
+                await self.engine.abort(request_id)
+                metrics.increment("generation.aborted")
+                logger.info(f"vLLM 생성 중단: request_id={request_id}, 사유={cancel_token.reason}")
+
+        # 다른 스레드에서 취소되면 엔진 루프에서 abort 실행
+        unregister = cancel_token.add_callback(lambda: asyncio.run_coroutine_threadsafe(abort(), self._loop))
+        text = ""
+        try:
+            async with asyncio.timeout(cancel_token.remaining()):
+                async for output in self.engine.generate(prompt, sampling_params, request_id):
+                    text = output.outputs[0].text
+                    if cancel_token.cancelled:
+                        break
+        except TimeoutError:
+            pass
+        finally:
+            unregister()
+
+        # 데드라인 초과 시 check()가 토큰을 취소 상태로 만든 뒤 예외를 발생시킵니다.
+        try:
+            cancel_token.check()
+        except GenerationCancelled:
+            await abort()
+            raise
+        return text
+
+
+def create_local_llm(model: str, max_new_tokens: int, abortable: Optional[bool] = None):
+    """
+    이 프로세스에서 vLLM 모델을 로드합니다.
+
+    Args:
+        model (str): vLLM 모델명
+        max_new_tokens (int): 기본 최대 생성 토큰 수
+        abortable (bool, optional): True면 취소/스트리밍 가능한 AbortableVLLM(기본), False면 langchain VLLM
+                                    (None일 경우 Config.VLLM_ABORTABLE 또는 Config.RAG_STREAM_ENABLED이면 AbortableVLLM)
+    """
+    if abortable is None:
+        # langchain VLLM은 토큰 스트리밍을 구현하지 않으므로 스트리밍 API를 켜면 AsyncLLMEngine이 필요
+        abortable = Config.VLLM_ABORTABLE or Config.RAG_STREAM_ENABLED
+    if abortable:
+        # 요청 취소 시 engine.abort()로 배치 슬롯을 반환할 수 있는 AsyncLLMEngine 사용
+        return AbortableVLLM(model=model, trust_remote_code=True, max_new_tokens=max_new_tokens)
+
+    logger.warning("langchain VLLM을 사용합니다. 클라이언트 연결이 끊기거나 데드라인이 지나도 진행 중인 생성을 중단하지 못합니다. (VLLM_ABORTABLE=false)")
+    from langchain_community.llms import VLLM
+    return VLLM(model=model, trust_remote_code=True, max_new_tokens=max_new_tokens)
+
@@ -5,10 +5,21 @@ vLLM을 사용한 지원사업 매칭 시스템
 
 import json
 import os
-from typing import Dict, List, Any
+import re
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 from src.user import User
-from langchain_community.llms import VLLM
+from src.config import Config
+from src.catalog import load_catalog, program_key
+from src.catalog_snapshot import load_snapshot
+from src.text_normalizer import short_summary
+from src.reranker import TwoStageSelector
+from src.cascade import CascadeRouter
+from src.cancellation import CancelToken
+from src.vllm_engine import AbortableVLLM, create_local_llm
+from src.inference_server import RemoteLLM
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,56 +29,154 @@ logger = logging.getLogger(__name__)
 class VLLMMatcher:
     """vLLM을 사용한 지원사업 매칭 클래스"""
     
-    def __init__(self, model_name: str = "K-intelligence/Midm-2.0-Base-Instruct"): ## KT 믿:음 모델을 사용합니다. 
+    def __init__(self, model_name: str = "K-intelligence/Midm-2.0-Base-Instruct", lazy: bool = False): ## KT 믿:음 모델을 사용합니다. 
         """
         Args:
             model_name (str): 사용할 vLLM 모델명
+            lazy (bool): True이면 모델을 생성자에서 로드하지 않고 load() 또는 첫 사용 시 로드
         """
         self.model_name = model_name
-        self.llm = None
-        self._initialize_llm()
+        self._llm = None
+        self._load_lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self._selector = None
+        self._router = None
+        if not lazy:
+            self.load()
+
+    @property
+    def llm(self):
+        """vLLM 모델 (아직 로드되지 않았다면 이 시점에 로드)"""
+        if self._llm is None:
+            self.load()
+        return self._llm
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._llm is not None
+
+    @property
+    def is_warm(self) -> bool:
+        return self.warmup_seconds is not None
+
+    def load(self):
+        """모델을 한 번만 로드합니다. (여러 스레드에서 호출해도 안전)"""
+        with self._load_lock:
+            if self._llm is None:
+                start = time.perf_counter()
+                self._initialize_llm()
+                self.load_seconds = time.perf_counter() - start
 
-    
     def _initialize_llm(self):
         """vLLM 모델 초기화"""
         try:
-            logger.info(f"vLLM 모델 초기화 중: {self.model_name}")
-            self.llm = VLLM(model=self.model_name,
-                            trust_remote_code=True,
-                             max_new_tokens=10000)
+            if Config.INFERENCE_SERVER_ADDRESS:
+                # 모델은 추론 서버 프로세스가 소유하고, 이 프로세스는 로컬 소켓으로 생성을 요청
+                logger.info(f"추론 서버 연결 중: {Config.INFERENCE_SERVER_ADDRESS}")
+                self._llm = RemoteLLM()
+            else:
+                logger.info(f"vLLM 모델 초기화 중: {self.model_name}")
+                self._llm = create_local_llm(self.model_name, max_new_tokens=10000)
             logger.info("vLLM 모델 초기화 완료")
         except Exception as e:
             logger.error(f"vLLM 모델 초기화 실패: {e}")
             raise
+
+    def warmup(self):
+        """
+        합성 사용자 프로필로 짧은 추론을 실행하여 첫 요청의 지연(그래프 캡처, 캐시 할당 등)을 미리 치릅니다.
+        """
+        warmup_user = User(
+            name="warmup",
+            code="02",
+            main_category=["기술"],
+            main_business_summary="AI 기반 업무 자동화 솔루션 개발"
+        )
+        warmup_programs = [{
+            'pblancNm': "인공지능 솔루션 실증 지원사업",
+            'bsnsSumryCn': "중소기업의 AI 솔루션 도입 및 실증을 지원합니다."
+        }]
+
+        start = time.perf_counter()
+        prompt = self.create_scoring_prompt(warmup_user, warmup_programs)
+        self.llm.invoke(prompt, max_tokens=Config.WARMUP_MAX_TOKENS)
+        self.warmup_seconds = time.perf_counter() - start
+        logger.info(f"vLLM 워밍업 완료: {self.warmup_seconds:.2f}초")
+
+    def _invoke(self, prompt: str, cancel_token: Optional[CancelToken] = None, stage: str = "generate",
+                **kwargs) -> str:
+        """
+        취소 토큰과 단계별 데드라인을 적용하여 vLLM을 호출합니다.
+        
+        Args:
+            prompt (str): 입력 프롬프트
+            cancel_token (CancelToken, optional): 요청 취소/데드라인 토큰
+            stage (str): 단계 이름 (Config.STAGE_DEADLINE_SECONDS의 키)
+            **kwargs: 샘플링 파라미터
+            
+        Returns:
+            str: 생성된 텍스트
+        """
+        if cancel_token is None:
+            return self.llm.invoke(prompt, **kwargs)
+
+        with cancel_token.stage(stage, Config.STAGE_DEADLINE_SECONDS.get(stage)):
+            cancel_token.check()
+            if isinstance(self.llm, (AbortableVLLM, RemoteLLM)):
+                return self.llm.invoke(prompt, cancel_token=cancel_token, **kwargs)
+
+            # abort API가 없는 엔진은 호출 전후로만 취소 여부를 확인
+            result = self.llm.invoke(prompt, **kwargs)
+            cancel_token.check()
+            return result
     
     def extract_support_programs_info(self, all_categories_file: str) -> Dict[str, List[Dict]]:
         """
         all_categories.json 파일에서 pblancNm과 bsnsSumryCn만 추출하여 새로운 딕셔너리 생성
+        유사 중복 공고는 대표 공고 하나로 묶어서 추출하며, bsnsSumryCn에는 수집 시 만든 짧은 요약을 넣습니다.
         
         Args:
             all_categories_file (str): all_categories.json 파일 경로
             
         Returns:
-            Dict[str, List[Dict]]: 카테고리별 지원사업 정보 (pblancNm, bsnsSumryCn만 포함)
+            Dict[str, List[Dict]]: 카테고리별 지원사업 정보 (pblancNm, bsnsSumryCn, 대표 공고 pblancId 포함)
         """
         try:
-            with open(all_categories_file, 'r', encoding='utf-8') as f:
-                all_data = json.load(f)
+            # 현재 카탈로그로 만든 스냅샷이 있으면 JSON을 파싱하지 않고 memory-map에서 바로 읽음
+            snapshot = load_snapshot()
+            if snapshot is not None and snapshot.is_current(all_categories_file):
+                extracted_data = {
+                    category: [
+                        {
+                            'pblancId': snapshot.ids[row],
+                            'pblancNm': snapshot.names[row],
+                            'bsnsSumryCn': snapshot.summaries[row],
+                            'original_index': index
+                        }
+                        for index, row in snapshot.category_entries(category)
+                    ]
+                    for category in snapshot.categories
+                }
+                logger.info(f"지원사업 정보 추출 완료 (스냅샷): {len(extracted_data)}개 카테고리")
+                return extracted_data
+
+            catalog = load_catalog(all_categories_file)
             
             extracted_data = {}
             
-            for category, category_data in all_data.items():
-                if 'jsonArray' in category_data:
-                    extracted_programs = []
-                    for program in category_data['jsonArray']:
-                        extracted_program = {
-                            'pblancNm': program.get('pblancNm', ''),
-                            'bsnsSumryCn': program.get('bsnsSumryCn', ''),
-                            'original_index': category_data['jsonArray'].index(program)  # 원본 인덱스 저장
-                        }
-                        extracted_programs.append(extracted_program)
-                    
-                    extracted_data[category] = extracted_programs
+            for category, entries in catalog.categories.items():
+                extracted_programs = []
+                for index, program in entries:
+                    extracted_program = {
+                        'pblancId': program.get('pblancId'),
+                        'pblancNm': program.get('pblancNm', ''),
+                        'bsnsSumryCn': short_summary(program),
+                        'original_index': index  # 원본 인덱스 저장
+                    }
+                    extracted_programs.append(extracted_program)
+                
+                extracted_data[category] = extracted_programs
             
             logger.info(f"지원사업 정보 추출 완료: {len(extracted_data)}개 카테고리")
             return extracted_data
@@ -125,13 +234,15 @@ class VLLMMatcher:
         full_prompt = user_info + programs_info + matching_instruction
         return full_prompt
     
-    def match_support_programs(self, user: User, extracted_data: Dict[str, List[Dict]]) -> List[Dict]:
+    def match_support_programs(self, user: User, extracted_data: Dict[str, List[Dict]],
+                               cancel_token: Optional[CancelToken] = None) -> List[Dict]:
         """
         vLLM을 사용하여 사용자에게 적합한 지원사업 매칭
         
         Args:
             user (User): 사용자 정보
             extracted_data (Dict[str, List[Dict]]): 추출된 지원사업 정보
+            cancel_token (CancelToken, optional): 요청 취소/데드라인 토큰
             
         Returns:
             List[Dict]: 매칭된 지원사업 정보 (원본 데이터 포함)
@@ -141,9 +252,14 @@ class VLLMMatcher:
             relevant_programs = []
             category_indices = {}  # 카테고리별 원본 인덱스 매핑
             
+            seen_ids = set()  # 여러 분야에 실린 같은 공고는 한 번만 (공고 ID가 없으면 내용 키)
             for user_category in user.category_list:
                 if user_category in extracted_data:
                     for program in extracted_data[user_category]:
+                        key = program_key(program)
+                        if key in seen_ids:
+                            continue
+                        seen_ids.add(key)
                         relevant_programs.append(program)
                         # 카테고리와 원본 인덱스 매핑 저장
                         category_indices[f"{user_category}_{program['original_index']}"] = {
@@ -161,7 +277,7 @@ class VLLMMatcher:
             # vLLM 추론
                         
             logger.info("vLLM 매칭 분석 시작...")
-            result = self.llm.invoke(prompt)
+            result = self._invoke(prompt, cancel_token, stage="match")
         
             
             logger.info(f"vLLM 분석 결과: {result}\n\n The Type of reuslt{result}")
@@ -175,6 +291,247 @@ class VLLMMatcher:
             logger.error(f"지원사업 매칭 실패: {e}")
             raise
     
+    def _collect_relevant_programs(self, user: User, extracted_data: Dict[str, List[Dict]]) -> List[Dict]:
+        """사용자의 카테고리에 해당하는 지원사업을 모읍니다. (여러 분야에 실린 같은 공고는 한 번만, 공고 ID가 없으면 내용 키)"""
+        relevant_programs = []
+        seen_ids = set()
+        for user_category in user.category_list:
+            for program in extracted_data.get(user_category, []):
+                key = program_key(program)
+                if key in seen_ids:
+                    continue
+                seen_ids.add(key)
+                relevant_programs.append(program)
+        return relevant_programs
+
+    def create_explanation_prompt(self, user: User, ranked_programs: List[Tuple[Dict, float]]) -> str:
+        """
+        이미 선별된 지원사업에 대한 추천사유 작성 프롬프트 생성
+        
+        Args:
+            user (User): 사용자 정보
+            ranked_programs (List[Tuple[Dict, float]]): (지원사업, 점수) 리스트
+            
+        Returns:
+            str: vLLM 입력용 프롬프트
+        """
+        user_info = f"""
+사용자 정보:
+- 사업분야: {', '.join(user.category_list)}
+- 사업내용: {user.main_business_summary}
+"""
+
+        programs_info = ""
+        for i, (program, _) in enumerate(ranked_programs):
+            programs_info += f"""
+지원사업 {i+1}:
+- 사업명: {program['pblancNm']}
+- 사업내용: {program['bsnsSumryCn']}
+"""
+
+        explanation_instruction = """
+위의 지원사업들은 사용자에게 적합한 것으로 이미 선별되었습니다.
+각 지원사업이 사용자의 사업분야와 사업내용에 왜 도움이 되는지 2~3문장으로 설명해주세요.
+
+각 지원사업마다 아래의 형식으로 작성하세요.
+지원사업 {번호}
+추천사유 : {추천 이유}
+
+"""
+        return user_info + programs_info + explanation_instruction
+
+    def _parse_explanation_result(self, vllm_result: str, count: int) -> List[Optional[str]]:
+        """
+        추천사유 응답을 지원사업 번호별로 파싱
+        
+        Args:
+            vllm_result (str): vLLM 응답
+            count (int): 프롬프트에 포함된 지원사업 수
+            
+        Returns:
+            List[Optional[str]]: 번호 순서대로의 추천사유 (찾지 못하면 None)
+        """
+        explanations: List[Optional[str]] = [None] * count
+        sections = re.split(r"지원사업\s*(\d+)", vllm_result)
+        # split 결과: [앞부분, 번호, 본문, 번호, 본문, ...]
+        for number, body in zip(sections[1::2], sections[2::2]):
+            index = int(number) - 1
+            if not 0 <= index < count or explanations[index] is not None:
+                continue
+            reason = body.split("추천사유", 1)[-1].strip(" :*\n")
+            if reason:
+                explanations[index] = reason.strip()
+        return explanations
+
+    def explain_programs(self, user: User, ranked_programs: List[Tuple[Dict, float]],
+                         cancel_token: Optional[CancelToken] = None) -> List[List]:
+        """
+        선별된 지원사업의 추천사유를 vLLM으로 작성
+        
+        Args:
+            user (User): 사용자 정보
+            ranked_programs (List[Tuple[Dict, float]]): (지원사업, 0~1 점수) 리스트
+            cancel_token (CancelToken, optional): 요청 취소/데드라인 토큰
+            
+        Returns:
+            List[List]: [지원사업 이름, 점수, 추천사유] 리스트
+        """
+        if not ranked_programs:
+            return []
+
+        prompt = self.create_explanation_prompt(user, ranked_programs)
+        logger.info(f"vLLM 추천사유 생성 시작: {len(ranked_programs)}개 지원사업")
+        result = self._invoke(prompt, cancel_token, stage="explain")
+        explanations = self._parse_explanation_result(result, len(ranked_programs))
+
+        matched_programs = []
+        for (program, score), explanation in zip(ranked_programs, explanations):
+            matched_programs.append([
+                program['pblancNm'],
+                f"{score * 10:.1f}/10",
+                explanation or "추천사유를 생성하지 못했습니다."
+            ])
+        return matched_programs
+
+    def match_support_programs_two_stage(self, user: User, extracted_data: Dict[str, List[Dict]],
+                                         selector: Optional[TwoStageSelector] = None,
+                                         cancel_token: Optional[CancelToken] = None) -> List[List]:
+        """
+        2단계 매칭: CPU에서 recall + rerank 후 최종 top-K만 vLLM으로 추천사유 작성
+        후보 수와 무관하게 요청당 LLM 호출 비용이 일정합니다.
+        
+        Args:
+            user (User): 사용자 정보
+            extracted_data (Dict[str, List[Dict]]): 추출된 지원사업 정보
+            selector (TwoStageSelector, optional): 후보 선별기 (None일 경우 설정에 따라 생성)
+            cancel_token (CancelToken, optional): 요청 취소/데드라인 토큰
+            
+        Returns:
+            List[List]: [지원사업 이름, 점수, 추천사유] 리스트
+        """
+        try:
+            relevant_programs = self._collect_relevant_programs(user, extracted_data)
+            if not relevant_programs:
+                logger.warning("사용자 카테고리와 관련된 지원사업이 없습니다.")
+                return []
+
+            if selector is None:
+                if self._selector is None:
+                    self._selector = TwoStageSelector()
+                selector = self._selector
+
+            ranked_programs = selector.select(user, relevant_programs)
+            if cancel_token is not None:
+                cancel_token.check()
+            return self.explain_programs(user, ranked_programs, cancel_token)
+
+        except Exception as e:
+            logger.error(f"2단계 지원사업 매칭 실패: {e}")
+            raise
+    
+    def create_scoring_prompt(self, user: User, support_programs: List[Dict]) -> str:
+        """
+        추천사유 없이 점수만 매기는 짧은 채점 프롬프트 생성
+        
+        Args:
+            user (User): 사용자 정보
+            support_programs (List[Dict]): 채점할 지원사업 리스트
+            
+        Returns:
+            str: vLLM 입력용 프롬프트
+        """
+        user_info = f"""
+사용자 정보:
+- 사업분야: {', '.join(user.category_list)}
+- 사업내용: {user.main_business_summary}
+"""
+
+        programs_info = ""
+        for i, program in enumerate(support_programs):
+            programs_info += f"""
+지원사업 {i+1}:
+- 사업명: {program['pblancNm']}
+- 사업내용: {program['bsnsSumryCn']}
+"""
+
+        scoring_instruction = """
+각 지원사업이 사용자의 사업분야와 사업내용에 얼마나 적합한지 0-10점으로 채점하세요.
+설명 없이 지원사업마다 한 줄씩 아래 형식으로만 답하세요.
+지원사업 {번호}: {점수}
+"""
+        return user_info + programs_info + scoring_instruction
+
+    def score_programs(self, user: User, support_programs: List[Dict],
+                       cancel_token: Optional[CancelToken] = None) -> List[float]:
+        """
+        vLLM으로 지원사업을 0-10점으로 채점 (캐스케이드의 큰 모델 계층)
+        
+        Args:
+            user (User): 사용자 정보
+            support_programs (List[Dict]): 채점할 지원사업 리스트
+            cancel_token (CancelToken, optional): 요청 취소/데드라인 토큰
+            
+        Returns:
+            List[float]: 입력 순서와 동일한 점수 리스트 (파싱 실패 시 0점)
+        """
+        if not support_programs:
+            return []
+
+        prompt = self.create_scoring_prompt(user, support_programs)
+        result = self._invoke(prompt, cancel_token, stage="score")
+
+        scores = [0.0] * len(support_programs)
+        for number, score in re.findall(r"지원사업\s*(\d+)\s*[:：]\s*(\d+(?:\.\d+)?)", result):
+            index = int(number) - 1
+            if 0 <= index < len(scores):
+                scores[index] = min(float(score), 10.0)
+        return scores
+
+    def match_support_programs_cascade(self, user: User, extracted_data: Dict[str, List[Dict]],
+                                       router: Optional[CascadeRouter] = None,
+                                       cancel_token: Optional[CancelToken] = None) -> List[List]:
+        """
+        캐스케이드 매칭: 작은 모델이 전체 후보를 채점하고, 애매한 후보의 재채점과
+        최종 추천사유 작성에만 vLLM(Midm)을 사용합니다.
+        
+        Args:
+            user (User): 사용자 정보
+            extracted_data (Dict[str, List[Dict]]): 추출된 지원사업 정보
+            router (CascadeRouter, optional): 캐스케이드 라우터 (None일 경우 설정에 따라 생성)
+            cancel_token (CancelToken, optional): 요청 취소/데드라인 토큰
+            
+        Returns:
+            List[List]: [지원사업 이름, 점수, 추천사유] 리스트
+        """
+        try:
+            relevant_programs = self._collect_relevant_programs(user, extracted_data)
+            if not relevant_programs:
+                logger.warning("사용자 카테고리와 관련된 지원사업이 없습니다.")
+                return []
+
+            router = router or self.cascade_router
+            ranked_programs = router.route(
+                user,
+                relevant_programs,
+                lambda u, programs: self.score_programs(u, programs, cancel_token)
+            )
+            if not ranked_programs:
+                return []
+
+            router.record_explanation()
+            return self.explain_programs(user, ranked_programs, cancel_token)
+
+        except Exception as e:
+            logger.error(f"캐스케이드 지원사업 매칭 실패: {e}")
+            raise
+
+    @property
+    def cascade_router(self) -> CascadeRouter:
+        """설정 기반 기본 캐스케이드 라우터 (계층별 호출 수 통계 포함)"""
+        if self._router is None:
+            self._router = CascadeRouter()
+        return self._router
+    
     def _parse_matching_result(self, vllm_result: str, relevant_programs: List[Dict], category_indices: Dict) -> List[Dict]:
         """
         vLLM 결과를 파싱하여 매칭된 지원사업 추출
@@ -286,7 +643,7 @@ class VLLMMatcher:
         )
         
         # 파일 경로 설정
-        all_categories_file = "src/data/all_categories.json"
+        all_categories_file = Config.CATALOG_FILE
         output_file = "src/data/matched_support_programs.json"
         
         try: